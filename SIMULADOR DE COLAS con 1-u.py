@@ -1,7 +1,44 @@
+import os
+import sys
 import tkinter as tk
-from tkinter import ttk, messagebox
+from tkinter import ttk, messagebox, filedialog
 import numpy as np
 import math
+from functools import partial
+
+# El núcleo compartido vive junto a la app móvil
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "kivy_app"))
+from core_simulador import (
+    DISTRIBUCIONES,
+    CacheVariables,
+    FuenteQMC,
+    GrafoDependencias,
+    IndexSet,
+    analizar_lcg,
+    binomial_acumulada,
+    bloques_de,
+    buscar_distribucion,
+    crear_fuente,
+    generar_variables,
+    indices_desde_texto,
+    inv_binomial_np,
+    inv_poisson_np,
+    leer_especificaciones,
+    leer_servidores,
+    poisson_acumulada,
+    probar_uniformes,
+    simulate_colas_avanzada,
+    simulate_colas_resumen,
+    simulate_colas_servidores,
+    simulate_entregas,
+    tomar_uniformes,
+)
+
+# Máximo de filas que se muestran en la pestaña de números
+MAX_FILAS_NUMEROS = 1000
+# Si la media (λ o n·p) supera este valor, la vista de cálculos de Poisson y
+# Binomial no lista cada k desde 0
+PASOS_DETALLE = 50
 
 # ------------------- Aplicar estilos modernos -------------------
 def aplicar_estilos(root):
@@ -47,87 +84,8 @@ def aplicar_estilos(root):
 
 # ---------- utilidades ----------
 def parse_rangos(txt):
-    if not txt or not txt.strip():
-        return []
-    parts = [p.strip() for p in txt.split(",")]
-    idxs = set()
-    for p in parts:
-        if "-" in p:
-            a, b = p.split("-")
-            a = int(a); b = int(b)
-            if a > b: a, b = b, a
-            for i in range(a, b+1):
-                if i >= 1:
-                    idxs.add(i-1)
-        else:
-            i = int(p)
-            if i >= 1:
-                idxs.add(i-1)
-    return sorted(idxs)
-
-def compactar_indices_1based(indices0):
-    if not indices0:
-        return ""
-    arr = sorted([i+1 for i in indices0])
-    grupos = []
-    ini = arr[0]
-    prev = arr[0]
-    for x in arr[1:]:
-        if x == prev + 1:
-            prev = x
-        else:
-            grupos.append((ini, prev))
-            ini = x
-            prev = x
-    grupos.append((ini, prev))
-    partes = []
-    for a, b in grupos:
-        if a == b:
-            partes.append(f"{a}")
-        else:
-            partes.append(f"{a}-{b}")
-    return ", ".join(partes)
-
-def inv_poisson_u(u, lam):
-    # Inversión por CDF con un solo U
-    # F(k) = sum_{i=0}^k e^{-lam} lam^i / i!
-    # iteramos hasta que F >= u
-    if lam < 0:
-        lam = 0.0
-    k = 0
-    p = math.exp(-lam)   # P(X=0)
-    F = p
-    while u > F:
-        k += 1
-        p *= lam / k     # Recurrencia para PMF
-        F += p
-    return k
-
-def inv_geometrica_u(u, p):
-    # Definición de número de ensayos hasta el primer éxito, valores 1,2,3,...
-    if p <= 0: p = 1e-9
-    if p >= 1: p = 1 - 1e-9
-    return int(math.ceil(math.log(1 - u) / math.log(1 - p)))
-
-def inv_binomial_u(u, n, p):
-    # Inversión de CDF con un solo U (n entero razonable)
-    if n < 0: n = 0
-    if p < 0: p = 0.0
-    if p > 1: p = 1.0
-    # PMF inicial k=0
-    q = 1 - p
-    pmf = (q ** n)
-    F = pmf
-    k = 0
-    while u > F and k < n:
-        k += 1
-        # pmf(k) = pmf(k-1) * (n-k+1)/k * p/q
-        if q == 0:
-            pmf = 0.0 if k < n else 1.0
-        else:
-            pmf = pmf * (n - k + 1) / k * (p / q)
-        F += pmf
-    return k
+    # Rangos 1-based -> IndexSet 0-based (intervalos, sin expandir cada índice)
+    return IndexSet.desde_texto(txt, estricto=True)
 
 # ------------------- Clase principal -------------------
 class SimuladorApp:
@@ -139,10 +97,15 @@ class SimuladorApp:
         aplicar_estilos(root)
 
         # Guardar números y variables
-        self.numeros_generados = []                 # lista de floats [0,1)
+        self.numeros_generados = []                 # UniformStream (valores en [0,1) bajo demanda)
         self.variables_generadas = []               # [(nombre, dist, params_str, indices_str, cantidad)]
         self.variables_dict = {}                    # nombre -> np.array valores
         self.variables_meta = {}                    # nombre -> dict(meta)
+        self.clave_numeros = None                   # método y parámetros de numeros_generados
+        self.cache_variables = CacheVariables()     # LRU acotada por memoria
+        # numeros -> "var:<nombre>" -> "colas" / "entregas": al regenerar los
+        # números lo que depende de ellos queda sucio y se recalcula al mirarlo
+        self.grafo = GrafoDependencias()
 
         # Crear pestañas
         self.notebook = ttk.Notebook(root)
@@ -169,6 +132,7 @@ class SimuladorApp:
         self.init_tab_var_generadas()
         self.init_tab_colas()
         self.init_tab_entregas()
+        self.notebook.bind("<<NotebookTabChanged>>", self.on_cambio_pestana)
 
     # ------------------- Pestaña Generador -------------------
     def init_tab_rng(self):
@@ -182,8 +146,20 @@ class SimuladorApp:
                         command=self.toggle_c)
         rb2 = ttk.Radiobutton(frame, text="Congruencial Multiplicativo", variable=self.metodo, value="multiplicativo",
                         command=self.toggle_c)
+        rb3 = ttk.Radiobutton(frame, text="PCG64 (NumPy, periodo 2^128)", variable=self.metodo, value="pcg64",
+                        command=self.toggle_c)
+        rb4 = ttk.Radiobutton(frame, text="Philox (NumPy, periodo 2^256)", variable=self.metodo, value="philox",
+                        command=self.toggle_c)
+        rb5 = ttk.Radiobutton(frame, text="Halton aleatorizado (cuasi-aleatorio)", variable=self.metodo, value="halton",
+                        command=self.toggle_c)
+        rb6 = ttk.Radiobutton(frame, text="Sobol aleatorizado (cuasi-aleatorio)", variable=self.metodo, value="sobol",
+                        command=self.toggle_c)
         rb1.pack(anchor="w")
         rb2.pack(anchor="w")
+        rb3.pack(anchor="w")
+        rb4.pack(anchor="w")
+        rb5.pack(anchor="w")
+        rb6.pack(anchor="w")
 
         self.param_frame = ttk.LabelFrame(frame, text="Parámetros", padding=10)
         self.param_frame.pack(fill="x", pady=10)
@@ -204,46 +180,92 @@ class SimuladorApp:
         self.entry_m = ttk.Entry(self.param_frame, width=18)
         self.entry_m.grid(row=3, column=1, padx=5, pady=5)
 
+        ttk.Label(self.param_frame, text="Dimensiones (Halton/Sobol):").grid(row=4, column=0, sticky="w", padx=5, pady=5)
+        self.entry_dim = ttk.Entry(self.param_frame, width=18)
+        self.entry_dim.grid(row=4, column=1, padx=5, pady=5)
+        self.entry_dim.insert(0, "2")
+        self.entry_dim.config(state="disabled")
+
         cwrap = ttk.Frame(frame)
         cwrap.pack(fill="x", pady=6)
         ttk.Label(cwrap, text="Cantidad de números a generar:").pack(side="left")
         self.entry_n = ttk.Entry(cwrap, width=12)
         self.entry_n.pack(side="left", padx=6)
 
-        ttk.Button(frame, text="Generar", command=self.generar_numeros).pack(pady=10)
+        botones = ttk.Frame(frame)
+        botones.pack(pady=10)
+        ttk.Button(botones, text="Generar", command=self.generar_numeros).pack(side="left", padx=4)
+        ttk.Button(botones, text="Probar uniformidad", command=self.probar_numeros).pack(side="left", padx=4)
 
     def toggle_c(self):
-        if self.metodo.get() == "multiplicativo":
+        metodo = self.metodo.get()
+        if metodo == "multiplicativo":
             self.entry_c.delete(0, tk.END)
             self.entry_c.config(state="disabled")
         else:
             self.entry_c.config(state="normal")
+        # Los generadores de NumPy solo usan la semilla X₀
+        estado_lcg = "normal" if metodo in ("mixto", "multiplicativo") else "disabled"
+        self.entry_a.config(state=estado_lcg)
+        self.entry_m.config(state=estado_lcg)
+        if estado_lcg == "disabled":
+            self.entry_c.config(state="disabled")
+        self.entry_dim.config(state="normal" if metodo in ("halton", "sobol") else "disabled")
 
     def generar_numeros(self):
         try:
+            metodo = self.metodo.get()
             x = int(self.entry_x0.get())
-            a = int(self.entry_a.get())
-            m = int(self.entry_m.get())
             n = int(self.entry_n.get())
-            if m <= 0:
-                raise ValueError("El módulo m debe ser > 0")
             if n <= 0:
                 raise ValueError("La cantidad debe ser > 0")
-            c = int(self.entry_c.get()) if self.metodo.get() == "mixto" else 0
+            if metodo in ("mixto", "multiplicativo"):
+                a = int(self.entry_a.get())
+                m = int(self.entry_m.get())
+                if m <= 0:
+                    raise ValueError("El módulo m debe ser > 0")
+                c = int(self.entry_c.get()) if metodo == "mixto" else 0
+                # crear_fuente valida m (<= 2^64) antes de analizar; el análisis
+                # tiene un límite de iteraciones para no trabar la interfaz
+                fuente = crear_fuente(metodo, x0=x, a=a, c=c, m=m)
+                analisis = analizar_lcg(x, a, c, m, presupuesto=50_000)
+                if analisis.periodo is not None and n > analisis.cola + analisis.periodo:
+                    # Evitar simulaciones largas sobre una secuencia que se repite
+                    if not messagebox.askyesno(
+                            "Periodo corto",
+                            f"El generador tiene periodo {analisis.periodo} y se pidieron {n} números: "
+                            f"la secuencia se repetirá.\n{'; '.join(analisis.avisos)}\n\n¿Generar de todos modos?"):
+                        return
+                clave = ("lcg", x, a, c, m, n)
+            else:
+                dim = int(self.entry_dim.get()) if metodo in ("halton", "sobol") else 1
+                fuente = crear_fuente(metodo, semilla=x, dim=dim)
+                clave = (metodo, x, dim, n)
 
-            self.numeros_generados.clear()
-            for _ in range(n):
-                if self.metodo.get() == "mixto":
-                    x = (a * x + c) % m
-                else:
-                    x = (a * x) % m
-                self.numeros_generados.append(x / m)
+            self.numeros_generados = fuente.numeros(n)
+            self.clave_numeros = clave
+            self.grafo.fijar("numeros", self.numeros_generados)
 
             self.update_numeros_table()
-            messagebox.showinfo("Éxito", "Números generados correctamente")
+            msg = "Números generados correctamente"
+            if isinstance(fuente, FuenteQMC):
+                # Cada variable debe tomar los índices de su propia dimensión
+                msg += "\n\nÍndices por dimensión:\n" + "\n".join(
+                    f"Dimensión {j + 1}: {r}" for j, r in enumerate(fuente.rangos(n)))
+            messagebox.showinfo("Éxito", msg)
         except Exception as e:
             messagebox.showerror("Error", str(e))
 
+    def probar_numeros(self):
+        if len(self.numeros_generados) == 0:
+            messagebox.showwarning("Aviso", "Primero genera números pseudoaleatorios.")
+            return
+        # Una sola pasada por bloques: no se materializa la secuencia completa
+        resultados = probar_uniformes(bloques_de(self.numeros_generados))
+        lineas = [f"{r.nombre}: estadístico = {r.estadistico:.4f}, p = {r.p_valor:.4f}" for r in resultados]
+        lineas.append("\np < 0.05 sugiere que los números no se comportan como U(0,1) independientes.")
+        messagebox.showinfo("Pruebas de uniformidad", "\n".join(lineas))
+
     # ------------------- Pestaña Números -------------------
     def init_tab_numeros(self):
         cols = ("idx", "valor")
@@ -257,7 +279,8 @@ class SimuladorApp:
     def update_numeros_table(self):
         for i in self.tree_nums.get_children():
             self.tree_nums.delete(i)
-        for k, val in enumerate(self.numeros_generados, start=1):
+        # Los números se calculan bajo demanda; solo se muestran los primeros.
+        for k, val in enumerate(self.numeros_generados[:MAX_FILAS_NUMEROS], start=1):
             self.tree_nums.insert("", "end", values=(k, f"{val:.6f}"))
 
     # ------------------- Pestaña Variables -------------------
@@ -271,8 +294,9 @@ class SimuladorApp:
         ttk.Label(frame, text="Distribución:").grid(row=1, column=0, sticky="w", padx=(0,6))
         self.var_tipo = tk.StringVar()
         self.cb_tipo = ttk.Combobox(frame, textvariable=self.var_tipo, state="readonly",
-                          values=["Exponencial", "Normal", "Poisson", "Geométrica", "Binomial"], width=18)
+                          values=list(DISTRIBUCIONES), width=18)
         self.cb_tipo.grid(row=1, column=1, sticky="w")
+        self.cb_tipo.current(0)
         self.cb_tipo.bind("<<ComboboxSelected>>", self.on_tipo_change)
 
         # Nombre
@@ -288,8 +312,11 @@ class SimuladorApp:
         self.rangos_frame = ttk.LabelFrame(frame, text="Selección de U (índices 1..N)", padding=10)
         self.rangos_frame.grid(row=3, column=0, columnspan=4, sticky="we")
 
-        # Botón generar
-        ttk.Button(frame, text="Generar Variable", command=self.generar_variable).grid(row=4, column=0, columnspan=4, pady=12)
+        # Botones generar (una variable o todas las de un archivo JSON)
+        botones = ttk.Frame(frame)
+        botones.grid(row=4, column=0, columnspan=4, pady=12)
+        ttk.Button(botones, text="Generar Variable", command=self.generar_variable).pack(side="left", padx=6)
+        ttk.Button(botones, text="Generar desde archivo...", command=self.generar_desde_archivo).pack(side="left", padx=6)
 
         # Preview de U seleccionadas
         self.preview_u = tk.Text(frame, height=6, width=90, relief="flat", borderwidth=1)
@@ -315,38 +342,26 @@ class SimuladorApp:
         self.clear_param_frame()
         self.clear_rangos_frame()
 
-        tipo = self.var_tipo.get()
-
-        # Parámetros según distribución
-        if tipo == "Exponencial":
-            ttk.Label(self.param_frame, text="λ (lambda):").grid(row=0, column=0, sticky="w")
-            self.p1 = ttk.Entry(self.param_frame, width=12)
-            self.p1.grid(row=0, column=1, sticky="w")
-        elif tipo == "Normal":
-            ttk.Label(self.param_frame, text="μ (media):").grid(row=0, column=0, sticky="w")
-            self.p1 = ttk.Entry(self.param_frame, width=12)
-            self.p1.grid(row=0, column=1, sticky="w")
-            ttk.Label(self.param_frame, text="σ (desv. est.):").grid(row=0, column=2, sticky="e", padx=(16,6))
-            self.p2 = ttk.Entry(self.param_frame, width=12)
-            self.p2.grid(row=0, column=3, sticky="w")
-        elif tipo == "Poisson":
-            ttk.Label(self.param_frame, text="λ (lambda):").grid(row=0, column=0, sticky="w")
-            self.p1 = ttk.Entry(self.param_frame, width=12)
-            self.p1.grid(row=0, column=1, sticky="w")
-        elif tipo == "Geométrica":
-            ttk.Label(self.param_frame, text="p (0-1):").grid(row=0, column=0, sticky="w")
-            self.p1 = ttk.Entry(self.param_frame, width=12)
-            self.p1.grid(row=0, column=1, sticky="w")
-        elif tipo == "Binomial":
-            ttk.Label(self.param_frame, text="n (entero):").grid(row=0, column=0, sticky="w")
-            self.p1 = ttk.Entry(self.param_frame, width=12)
-            self.p1.grid(row=0, column=1, sticky="w")
-            ttk.Label(self.param_frame, text="p (0-1):").grid(row=0, column=2, sticky="e", padx=(16,6))
-            self.p2 = ttk.Entry(self.param_frame, width=12)
-            self.p2.grid(row=0, column=3, sticky="w")
+        dist = buscar_distribucion(self.var_tipo.get())
+        if dist is None:
+            return
+
+        # Parámetros según distribución (dos por fila), tomados del registro del núcleo
+        self.entradas_param = {}
+        for j, (clave, etiqueta, defecto) in enumerate(dist.parametros):
+            fila, col = divmod(j, 2)
+            ttk.Label(self.param_frame, text=f"{etiqueta}:").grid(
+                row=fila, column=2 * col, sticky="w" if col == 0 else "e", padx=(0, 6) if col == 0 else (16, 6))
+            # Los parámetros de texto son listas (p. ej. valores de la Empírica)
+            entrada = ttk.Entry(self.param_frame, width=40 if isinstance(defecto, str) else 12)
+            entrada.grid(row=fila, column=2 * col + 1, sticky="w")
+            self.entradas_param[clave] = entrada
+        ttk.Label(self.param_frame, text=dist.formula, foreground="#555").grid(
+            row=(len(dist.parametros) + 1) // 2, column=0, columnspan=4, sticky="w", pady=(6, 0))
 
         # Rangos de U
-        if tipo == "Normal":
+        self.var_ambos = tk.BooleanVar(value=False)
+        if len(dist.claves_u) > 1:
             ttk.Label(self.rangos_frame, text="Rangos U1 (ej: 1-5, 8, 10-12):").grid(row=0, column=0, sticky="w")
             self.entry_rangos_u1 = ttk.Entry(self.rangos_frame, width=50)
             self.entry_rangos_u1.grid(row=0, column=1, sticky="w", padx=(6,0))
@@ -354,8 +369,17 @@ class SimuladorApp:
             ttk.Label(self.rangos_frame, text="Rangos U2 (mismo total que U1):").grid(row=1, column=0, sticky="w")
             self.entry_rangos_u2 = ttk.Entry(self.rangos_frame, width=50)
             self.entry_rangos_u2.grid(row=1, column=1, sticky="w", padx=(6,0))
+
+            # Box-Muller completo: cada par (U1, U2) da dos normales (cos y sin).
+            # Si U2 queda vacío, los U de U1 se toman como pares consecutivos.
+            if dist.admite_ambos:
+                ttk.Checkbutton(self.rangos_frame, text="Usar cos y sin (2 normales por par; U2 vacío = pares de U1)",
+                                variable=self.var_ambos).grid(row=3, column=0, columnspan=2, sticky="w", pady=(6,0))
         else:
-            ttk.Label(self.rangos_frame, text="Rangos U (ej: 1-10, 15-20):").grid(row=0, column=0, sticky="w")
+            texto = "Rangos U (ej: 1-10, 15-20):"
+            if dist.claves_u == ('U',) and dist.nombre == "Erlang":
+                texto = "Rangos U (k consecutivos por variable):"
+            ttk.Label(self.rangos_frame, text=texto).grid(row=0, column=0, sticky="w")
             self.entry_rangos = ttk.Entry(self.rangos_frame, width=50)
             self.entry_rangos.grid(row=0, column=1, sticky="w", padx=(6,0))
 
@@ -363,28 +387,28 @@ class SimuladorApp:
         ttk.Button(self.rangos_frame, text="Previsualizar U seleccionados", command=self.preview_u_seleccionados).grid(row=2, column=0, columnspan=2, pady=(8,0))
 
     def preview_u_seleccionados(self):
-        tipo = self.var_tipo.get()
+        dist = buscar_distribucion(self.var_tipo.get())
         txt = ""
-        if not self.numeros_generados:
+        if len(self.numeros_generados) == 0:
             messagebox.showwarning("Aviso", "Primero genera números pseudoaleatorios en la pestaña inicial.")
             return
 
-        if tipo == "Normal":
+        if dist is not None and len(dist.claves_u) > 1:
             idx1 = parse_rangos(self.entry_rangos_u1.get())
             idx2 = parse_rangos(self.entry_rangos_u2.get())
-            if len(idx1) != len(idx2):
+            if idx2 and len(idx1) != len(idx2):
                 messagebox.showerror("Error", "U1 y U2 deben tener la misma cantidad de índices.")
                 return
-            u1 = [self.numeros_generados[i] for i in idx1 if i < len(self.numeros_generados)]
-            u2 = [self.numeros_generados[i] for i in idx2 if i < len(self.numeros_generados)]
-            txt += f"Índices U1: {compactar_indices_1based(idx1)}\n"
-            txt += f"Índices U2: {compactar_indices_1based(idx2)}\n"
+            u1 = tomar_uniformes(self.numeros_generados, idx1[:12])
+            u2 = tomar_uniformes(self.numeros_generados, idx2[:12])
+            txt += f"Índices U1: {idx1.texto()}\n"
+            txt += f"Índices U2: {idx2.texto()}\n"
             txt += "Primeros valores U1:\n" + ", ".join(f"{x:.5f}" for x in u1[:12]) + ("\n" if len(u1) else "\n")
             txt += "Primeros valores U2:\n" + ", ".join(f"{x:.5f}" for x in u2[:12])
         else:
             idx = parse_rangos(self.entry_rangos.get())
-            u = [self.numeros_generados[i] for i in idx if i < len(self.numeros_generados)]
-            txt += f"Índices U: {compactar_indices_1based(idx)}\n"
+            u = tomar_uniformes(self.numeros_generados, idx[:20])
+            txt += f"Índices U: {idx.texto()}\n"
             txt += "Primeros valores U:\n" + ", ".join(f"{x:.5f}" for x in u[:20])
 
         self.preview_u.configure(state="normal")
@@ -393,115 +417,121 @@ class SimuladorApp:
         self.preview_u.configure(state="disabled")
 
     def generar_variable(self):
-        tipo = self.var_tipo.get()
+        dist = buscar_distribucion(self.var_tipo.get())
         nombre = self.entry_nombre_var.get().strip()
         if not nombre:
             messagebox.showwarning("Aviso", "Ingrese un nombre para la variable.")
             return
-        if not self.numeros_generados:
+        if len(self.numeros_generados) == 0:
             messagebox.showwarning("Aviso", "Primero genera números pseudoaleatorios.")
             return
+        if dist is None:
+            messagebox.showerror("Error", "Seleccione una distribución.")
+            return
 
         try:
-            # Obtener parámetros y U según distribución
-            if tipo == "Exponencial":
-                lam = float(self.p1.get())
-                idx = parse_rangos(self.entry_rangos.get())
-                if not idx:
-                    messagebox.showerror("Error", "Especifique rangos de U.")
-                    return
-                U = np.array([self.numeros_generados[i] for i in idx if i < len(self.numeros_generados)])
-                if lam <= 0:
-                    raise ValueError("λ debe ser > 0")
-                valores = -lam * np.log(1.0 - U)
-                params_str = f"λ={lam}"
-
-            elif tipo == "Normal":
-                mu = float(self.p1.get())
-                sigma = float(self.p2.get())
-                if sigma <= 0:
-                    raise ValueError("σ debe ser > 0")
+            # Parámetros de la distribución (la validación la hace el núcleo)
+            params = {}
+            for clave, entrada in self.entradas_param.items():
+                if not entrada.get().strip():
+                    if clave in dist.opcionales:
+                        continue
+                    raise ValueError("Complete todos los parámetros.")
+                params[clave] = entrada.get().strip()
+            if dist.admite_ambos:
+                params["ambos"] = self.var_ambos.get()
+
+            # Rangos de U
+            if len(dist.claves_u) > 1:
                 idx1 = parse_rangos(self.entry_rangos_u1.get())
                 idx2 = parse_rangos(self.entry_rangos_u2.get())
-                if len(idx1) == 0 or len(idx2) == 0:
+                if len(idx1) == 0 or (len(idx2) == 0 and not params.get("ambos")):
                     messagebox.showerror("Error", "Indique rangos para U1 y U2.")
                     return
-                if len(idx1) != len(idx2):
+                if idx2 and len(idx1) != len(idx2):
                     messagebox.showerror("Error", "U1 y U2 deben tener la misma cantidad de índices.")
                     return
-                U1 = np.array([self.numeros_generados[i] for i in idx1 if i < len(self.numeros_generados)])
-                U2 = np.array([self.numeros_generados[i] for i in idx2 if i < len(self.numeros_generados)])
-                # Transformación de Box-Muller modificada
-                # Z = sqrt(-2 * ln(1 - U1)) * cos(2π * U2)
-                Z = np.sqrt(-2.0 * np.log(1.0 - U1)) * np.cos(2.0 * np.pi * U2)
-                # Aplicar media y desviación estándar
-                valores = mu + sigma * Z
-                params_str = f"μ={mu}, σ={sigma}"
-
-            elif tipo == "Poisson":
-                lam = float(self.p1.get())
-                if lam < 0:
-                    raise ValueError("λ debe ser ≥ 0")
-                idx = parse_rangos(self.entry_rangos.get())
-                if not idx:
-                    messagebox.showerror("Error", "Especifique rangos de U.")
-                    return
-                U = [self.numeros_generados[i] for i in idx if i < len(self.numeros_generados)]
-                out = [inv_poisson_u(u, lam) for u in U]
-                valores = np.array(out, dtype=int)
-                params_str = f"λ={lam}"
-
-            elif tipo == "Geométrica":
-                p = float(self.p1.get())
-                if not (0 < p < 1):
-                    raise ValueError("p debe estar en (0,1)")
-                idx = parse_rangos(self.entry_rangos.get())
-                if not idx:
-                    messagebox.showerror("Error", "Especifique rangos de U.")
-                    return
-                U = [self.numeros_generados[i] for i in idx if i < len(self.numeros_generados)]
-                out = [inv_geometrica_u(u, p) for u in U]
-                valores = np.array(out, dtype=int)
-                params_str = f"p={p}"
-
-            elif tipo == "Binomial":
-                n = int(float(self.p1.get()))
-                p = float(self.p2.get())
-                if n < 0:
-                    raise ValueError("n debe ser ≥ 0")
-                if not (0 <= p <= 1):
-                    raise ValueError("p debe estar en [0,1]")
-                idx = parse_rangos(self.entry_rangos.get())
-                if not idx:
+                indices = {"U1": self.entry_rangos_u1.get(), "U2": self.entry_rangos_u2.get()}
+            else:
+                if not parse_rangos(self.entry_rangos.get()):
                     messagebox.showerror("Error", "Especifique rangos de U.")
                     return
-                U = [self.numeros_generados[i] for i in idx if i < len(self.numeros_generados)]
-                out = [inv_binomial_u(u, n, p) for u in U]
-                valores = np.array(out, dtype=int)
-                params_str = f"n={n}, p={p}"
-            else:
-                messagebox.showerror("Error", "Seleccione una distribución.")
-                return
+                indices = {"U": self.entry_rangos.get()}
 
-            # Guardar
-            self.variables_dict[nombre] = valores
-            meta = {
-                "dist": tipo,
-                "params": params_str,
-            }
-            if tipo == "Normal":
-                meta["indices"] = f"U1={compactar_indices_1based(parse_rangos(self.entry_rangos_u1.get()))}; " \
-                                  f"U2={compactar_indices_1based(parse_rangos(self.entry_rangos_u2.get()))}"
-            else:
-                meta["indices"] = f"U={compactar_indices_1based(parse_rangos(self.entry_rangos.get()))}"
-            self.variables_meta[nombre] = meta
+            resultado = self.cache_variables.generar(
+                self.clave_numeros, dist.nombre, self.numeros_generados, nombre, params, indices)
+            valores = resultado[0]
+            if len(valores) == 0:
+                messagebox.showerror("Error", "No se generaron valores (revise los rangos de U).")
+                return
 
-            self.add_variable_row(nombre, tipo, params_str, meta["indices"], len(valores))
-            messagebox.showinfo("Éxito", f"Variable '{nombre}' generada ({len(valores)} valores).")
+            # Ya validada: queda ligada a los números actuales sin volver a generarla
+            tipo = dist.nombre
+            self.definir_variable(nombre, params, lambda numeros: self.cache_variables.generar(
+                self.clave_numeros, tipo, numeros, nombre, params, indices), ("numeros",), resultado)
+            messagebox.showinfo("Éxito", f"Variable '{nombre}' generada ({len(valores)} valores).\n"
+                                         f"{self.cache_variables.resumen()}")
 
         except Exception as e:
             messagebox.showerror("Error", str(e))
 
+    def generar_desde_archivo(self):
+        if len(self.numeros_generados) == 0:
+            messagebox.showwarning("Aviso", "Primero genera números pseudoaleatorios.")
+            return
+        ruta = filedialog.askopenfilename(title="Especificación de variables",
+                                          filetypes=[("JSON", "*.json"), ("Todos", "*.*")])
+        if not ruta:
+            return
+        # Las variables del archivo se regeneran juntas (una pasada) si cambian los números
+        nodo = "lote:" + ruta
+        try:
+            specs = leer_especificaciones(ruta)
+            self.grafo.definir(nodo, partial(generar_variables, specs), ("numeros",))
+            resultado = self.grafo.valor(nodo)
+        except (OSError, ValueError) as e:
+            self.grafo.quitar(nodo)
+            messagebox.showerror("Error", str(e))
+            return
+
+        # resultado conserva el orden de specs
+        for spec, nombre in zip(specs, resultado):
+            self.definir_variable(nombre, spec.params, lambda lote, n=nombre: lote[n], (nodo,))
+        messagebox.showinfo("Éxito", f"{len(resultado)} variables generadas: " + ", ".join(resultado))
+
+    def definir_variable(self, nombre, params, calcular, depende, resultado=None):
+        # Nodo "var:<nombre>" del grafo: calcular(*depende) -> (valores, meta).
+        # resultado, si se da, ya se calculó con los valores actuales de depende
+        # y se usa como primer valor (la caché cuenta la generación una sola vez)
+        def guardar(*args):
+            nonlocal resultado
+            valores, meta = resultado if resultado is not None else calcular(*args)
+            resultado = None
+            # parametros permite recalcular la vista de cálculos
+            meta["parametros"] = params
+            self.variables_dict[nombre] = valores
+            self.variables_meta[nombre] = meta
+            self.add_variable_row(nombre, meta["dist"], meta["params"], meta["indices"], len(valores))
+            return valores
+        self.grafo.definir("var:" + nombre, guardar, depende)
+        return self.grafo.valor("var:" + nombre)
+
+    def variable(self, nombre):
+        # Valores actuales (regenerados si cambiaron los números); None si no existe
+        clave = "var:" + nombre
+        return self.grafo.valor(clave) if clave in self.grafo else None
+
+    def on_cambio_pestana(self, event=None):
+        # Solo se recalcula lo que se va a mostrar
+        actual = self.notebook.nametowidget(self.notebook.select())
+        if actual is self.tab_var_generadas:
+            for nombre in list(self.variables_dict):
+                self.variable(nombre)
+        elif actual is self.tab_colas and "colas" in self.grafo and self.grafo.sucio("colas"):
+            self.mostrar_colas(*self.grafo.valor("colas"))
+        elif actual is self.tab_entregas and "entregas" in self.grafo and self.grafo.sucio("entregas"):
+            self.mostrar_tabla(self.tree_entregas, self.grafo.valor("entregas"))
+
     # ------------------- Pestaña Variables Generadas -------------------
     def init_tab_var_generadas(self):
         cols = ("nombre", "dist", "params", "indices", "cant")
@@ -528,14 +558,14 @@ class SimuladorApp:
         self.tree_vars.bind("<Double-1>", self.ver_valores_variable)
 
     def add_variable_row(self, nombre, dist, params, indices, cant):
-        # agregar o reemplazar si ya existe
-        # primero borrar línea previa con mismo nombre (si existe)
+        # agregar o reemplazar (en su lugar) si ya existe
         for item in self.tree_vars.get_children():
             vals = self.tree_vars.item(item, "values")
             if vals and vals[0] == nombre:
-                self.tree_vars.delete(item)
+                self.tree_vars.item(item, values=(nombre, dist, params, indices, cant))
                 break
-        self.tree_vars.insert("", "end", values=(nombre, dist, params, indices, cant))
+        else:
+            self.tree_vars.insert("", "end", values=(nombre, dist, params, indices, cant))
         # refrescar combos en tablas
         self.refresh_combos_tablas()
 
@@ -547,7 +577,7 @@ class SimuladorApp:
         if not vals:
             return
         nombre = vals[0]
-        data = self.variables_dict.get(nombre, None)
+        data = self.variable(nombre)
         if data is None:
             return
             
@@ -609,14 +639,20 @@ class SimuladorApp:
             
             idx1 = parse_rangos(u1_part.replace("U1=", "").strip())
             idx2 = parse_rangos(u2_part.replace("U2=", "").strip())
-            
-            if idx1 and idx2 and len(idx1) == len(idx2):
-                U1 = [self.numeros_generados[i] for i in idx1 if i < len(self.numeros_generados)]
-                U2 = [self.numeros_generados[i] for i in idx2 if i < len(self.numeros_generados)]
-                
+            ambos = meta.get("modo") == "ambos"
+            U1 = U2 = None
+            if ambos and indices_text.startswith("U="):
+                # Un solo rango tomado como pares consecutivos (U1, U2)
+                U = tomar_uniformes(self.numeros_generados, parse_rangos(indices_text.replace("U=", "").strip()))
+                U1, U2 = U[0:len(U) - len(U) % 2:2], U[1::2]
+            elif idx1 and idx2 and len(idx1) == len(idx2):
+                U1 = tomar_uniformes(self.numeros_generados, idx1)
+                U2 = tomar_uniformes(self.numeros_generados, idx2)
+
+            if U1 is not None:
                 # Obtener parámetros
                 mu = float(meta["params"].split("μ=")[1].split(",")[0])
-                sigma = float(meta["params"].split("σ=")[1])
+                sigma = float(meta["params"].split("σ=")[1].split(",")[0])
                 
                 # Encabezado
                 txt_calc.insert(tk.END, "Cálculos para Distribución Normal\n" + "="*80 + "\n\n")
@@ -648,11 +684,21 @@ class SimuladorApp:
                         f"{sqrt_term:>15.6f}   {two_pi_u2:>10.6f}   "
                         f"{cos_term:>10.6f}   {Z:>10.6f}   {X:>10.6f}\n"
                     )
+                    if ambos:
+                        # Segunda normal del mismo par, con sin(2πU2)
+                        sin_term = math.sin(two_pi_u2)
+                        Z2 = sqrt_term * sin_term
+                        txt_calc.insert(tk.END,
+                            f"{'':<5} {'':<8}   {'':<8}   {'':>12}   {'':>15}   {'sin':>10}   "
+                            f"{sin_term:>10.6f}   {Z2:>10.6f}   {mu + sigma * Z2:>10.6f}\n"
+                        )
                 
                 # Explicación del cálculo
                 txt_calc.insert(tk.END, "\n" + "="*80 + "\n")
                 txt_calc.insert(tk.END, "Fórmula de transformación de Box-Muller:\n\n")
                 txt_calc.insert(tk.END, "Z = √(-2·ln(1-U₁)) · cos(2π·U₂)\n")
+                if ambos:
+                    txt_calc.insert(tk.END, "Z' = √(-2·ln(1-U₁)) · sin(2π·U₂)  (segunda normal, independiente)\n")
                 txt_calc.insert(tk.END, "X = μ + σ·Z\n\n")
                 txt_calc.insert(tk.END, "Donde:\n")
                 txt_calc.insert(tk.END, "- U₁, U₂ son números aleatorios ~U(0,1)\n")
@@ -662,7 +708,7 @@ class SimuladorApp:
         elif dist == "Exponencial":
             # Cálculos para distribución Exponencial
             idx = parse_rangos(indices_text.replace("U=", "").strip())
-            U = [self.numeros_generados[i] for i in idx if i < len(self.numeros_generados)]
+            U = tomar_uniformes(self.numeros_generados, idx)
             
             # Obtener parámetro lambda
             lam = float(meta["params"].split("λ=")[1])
@@ -701,7 +747,7 @@ class SimuladorApp:
         elif dist == "Poisson":
             # Cálculos para distribución Poisson
             idx = parse_rangos(indices_text.replace("U=", "").strip())
-            U = [self.numeros_generados[i] for i in idx if i < len(self.numeros_generados)]
+            U = tomar_uniformes(self.numeros_generados, idx)
             
             # Obtener parámetro lambda
             lam = float(meta["params"].split("λ=")[1])
@@ -715,11 +761,28 @@ class SimuladorApp:
                                   f"{'Acumulado':<15} {'¿P ≤ U?':<10} {'X':<5}\n")
             txt_calc.insert(tk.END, "-"*80 + "\n")
             
+            # Con λ grande e^{-λ} se anula y el recorrido desde k = 0 sería enorme:
+            # se muestran solo el último k rechazado y el aceptado.
+            resumido = lam > PASOS_DETALLE
+            if resumido:
+                txt_calc.insert(tk.END, f"(λ > {PASOS_DETALLE:g}: se omiten los k anteriores)\n")
+
             # Mostrar cálculos para cada U
             for i, u in enumerate(U):
                 if i >= len(data):
                     break
-                
+
+                if resumido:
+                    k = int(inv_poisson_np(u, lam))
+                    txt_calc.insert(tk.END, f"{i+1:<5} {u:.6f}   ")
+                    if k > 0:
+                        p, F = poisson_acumulada(k - 1, lam)
+                        txt_calc.insert(tk.END, f"{k-1:<5} {p:>10.6f}   {F:>10.6f}   {'No':<10} {k-1}\n")
+                    p, F = poisson_acumulada(k, lam)
+                    txt_calc.insert(tk.END, f"{k:<5} {p:>10.6f}   {F:>10.6f}   {'Sí':<10} {k}\n")
+                    txt_calc.insert(tk.END, "-"*80 + "\n")
+                    continue
+
                 # Algoritmo de transformación inversa para Poisson
                 k = 0
                 p = math.exp(-lam)  # P(X=0)
@@ -758,7 +821,7 @@ class SimuladorApp:
         elif dist == "Geométrica":
             # Cálculos para distribución Geométrica
             idx = parse_rangos(indices_text.replace("U=", "").strip())
-            U = [self.numeros_generados[i] for i in idx if i < len(self.numeros_generados)]
+            U = tomar_uniformes(self.numeros_generados, idx)
             
             # Obtener parámetro p
             p = float(meta["params"].split("p=")[1])
@@ -801,7 +864,7 @@ class SimuladorApp:
         elif dist == "Binomial":
             # Cálculos para distribución Binomial
             idx = parse_rangos(indices_text.replace("U=", "").strip())
-            U = [self.numeros_generados[i] for i in idx if i < len(self.numeros_generados)]
+            U = tomar_uniformes(self.numeros_generados, idx)
             
             # Obtener parámetros n y p
             n = int(meta["params"].split("n=")[1].split(",")[0])
@@ -817,11 +880,28 @@ class SimuladorApp:
                                   f"{'Acumulado':<15} {'¿P ≤ U?':<10} {'X':<5}\n")
             txt_calc.insert(tk.END, "-"*80 + "\n")
             
+            # Con n·p grande el recorrido desde k = 0 sería muy largo (y (1-p)^n
+            # puede anularse): se muestran solo el último k rechazado y el aceptado.
+            resumido = n * p > PASOS_DETALLE
+            if resumido:
+                txt_calc.insert(tk.END, f"(n·p > {PASOS_DETALLE:g}: se omiten los k anteriores)\n")
+
             # Mostrar cálculos para cada U
             for i, u in enumerate(U):
                 if i >= len(data):
                     break
-                
+
+                if resumido:
+                    k = int(inv_binomial_np(u, n, p))
+                    txt_calc.insert(tk.END, f"{i+1:<5} {u:.6f}   ")
+                    if k > 0:
+                        p_k, F = binomial_acumulada(k - 1, n, p)
+                        txt_calc.insert(tk.END, f"{k-1:<5} {p_k:>10.6f}   {F:>10.6f}   {'No':<10} {k-1}\n")
+                    p_k, F = binomial_acumulada(k, n, p)
+                    txt_calc.insert(tk.END, f"{k:<5} {p_k:>10.6f}   {F:>10.6f}   {'Sí':<10} {k}\n")
+                    txt_calc.insert(tk.END, "-"*80 + "\n")
+                    continue
+
                 # Algoritmo de transformación inversa para Binomial
                 k = 0
                 q = 1 - p
@@ -861,6 +941,25 @@ class SimuladorApp:
             txt_calc.insert(tk.END, f"- p es la probabilidad de éxito en cada ensayo (p = {p})\n")
             txt_calc.insert(tk.END, "- X es el número de éxitos en n ensayos\n")
 
+        else:
+            # Resto de distribuciones del registro: U de cada variable y valor obtenido
+            d = buscar_distribucion(dist)
+            if d is not None and "parametros" in meta:
+                p = d.validar(meta["parametros"])
+                U, _ = d.tomar(self.numeros_generados, indices_desde_texto(indices_text), p)
+                por_grupo = d.variables_por_grupo(p)
+                txt_calc.insert(tk.END, f"Cálculos para Distribución {dist}\n" + "="*80 + "\n\n")
+                txt_calc.insert(tk.END, f"Parámetros: {meta.get('params', '')}\n")
+                txt_calc.insert(tk.END, f"{d.formula}\n\n")
+                txt_calc.insert(tk.END, f"{'i':<8} {'U':<30} {'X':<12}\n" + "-"*80 + "\n")
+                filas = min(len(U), MAX_FILAS_NUMEROS)
+                for i in range(filas):
+                    us = ", ".join(f"{u:.6f}" for u in np.atleast_1d(U[i]))
+                    xs = ", ".join(f"{x:.6f}" for x in data[i * por_grupo:(i + 1) * por_grupo])
+                    txt_calc.insert(tk.END, f"{i+1:<8} {us:<30} {xs}\n")
+                if filas < len(U):
+                    txt_calc.insert(tk.END, f"... (se muestran las primeras {filas} filas)\n")
+
     # ------------------- Pestaña Colas -------------------
     def init_tab_colas(self):
         cont = ttk.Frame(self.tab_colas, padding=14)
@@ -877,11 +976,34 @@ class SimuladorApp:
         self.cb_atencion = ttk.Combobox(sel, state="readonly", width=24, values=[])
         self.cb_atencion.pack(side="left", padx=(6,20))
 
+        # c servidores idénticos ("3") o la velocidad de cada uno ("1, 1.5, 0.8")
+        ttk.Label(sel, text="Servidores:").pack(side="left")
+        self.e_servidores = ttk.Entry(sel, width=12)
+        self.e_servidores.pack(side="left", padx=(6,20))
+        self.e_servidores.insert(0, "1")
+
         ttk.Button(sel, text="Generar Tabla de Colas", command=self.generar_tabla_colas).pack(side="left")
+        # Solo estadísticos (un servidor, sin tabla): sirve para variables muy largas
+        ttk.Button(sel, text="Solo resumen", command=self.resumen_colas).pack(side="left", padx=(8,0))
+
+        # Opcionales: cola finita, desistimiento, abandono y prioridades (por variable)
+        opc = ttk.Frame(cont)
+        opc.pack(fill="x", pady=(0,10))
+        ttk.Label(opc, text="Capacidad cola:").pack(side="left")
+        self.e_cap_cola = ttk.Entry(opc, width=8)
+        self.e_cap_cola.pack(side="left", padx=(6,16))
+        self.cb_prioridad = self._combo_opcional(opc, "Prioridad (menor = primero):")
+        self.cb_paciencia = self._combo_opcional(opc, "Paciencia:")
+        self.cb_umbral = self._combo_opcional(opc, "Umbral de cola:")
+        self.var_expropiativa = tk.BooleanVar(value=False)
+        ttk.Checkbutton(opc, text="Expropiativa", variable=self.var_expropiativa).pack(side="left")
+
+        self.lbl_resumen_colas = ttk.Label(cont, text="")
+        self.lbl_resumen_colas.pack(fill="x")
 
         cols = ("cliente","tiempo_llegada","tiempo_arribo","inicio_atencion",
                 "tiempo_atencion","fin_atencion","tiempo_inspeccion",
-                "tiempo_espera","tiempo_prom_inspeccion")
+                "tiempo_espera","tiempo_prom_inspeccion","servidor","prioridad","estado")
 
         self.tree_colas = ttk.Treeview(cont, columns=cols, show="headings", height=20)
         headers = {
@@ -893,7 +1015,10 @@ class SimuladorApp:
             "fin_atencion":"Fin de atención",
             "tiempo_inspeccion":"Tiempo en inspección",
             "tiempo_espera":"Tiempo en espera",
-            "tiempo_prom_inspeccion":"Tiempo promedio inspección"
+            "tiempo_prom_inspeccion":"Tiempo promedio inspección",
+            "servidor":"Servidor",
+            "prioridad":"Prioridad",
+            "estado":"Estado"
         }
         for c in cols:
             self.tree_colas.heading(c, text=headers[c])
@@ -910,39 +1035,63 @@ class SimuladorApp:
         if not nombre_lleg or not nombre_aten:
             messagebox.showerror("Error", "Seleccione las dos variables (llegada y atención).")
             return
-        llegada = np.array(self.variables_dict.get(nombre_lleg, []), dtype=float)
-        atencion = np.array(self.variables_dict.get(nombre_aten, []), dtype=float)
-        if llegada.size == 0 or atencion.size == 0:
+        llegada = self.variable(nombre_lleg)
+        atencion = self.variable(nombre_aten)
+        if llegada is None or atencion is None or len(llegada) == 0 or len(atencion) == 0:
             messagebox.showerror("Error", "Alguna variable no tiene datos.")
             return
 
-        n = int(min(len(llegada), len(atencion)))
-        for i in self.tree_colas.get_children():
-            self.tree_colas.delete(i)
-
-        tiempo_arribo = 0.0
-        fin_atencion_prev = 0.0
-        prom = 0.0
-        for i in range(n):
-            cliente = i + 1
-            A = float(llegada[i])  # Tiempo de llegada (inter-arribo)
-            if i == 0:
-                B = A  # tiempo de arribo
+        extras = {clave: cb.get() for clave, cb in
+                  (("prioridad", self.cb_prioridad), ("paciencia", self.cb_paciencia), ("umbral", self.cb_umbral))}
+        extras = {clave: nombre for clave, nombre in extras.items() if nombre}
+        expropiativa = self.var_expropiativa.get()
+
+        # Ligada a las variables usadas: se rehace si alguna se regenera
+        try:
+            servidores = leer_servidores(self.e_servidores.get())
+            cap_txt = self.e_cap_cola.get().strip()
+            capacidad = int(float(cap_txt)) if cap_txt else None
+            if extras or capacidad is not None or expropiativa:
+                if not isinstance(servidores, int):
+                    raise ValueError("con límites o prioridades los servidores deben ser idénticos (ingrese c)")
+                claves = tuple(extras)
+
+                def calcular(lleg, aten, *valores):
+                    filas, resumen = simulate_colas_avanzada(
+                        lleg, aten, servidores, capacidad, expropiativa=expropiativa, **dict(zip(claves, valores)))
+                    return filas, resumen.texto()
             else:
-                B = tiempo_arribo + A
-            C = max(B, fin_atencion_prev)        # inicio atención
-            D = float(atencion[i])               # tiempo atención
-            E = C + D                             # fin atención
-            F = E - B                             # tiempo en inspección
-            G = C - B                             # tiempo en espera
-            prom = F if i == 0 else (prom * i + F) / (i + 1)  # promedio
-            # guardar para siguiente iteración
-            tiempo_arribo = B
-            fin_atencion_prev = E
-
-            self.tree_colas.insert("", "end",
-                values=(cliente, round(A,2), round(B,2), round(C,2),
-                        round(D,2), round(E,2), round(F,2), round(G,2), round(prom,2)))
+                def calcular(lleg, aten):
+                    return simulate_colas_servidores(lleg, aten, servidores), ""
+            depende = tuple("var:" + n for n in (nombre_lleg, nombre_aten, *extras.values()))
+            self.grafo.definir("colas", calcular, depende)
+            filas, resumen = self.grafo.valor("colas")
+        except ValueError as e:
+            self.grafo.quitar("colas")
+            messagebox.showerror("Error", f"Parámetros inválidos: {e}")
+            return
+        self.mostrar_colas(filas, resumen)
+
+    def resumen_colas(self):
+        llegada = self.variable(self.cb_llegada.get())
+        atencion = self.variable(self.cb_atencion.get())
+        if llegada is None or atencion is None:
+            messagebox.showerror("Error", "Seleccione las dos variables (llegada y atención).")
+            return
+        r = simulate_colas_resumen(llegada, atencion)
+        messagebox.showinfo("Resumen de la cola",
+                            f"Clientes: {r.clientes}\n\nTiempo en espera:\n{r.espera.texto()}\n\n"
+                            f"Tiempo en el sistema:\n{r.sistema.texto()}")
+
+    def mostrar_colas(self, filas, resumen):
+        self.lbl_resumen_colas.config(text=resumen)
+        self.mostrar_tabla(self.tree_colas, filas)
+
+    def _combo_opcional(self, padre, texto):
+        ttk.Label(padre, text=texto).pack(side="left")
+        cb = ttk.Combobox(padre, state="readonly", width=16, values=[""])
+        cb.pack(side="left", padx=(6,16))
+        return cb
 
     # ------------------- Pestaña Entregas -------------------
     def init_tab_entregas(self):
@@ -1040,8 +1189,8 @@ class SimuladorApp:
         if not nombre:
             messagebox.showerror("Error", "Seleccione la variable de demanda.")
             return
-        demanda = np.array(self.variables_dict.get(nombre, []), dtype=float)
-        if demanda.size == 0:
+        demanda = self.variable(nombre)
+        if demanda is None or len(demanda) == 0:
             messagebox.showerror("Error", "La variable de demanda no tiene datos.")
             return
 
@@ -1057,54 +1206,25 @@ class SimuladorApp:
             messagebox.showerror("Error", "Parámetros numéricos inválidos.")
             return
 
-        # Limpiar tabla
-        for i in self.tree_entregas.get_children():
-            self.tree_entregas.delete(i)
-
-        suma_costos = 0.0
-        inv_actual = inv
-
-        for i, dem in enumerate(demanda, start=1):
-            pedido = 0
-            entrega_recibida = 0
-            costo_ord = 0.0
-
-            # Recepción al inicio del día si corresponde
-            if i > 1 and frec_entrega > 0 and (i % frec_entrega == 0):
-                pedido = max(0, entrega_q)
-                espacio = max(0, cap_max - inv_actual)
-                entrega_recibida = min(pedido, espacio)
-                if entrega_recibida > 0:
-                    inv_actual += entrega_recibida
-                    costo_ord = c_orden
-
-            inv_inicial = inv_actual
-
-            ventas = min(inv_inicial, dem)
-            inv_final = inv_inicial - ventas
-
-            # Cálculo de costos
-            costo_inv = ((inv_inicial + inv_final) / 2.0) * c_inv_u
-            costo_falt = max(0.0, dem - ventas) * c_falt_u
-            costo_total = costo_ord + costo_inv + costo_falt
-            suma_costos += costo_total
-            costo_prom = suma_costos / i
-
-            # Insertar fila en Treeview
-            self.tree_entregas.insert("", "end",
-                                      values=(i, round(pedido, 2), round(entrega_recibida, 2), round(inv_inicial, 2), round(dem, 2),
-                                              round(ventas, 2), round(inv_final, 2), round(costo_ord, 2),
-                                              round(costo_inv, 2), round(costo_falt, 2),
-                                              round(costo_total, 2), round(costo_prom, 2)))
-
-            inv_actual = inv_final
+        calcular = partial(simulate_entregas, inv_inicial=inv, entrega_q=entrega_q, frec_entrega=frec_entrega,
+                           cap_max=cap_max, c_orden=c_orden, c_inv_u=c_inv_u, c_falt_u=c_falt_u)
+        self.grafo.definir("entregas", calcular, ("var:" + nombre,))
+        self.mostrar_tabla(self.tree_entregas, self.grafo.valor("entregas"))
 
     # -------- util --------
+    def mostrar_tabla(self, tree, filas):
+        for i in tree.get_children():
+            tree.delete(i)
+        for fila in filas:
+            tree.insert("", "end", values=fila)
+
     def refresh_combos_tablas(self):
         nombres = list(self.variables_dict.keys())
         self.cb_llegada["values"] = nombres
         self.cb_atencion["values"] = nombres
         self.cb_demanda["values"] = nombres
+        for cb in (self.cb_prioridad, self.cb_paciencia, self.cb_umbral):
+            cb["values"] = [""] + nombres
 
 # ------------------- Main -------------------
 if __name__ == "__main__":
@@ -5,7 +5,7 @@ package.domain = org.frea.simulador
 source.dir = .
 source.include_exts = py,kv,md
 version = 0.1.0
-requirements = python3,kivy==2.3.0,kivymd==1.2.0
+requirements = python3,kivy==2.3.0,kivymd==1.2.0,numpy
 orientation = portrait
 fullscreen = 0
 android.archs = arm64-v8a, armeabi-v7a
@@ -1,9 +1,26 @@
+import bisect
+import heapq
+import itertools
+import json
 import math
-from typing import List, Tuple, Dict
+import os
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache, partial, wraps
+from typing import Callable, Deque, Iterator, List, NamedTuple, Optional, Tuple, Dict, Union
+
+import numpy as np
 
 Row = Tuple[int, float, float, float, float, float, float, float, float, float, float, float]
 
 
+class EstadoEntregas(NamedTuple):
+    """Lo que pasa de un tramo de días al siguiente en simulate_entregas_tramo."""
+    dia: int = 0                # días ya simulados
+    inv_actual: float = 0.0     # inventario final del último día
+    suma_costos: float = 0.0    # suma de costo_total (para costo_prom)
+
+
 def simulate_entregas(
     demanda: List[float],
     inv_inicial: int,
@@ -21,12 +38,39 @@ def simulate_entregas(
     (dia, pedido, entrega, inv_inicial, demanda, ventas, inv_final,
      costo_orden, costo_inv, costo_falt, costo_total, costo_prom)
     """
+    rows, _ = simulate_entregas_tramo(
+        demanda, inv_inicial, entrega_q, frec_entrega, cap_max, c_orden, c_inv_u, c_falt_u
+    )
+    return rows
+
+
+def simulate_entregas_tramo(
+    demanda: List[float],
+    inv_inicial: int,
+    entrega_q: int,
+    frec_entrega: int,
+    cap_max: int,
+    c_orden: float,
+    c_inv_u: float,
+    c_falt_u: float,
+    estado: Optional[EstadoEntregas] = None,
+) -> Tuple[List[Row], EstadoEntregas]:
+    """
+    simulate_entregas a partir de estado (None = día 1 con inv_inicial).
+
+    Devuelve las filas del tramo, numeradas desde estado.dia + 1, y el estado
+    para continuar con la demanda de los días siguientes; simular por tramos
+    da las mismas filas que una sola corrida.
+    """
     rows: List[Row] = []
 
-    inv_actual = float(inv_inicial)
-    suma_costos = 0.0
+    if estado is None:
+        estado = EstadoEntregas(0, float(inv_inicial), 0.0)
+    inv_actual = float(estado.inv_actual)
+    suma_costos = float(estado.suma_costos)
+    i = estado.dia
 
-    for i, dem in enumerate(demanda, start=1):
+    for i, dem in enumerate(demanda, start=estado.dia + 1):
         pedido = 0.0
         entrega_recibida = 0.0
         costo_ord = 0.0
@@ -71,7 +115,8 @@ def simulate_entregas(
 
         inv_actual = inv_final
 
-    return rows
+    return rows, EstadoEntregas(i, inv_actual, suma_costos)
+
 
 # ---------------- RNG & helpers ----------------
 def rng_congruencial_mixto(x0: int, a: int, c: int, m: int, n: int) -> List[float]:
@@ -94,165 +139,3310 @@ def rng_congruencial_multiplicativo(x0: int, a: int, m: int, n: int) -> List[flo
         out.append(x / m)
     return out
 
-def parse_rangos(txt: str) -> List[int]:
-    if not txt or not txt.strip():
-        return []
-    parts = [p.strip() for p in txt.split(',')]
-    idxs = set()
-    for p in parts:
-        if not p:
-            continue
-        if '-' in p:
-            try:
-                a, b = p.split('-')
-                a = int(a); b = int(b)
-                if a > b:
-                    a, b = b, a
-                for i in range(a, b + 1):
-                    if i >= 1:
-                        idxs.add(i - 1)
-            except:
-                continue
+# Módulo máximo que admite la aritmética vectorizada sobre uint64.
+_LCG_M_MAX = 1 << 64
+
+
+def _addmod(x: np.ndarray, y, m: int) -> np.ndarray:
+    """(x + y) % m con x, y < m en uint64, sin desbordar aunque m > 2^63."""
+    return np.where(x >= m - y, x - (m - y), x + y)
+
+
+def _mulalto(x: np.ndarray, a: int) -> np.ndarray:
+    """64 bits altos del producto exacto a·x (a < 2^64), por trozos de 32 bits."""
+    m32 = np.uint64(0xFFFFFFFF)
+    s32 = np.uint64(32)
+    al, ah = np.uint64(a & 0xFFFFFFFF), np.uint64(a >> 32)
+    # Operaciones en el lugar: con arreglos grandes los temporarios pesan tanto como las cuentas.
+    xl = x & m32
+    xh = x >> s32
+    medio = xl * al
+    medio >>= s32           # acarreo de xl·al
+    xl *= ah                # xl·ah
+    hl = xh * al            # xh·al
+    xh *= ah                # xh·ah
+    medio += xl & m32
+    medio += hl & m32
+    medio >>= s32
+    xl >>= s32
+    hl >>= s32
+    xh += xl
+    xh += hl
+    xh += medio
+    return xh
+
+
+def _mul128(x: np.ndarray, a: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Producto exacto a·x (a < 2^64) como (alto, bajo) en uint64; bajo es el producto con desborde."""
+    return _mulalto(x, a), x * np.uint64(a)
+
+
+def _mulmod(x: np.ndarray, a: int, m: int) -> np.ndarray:
+    """
+    (a * x) % m sobre un arreglo uint64 con x < m, para cualquier m <= 2^64.
+
+    Según m: potencia de 2 (el desborde de uint64 ya reduce), m <= 2^32 (el
+    producto cabe), Mersenne m = 2^k − 1 (un plegado del producto de 128
+    bits), método de Schrage si a² < m aproximadamente, reducción de
+    Montgomery para el resto de m impares y, para m = 2^s·m' par, el resto
+    módulo 2^s (desborde) y módulo m' (Montgomery) unidos por el teorema
+    chino del resto.
+    """
+    mu = np.uint64(m % _LCG_M_MAX)
+    if m & (m - 1) == 0:
+        p = x * np.uint64(a % _LCG_M_MAX)
+        return p if m == _LCG_M_MAX else p & (mu - np.uint64(1))
+    if m <= 1 << 32:
+        return (x * np.uint64(a)) % mu
+    k = m.bit_length()
+    if m == (1 << k) - 1:
+        # 2^k ≡ 1 (mod m): V = q·2^k + t ≡ q + t, con q, t < 2^k porque V < m².
+        alto, bajo = _mul128(x, a)
+        t = bajo & mu
+        if k == 64:
+            s = alto + t
+            s += s < alto       # el acarreo 2^64 vale 1
         else:
+            s = ((alto << np.uint64(64 - k)) | (bajo >> np.uint64(k))) + t
+            s = (s & mu) + (s >> np.uint64(k))
+        return np.where(s >= mu, s - mu, s)
+    if a == 0:
+        return np.zeros_like(x)
+    q, r = divmod(m, a)
+    if r < q:
+        # Schrage: a·x mod m = a·(x mod q) − r·(x div q), ambos términos < m.
+        t1 = np.uint64(a) * (x % np.uint64(q))
+        t2 = np.uint64(r) * (x // np.uint64(q))
+        return np.where(t1 >= t2, t1 - t2, t1 + (mu - t2))
+    if m & 1:
+        return _montgomery(x, a, m)
+    # m = 2^s·m' con m' impar > 1: se combinan a·x mod 2^s y a·x mod m'.
+    s = (m & -m).bit_length() - 1
+    impar = m >> s
+    mascara = np.uint64((1 << s) - 1)
+    r2 = (x * np.uint64(a % _LCG_M_MAX)) & mascara
+    ro = _mulmod(x % np.uint64(impar), a % impar, impar)
+    # a·x = ro + m'·t con t = (r2 − ro)·m'^{-1} mod 2^s; el resultado es < m.
+    t = ((r2 - ro) * np.uint64(pow(impar, -1, 1 << s))) & mascara
+    return ro + np.uint64(impar) * t
+
+
+def _montgomery(x: np.ndarray, a: int, m: int) -> np.ndarray:
+    """(a * x) % m para m impar por reducción de Montgomery; vale con cualquier x < 2^64."""
+    # Con a' = a·2^64 mod m, REDC(x·a') = x·a mod m sin dividir.
+    mu = np.uint64(m % _LCG_M_MAX)
+    alto, bajo = _mul128(x, (a << 64) % m)
+    t = bajo * np.uint64((-pow(m, -1, _LCG_M_MAX)) % _LCG_M_MAX)
+    alto_tm = _mulalto(t, m)
+    # (x·a' + t·m) / 2^64; la parte baja se anula y solo aporta su acarreo.
+    u1 = alto + alto_tm
+    u = u1 + (bajo != 0)
+    desborde = (u1 < alto) | (u < u1)
+    return np.where(desborde | (u >= mu), u - mu, u)
+
+
+def _afin(x: np.ndarray, a: int, c, m: int) -> np.ndarray:
+    """(a * x + c) % m sobre uint64, con a < m y c < m (escalar o arreglo)."""
+    if m & (m - 1) == 0:
+        p = x * np.uint64(a) + c
+        return p if m == _LCG_M_MAX else p & np.uint64(m - 1)
+    if m <= 1 << 32:
+        # (m−1)² + (m−1) < 2^64: una sola reducción.
+        return (x * np.uint64(a) + c) % np.uint64(m)
+    return _addmod(_mulmod(x, a, m), c, m)
+
+
+def lcg_salto(a: int, c: int, m: int, k: int) -> Tuple[int, int]:
+    """
+    Coeficientes (A, C) del salto de k pasos: x_{n+k} = (A * x_n + C) % m.
+
+    Es la forma cerrada A = a^k, C = c·(a^k − 1)/(a − 1) (mod m), calculada
+    por duplicación en O(log k) para no tener que dividir entre (a − 1).
+    """
+    A, C = 1 % m, 0
+    ak, ck = a % m, c % m
+    while k > 0:
+        if k & 1:
+            A, C = (ak * A) % m, (ak * C + ck) % m
+        ak, ck = (ak * ak) % m, (ak * ck + ck) % m
+        k >>= 1
+    return A, C
+
+
+def _lcg_estados(x0: int, a: int, c: int, m: int, n: int) -> np.ndarray:
+    """Estados x_1..x_n del LCG, generados por bloques que se duplican en tamaño."""
+    a %= m
+    c %= m
+    if m > _LCG_M_MAX:
+        # Fuera de uint64: recorrido secuencial con enteros de Python.
+        x = x0
+        out = []
+        for _ in range(n):
+            x = (a * x + c) % m
+            out.append(x)
+        return np.array(out, dtype=object)
+    x = np.empty(n, dtype=np.uint64)
+    x[0] = (a * x0 + c) % m
+    k = 1
+    while k < n:
+        t = min(k, n - k)
+        A, C = lcg_salto(a, c, m, k)
+        # x_{k+i} = A·x_i + C para el bloque [k, k + t)
+        x[k:k + t] = _afin(x[:t], A, np.uint64(C), m)
+        k += t
+    return x
+
+
+def _a_uniformes(estados: np.ndarray, m: int) -> np.ndarray:
+    """
+    estados / m como float64. Es exacto e idéntico a x / m de Python si m <= 2^53
+    o m es potencia de 2; con otros m mayores puede diferir en el último bit.
+    """
+    if estados.dtype == object:
+        return (estados / m).astype(np.float64)
+    return estados.astype(np.float64) / float(m)
+
+
+def rng_congruencial_mixto_np(x0: int, a: int, c: int, m: int, n: int) -> np.ndarray:
+    """Igual que rng_congruencial_mixto, pero por bloques y como arreglo float64."""
+    if m <= 0 or n <= 0:
+        return np.empty(0, dtype=np.float64)
+    return _a_uniformes(_lcg_estados(x0, a, c, m, n), m)
+
+
+def rng_congruencial_multiplicativo_np(x0: int, a: int, m: int, n: int) -> np.ndarray:
+    """Igual que rng_congruencial_multiplicativo, pero por bloques y como arreglo float64."""
+    return rng_congruencial_mixto_np(x0, a, 0, m, n)
+
+
+def _lcg_saltos(a: int, c: int, m: int, k: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Versión vectorizada de lcg_salto: coeficientes (A_k, C_k) para cada k del arreglo."""
+    A = np.full(k.shape, 1 % m, dtype=np.uint64)
+    C = np.zeros(k.shape, dtype=np.uint64)
+    ak, ck = a % m, c % m
+    kmax = int(k.max()) if k.size else 0
+    b = 0
+    while (kmax >> b) > 0:
+        sel = ((k >> b) & 1).astype(bool)
+        if sel.any():
+            A[sel] = _mulmod(A[sel], ak, m)
+            C[sel] = _afin(C[sel], ak, np.uint64(ck), m)
+        ak, ck = (ak * ak) % m, (ak * ck + ck) % m
+        b += 1
+    return A, C
+
+
+class UniformStream:
+    """
+    Secuencia perezosa de n uniformes de un LCG (mixto o, con c=0, multiplicativo).
+
+    Solo guarda (x0, a, c, m): el valor de índice i (0-based) es x_{inicio+i+1} / m
+    y se calcula bajo demanda con saltos, de modo que direccionar "1-50000000"
+    no obliga a generar los números que no se usan. Admite enteros, slices y
+    arreglos de índices; los valores coinciden con rng_congruencial_mixto.
+    """
+
+    def __init__(self, x0: int, a: int, c: int, m: int, n: int, inicio: int = 0):
+        if m <= 0:
+            raise ValueError("El módulo m debe ser > 0")
+        if m > _LCG_M_MAX:
+            raise ValueError("El módulo m debe ser <= 2^64")
+        self.x0 = x0 % m
+        self.a = a % m
+        self.c = c % m
+        self.m = m
+        self.n = max(0, n)
+        self.inicio = inicio
+
+    def __repr__(self) -> str:
+        return (f"UniformStream(x0={self.x0}, a={self.a}, c={self.c}, m={self.m}, "
+                f"n={self.n}, inicio={self.inicio})")
+
+    def __len__(self) -> int:
+        return self.n
+
+    def __iter__(self):
+        for ini in range(0, self.n, 65536):
+            yield from self[ini:ini + 65536].tolist()
+
+    def estado(self, i: int) -> int:
+        """Estado entero del LCG que produce el valor de índice i."""
+        A, C = lcg_salto(self.a, self.c, self.m, self.inicio + i + 1)
+        return (A * self.x0 + C) % self.m
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            ini, fin, paso = key.indices(self.n)
+            if paso < 0:
+                return self[np.arange(ini, fin, paso)]
+            cantidad = len(range(ini, fin, paso))
+            if cantidad == 0:
+                return np.empty(0, dtype=np.float64)
+            # Con paso s la subsecuencia es otro LCG con coeficientes (A_s, C_s).
+            primero = self.estado(ini)
+            A, C = lcg_salto(self.a, self.c, self.m, paso)
+            estados = np.empty(cantidad, dtype=np.uint64)
+            estados[0] = primero
+            if cantidad > 1:
+                estados[1:] = _lcg_estados(primero, A, C, self.m, cantidad - 1)
+            return _a_uniformes(estados, self.m)
+        if isinstance(key, (int, np.integer)):
+            i = int(key)
+            if i < 0:
+                i += self.n
+            if not 0 <= i < self.n:
+                raise IndexError("índice fuera de rango")
+            return self.estado(i) / self.m
+        idx = np.asarray(key, dtype=np.int64)
+        idx = np.where(idx < 0, idx + self.n, idx)
+        if idx.size and (idx.min() < 0 or idx.max() >= self.n):
+            raise IndexError("índice fuera de rango")
+        if idx.size > 1:
+            lo, hi = int(idx.min()), int(idx.max())
+            if hi - lo + 1 <= 4 * idx.size:
+                # Índices densos: sale más barato generar el tramo completo.
+                return self[lo:hi + 1][idx - lo]
+        A, C = _lcg_saltos(self.a, self.c, self.m, idx + (self.inicio + 1))
+        return _a_uniformes(_afin(A, self.x0, C, self.m), self.m)
+
+
+def subflujos(flujo: UniformStream, k: int, tam: Optional[int] = None) -> List[UniformStream]:
+    """
+    Divide la secuencia del LCG en k segmentos consecutivos y disjuntos de tam valores.
+
+    El segmento j empieza tras saltar j·tam pasos desde el inicio de flujo, así que
+    cada trabajador recibe siempre la misma porción de la secuencia y ninguna se
+    solapa con otra (mientras k·tam no supere el periodo del generador).
+    Por defecto tam = len(flujo) // k; ValueError si k·tam excede len(flujo).
+    """
+    if k <= 0:
+        raise ValueError("La cantidad de subflujos debe ser > 0")
+    if tam is None:
+        tam = len(flujo) // k
+    if tam < 0:
+        raise ValueError("El tamaño de cada subflujo debe ser >= 0")
+    if k * tam > len(flujo):
+        raise ValueError(f"{k} subflujos de {tam} valores exceden los {len(flujo)} del flujo")
+    return [
+        UniformStream(flujo.x0, flujo.a, flujo.c, flujo.m, tam, inicio=flujo.inicio + j * tam)
+        for j in range(k)
+    ]
+
+
+# ---------------- Conjuntos de índices ----------------
+class IndexSet:
+    """
+    Conjunto de índices 0-based guardado como intervalos [ini, fin) ordenados y
+    fusionados, de modo que "1-20000000" ocupa un solo par de enteros.
+
+    Se comporta como la lista ordenada de índices (len, iteración, in, índice
+    por posición) sin materializarla; a_arreglo() y slices() la convierten a
+    NumPy cuando hace falta y texto() devuelve la forma compacta 1-based
+    ("1-10, 15") en O(número de intervalos).
+    """
+
+    __slots__ = ("intervalos", "_acum")
+
+    def __init__(self, intervalos=()):
+        tramos = sorted((int(a), int(b)) for a, b in intervalos if b > a)
+        fusion: List[Tuple[int, int]] = []
+        for a, b in tramos:
+            if fusion and a <= fusion[-1][1]:
+                if b > fusion[-1][1]:
+                    fusion[-1] = (fusion[-1][0], b)
+            else:
+                fusion.append((a, b))
+        self.intervalos: Tuple[Tuple[int, int], ...] = tuple(fusion)
+        acum = [0]
+        for a, b in fusion:
+            acum.append(acum[-1] + b - a)
+        self._acum = acum
+
+    @classmethod
+    def desde_indices(cls, indices) -> "IndexSet":
+        """Construye el conjunto a partir de índices 0-based sueltos."""
+        arr = np.unique(np.fromiter(indices, dtype=np.int64))
+        if arr.size == 0:
+            return cls()
+        cortes = np.flatnonzero(np.diff(arr) != 1) + 1
+        inis = arr[np.r_[0, cortes]]
+        fins = arr[np.r_[cortes - 1, arr.size - 1]] + 1
+        return cls(zip(inis.tolist(), fins.tolist()))
+
+    @classmethod
+    def desde_texto(cls, txt: str, estricto: bool = False) -> "IndexSet":
+        """
+        Interpreta rangos 1-based como "1-5, 8, 10-12". Los valores < 1 se
+        descartan y "b-a" equivale a "a-b". Con estricto=False las partes mal
+        escritas se ignoran; con estricto=True lanzan ValueError.
+        """
+        if not txt or not txt.strip():
+            return cls()
+        tramos = []
+        for p in txt.split(','):
+            p = p.strip()
+            if not p:
+                continue
             try:
-                i = int(p)
-                if i >= 1:
-                    idxs.add(i - 1)
-            except:
+                if '-' in p:
+                    a, b = p.split('-')
+                    a = int(a); b = int(b)
+                    if a > b:
+                        a, b = b, a
+                else:
+                    a = b = int(p)
+            except ValueError:
+                if estricto:
+                    raise
                 continue
-    return sorted(idxs)
+            tramos.append((max(a, 1) - 1, b))
+        return cls(tramos)
 
-# ---------------- Distributions ----------------
-def inv_poisson_u(u: float, lam: float) -> int:
-    if lam < 0:
-        lam = 0.0
-    k = 0
-    p = math.exp(-lam)
-    F = p
-    while u > F:
-        k += 1
-        if k == 0:
-            p = math.exp(-lam)
+    def texto(self) -> str:
+        """Forma compacta 1-based: "1-10, 15, 20-25"."""
+        return ", ".join(f"{a + 1}" if b - a == 1 else f"{a + 1}-{b}" for a, b in self.intervalos)
+
+    def __repr__(self) -> str:
+        return f"IndexSet({self.texto()!r})"
+
+    def __len__(self) -> int:
+        return self._acum[-1]
+
+    def __iter__(self) -> Iterator[int]:
+        for a, b in self.intervalos:
+            yield from range(a, b)
+
+    def __contains__(self, i) -> bool:
+        j = bisect.bisect_right(self.intervalos, (i, math.inf)) - 1
+        return j >= 0 and self.intervalos[j][0] <= i < self.intervalos[j][1]
+
+    def __eq__(self, otro) -> bool:
+        if isinstance(otro, IndexSet):
+            return self.intervalos == otro.intervalos
+        return NotImplemented
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            ini, fin, paso = key.indices(len(self))
+            if paso != 1:
+                return IndexSet.desde_indices(self.a_arreglo()[key])
+            return self._tramo(ini, fin)
+        i = int(key)
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("índice fuera de rango")
+        j = bisect.bisect_right(self._acum, i) - 1
+        return self.intervalos[j][0] + i - self._acum[j]
+
+    def _tramo(self, ini: int, fin: int) -> "IndexSet":
+        """Subconjunto con las posiciones ini..fin-1 (en orden)."""
+        tramos = []
+        for (a, b), base in zip(self.intervalos, self._acum):
+            lo = max(a, a + ini - base)
+            hi = min(b, a + fin - base)
+            if hi > lo:
+                tramos.append((lo, hi))
+        return IndexSet(tramos)
+
+    def union(self, otro: "IndexSet") -> "IndexSet":
+        return IndexSet(self.intervalos + otro.intervalos)
+
+    __or__ = union
+
+    def recortar(self, n: int) -> "IndexSet":
+        """Solo los índices < n."""
+        return IndexSet((max(a, 0), min(b, n)) for a, b in self.intervalos if a < n)
+
+    def slices(self) -> List[slice]:
+        return [slice(a, b) for a, b in self.intervalos]
+
+    def a_arreglo(self) -> np.ndarray:
+        if not self.intervalos:
+            return np.empty(0, dtype=np.int64)
+        return np.concatenate([np.arange(a, b, dtype=np.int64) for a, b in self.intervalos])
+
+
+Uniformes = Union[List[float], np.ndarray, UniformStream]
+
+
+def tomar_uniformes(numeros: Uniformes, idx) -> np.ndarray:
+    """
+    Valores de numeros (lista, arreglo o UniformStream) en los índices 0-based
+    de idx (IndexSet o lista) que existan; los índices fuera de rango se ignoran.
+    """
+    if not isinstance(idx, IndexSet):
+        idx = IndexSet.desde_indices(idx)
+    idx = idx.recortar(len(numeros))
+    if not idx.intervalos:
+        return np.empty(0, dtype=np.float64)
+    # Cada intervalo se pide como un tramo contiguo: en un UniformStream se
+    # genera con la recurrencia en bloque en lugar de un salto por índice.
+    return np.concatenate([np.asarray(numeros[s], dtype=np.float64) for s in idx.slices()])
+
+
+# ---------------- Periodo del LCG ----------------
+class AnalisisPeriodo(NamedTuple):
+    periodo: Optional[int]      # longitud del ciclo; None si no se pudo determinar
+    cola: int                   # pasos desde x0 antes de entrar al ciclo
+    periodo_maximo: int         # m (mixto) o λ(m) (multiplicativo)
+    hull_dobell: bool           # condiciones de periodo completo del mixto
+    metodo: str                 # "factorización" o "brent"
+    avisos: Tuple[str, ...]
+
+    @property
+    def periodo_completo(self) -> bool:
+        return self.periodo == self.periodo_maximo
+
+
+_PRIMOS_MR = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37)
+
+
+def _es_primo(n: int) -> bool:
+    """Miller-Rabin; determinista para n < 3.3·10^24."""
+    if n < 2:
+        return False
+    for p in _PRIMOS_MR:
+        if n % p == 0:
+            return n == p
+    d, s = n - 1, 0
+    while d % 2 == 0:
+        d //= 2
+        s += 1
+    for b in _PRIMOS_MR:
+        x = pow(b, d, n)
+        if x in (1, n - 1):
+            continue
+        for _ in range(s - 1):
+            x = x * x % n
+            if x == n - 1:
+                break
         else:
-            p *= lam / k
-        F += p
-    return k
+            return False
+    return True
 
-def inv_geometrica_u(u: float, p: float) -> int:
-    if p <= 0:
-        p = 1e-9
-    if p >= 1:
-        p = 1 - 1e-9
-    return int(math.ceil(math.log(1 - u) / math.log(1 - p)))
 
-def inv_binomial_u(u: float, n: int, p: float) -> int:
-    if n < 0:
-        n = 0
-    if p < 0:
-        p = 0.0
-    if p > 1:
-        p = 1.0
-    q = 1 - p
-    pmf = (q ** n)
-    F = pmf
-    k = 0
-    while u > F and k < n:
-        k += 1
-        if q == 0:
-            pmf = 0.0 if k < n else 1.0
+class _FactorizacionAgotada(Exception):
+    pass
+
+
+def _rho_brent(n: int, presupuesto: List[int]) -> int:
+    """Un factor no trivial de n compuesto (Pollard-Brent); consume presupuesto[0] iteraciones."""
+    if n % 2 == 0:
+        return 2
+    for c in range(1, 64):
+        y, r, q, g = 2, 1, 1, 1
+        f = lambda v: (v * v + c) % n
+        while g == 1:
+            x = y
+            for _ in range(r):
+                y = f(y)
+            k = 0
+            while k < r and g == 1:
+                ys = y
+                for _ in range(min(128, r - k)):
+                    y = f(y)
+                    q = q * abs(x - y) % n
+                g = math.gcd(q, n)
+                k += 128
+                presupuesto[0] -= 128
+                if presupuesto[0] < 0:
+                    raise _FactorizacionAgotada()
+            r *= 2
+        if g == n:
+            g = 1
+            while g == 1:
+                ys = f(ys)
+                g = math.gcd(abs(x - ys), n)
+        if g != n:
+            return g
+    raise _FactorizacionAgotada()
+
+
+def _factorizar(n: int, presupuesto: Optional[List[int]] = None) -> Dict[int, int]:
+    """Factorización {primo: exponente} por división de prueba y Pollard-Brent."""
+    if presupuesto is None:
+        presupuesto = [2_000_000]
+    out: Dict[int, int] = {}
+    for p in _primos(100):
+        while n % p == 0:
+            out[p] = out.get(p, 0) + 1
+            n //= p
+    pendientes = [n] if n > 1 else []
+    while pendientes:
+        k = pendientes.pop()
+        if _es_primo(k):
+            out[k] = out.get(k, 0) + 1
+            continue
+        d = _rho_brent(k, presupuesto)
+        pendientes += [d, k // d]
+    return out
+
+
+def _carmichael(fac: Dict[int, int], presupuesto: Optional[List[int]] = None) -> Dict[int, int]:
+    """Factorización de λ(m) a partir de la de m."""
+    out: Dict[int, int] = {}
+
+    def unir(f: Dict[int, int]) -> None:
+        for q, e in f.items():
+            out[q] = max(out.get(q, 0), e)
+
+    for p, e in fac.items():
+        if p == 2:
+            unir({2: 0 if e == 1 else (1 if e == 2 else e - 2)})
         else:
-            pmf = pmf * (n - k + 1) / k * (p / q)
-        F += pmf
+            parte = _factorizar(p - 1, presupuesto)
+            if e > 1:
+                parte[p] = parte.get(p, 0) + e - 1
+            unir(parte)
+    return {q: e for q, e in out.items() if e > 0}
+
+
+def _producto(fac: Dict[int, int]) -> int:
+    out = 1
+    for p, e in fac.items():
+        out *= p ** e
+    return out
+
+
+def orden_multiplicativo(a: int, m: int) -> int:
+    """Menor k > 0 con a^k ≡ 1 (mod m); requiere gcd(a, m) = 1."""
+    if math.gcd(a, m) != 1:
+        raise ValueError("a y m deben ser coprimos")
+    if m == 1:
+        return 1
+    fac = _carmichael(_factorizar(m))
+    k = _producto(fac)
+    for q in fac:
+        while k % q == 0 and pow(a, k // q, m) == 1:
+            k //= q
     return k
 
-def generar_variable(
-    tipo: str,
-    numeros: List[float],
-    nombre: str,
-    params: Dict[str, float],
-    indices: Dict[str, str],
-) -> Tuple[List[float], Dict[str, str]]:
-    """Genera una variable a partir de números uniformes y devuelve (valores, meta)."""
-    tipo = (tipo or '').strip()
-    meta: Dict[str, str] = {"dist": tipo}
-    if tipo == 'Exponencial':
-        lam = float(params.get('lam', 1.0))
-        idx = parse_rangos(indices.get('U', ''))
-        U = [numeros[i] for i in idx if i < len(numeros)]
-        valores = [lam * (-math.log(1 - u)) for u in U]
-        meta['params'] = f"λ={lam}"
-        meta['indices'] = f"U={indices.get('U','')}"
-        return valores, meta
-    elif tipo == 'Normal':
-        mu = float(params.get('mu', 0.0))
-        sigma = float(params.get('sigma', 1.0))
-        idx1 = parse_rangos(indices.get('U1', ''))
-        idx2 = parse_rangos(indices.get('U2', ''))
-        U1 = [numeros[i] for i in idx1 if i < len(numeros)]
-        U2 = [numeros[i] for i in idx2 if i < len(numeros)]
-        n = min(len(U1), len(U2))
-        valores = []
-        for i in range(n):
-            u1, u2 = U1[i], U2[i]
-            Z = math.sqrt(-2.0 * math.log(1.0 - u1)) * math.cos(2.0 * math.pi * u2)
-            X = mu + sigma * Z
-            valores.append(X)
-        meta['params'] = f"μ={mu}, σ={sigma}"
-        meta['indices'] = f"U1={indices.get('U1','')}; U2={indices.get('U2','')}"
-        return valores, meta
-    elif tipo == 'Poisson':
-        lam = float(params.get('lam', 1.0))
-        idx = parse_rangos(indices.get('U', ''))
-        U = [numeros[i] for i in idx if i < len(numeros)]
-        valores = [float(inv_poisson_u(u, lam)) for u in U]
-        meta['params'] = f"λ={lam}"
-        meta['indices'] = f"U={indices.get('U','')}"
-        return valores, meta
-    elif tipo == 'Geométrica':
-        p = float(params.get('p', 0.5))
-        idx = parse_rangos(indices.get('U', ''))
-        U = [numeros[i] for i in idx if i < len(numeros)]
-        valores = [float(inv_geometrica_u(u, p)) for u in U]
-        meta['params'] = f"p={p}"
-        meta['indices'] = f"U={indices.get('U','')}"
-        return valores, meta
-    elif tipo == 'Binomial':
-        n = int(params.get('n', 1))
-        p = float(params.get('p', 0.5))
-        idx = parse_rangos(indices.get('U', ''))
-        U = [numeros[i] for i in idx if i < len(numeros)]
-        valores = [float(inv_binomial_u(u, n, p)) for u in U]
-        meta['params'] = f"n={n}, p={p}"
-        meta['indices'] = f"U={indices.get('U','')}"
-        return valores, meta
-    else:
-        return [], {"dist": tipo, "params": "", "indices": ""}
 
-# ---------------- Colas ----------------
-def simulate_colas(llegada: List[float], atencion: List[float]) -> List[Tuple]:
-    n = min(len(llegada), len(atencion))
+def periodo_brent(x0: int, a: int, c: int, m: int, limite: int = 2_000_000) -> Optional[Tuple[int, int]]:
+    """
+    (cola, periodo) de la secuencia del LCG por detección de ciclos de Brent, o
+    None si el ciclo no aparece en `limite` pasos.
+    """
+    f = lambda x: (a * x + c) % m
+    x0 %= m
+    potencia = lam = 1
+    tortuga, liebre = x0, f(x0)
+    pasos = 1
+    while tortuga != liebre:
+        if potencia == lam:
+            tortuga = liebre
+            potencia *= 2
+            lam = 0
+        liebre = f(liebre)
+        lam += 1
+        pasos += 1
+        if pasos > limite:
+            return None
+    tortuga = liebre = x0
+    for _ in range(lam):
+        liebre = f(liebre)
+    mu = 0
+    while tortuga != liebre:
+        tortuga, liebre = f(tortuga), f(liebre)
+        mu += 1
+    return mu, lam
+
+
+def analizar_lcg(x0: int, a: int, c: int, m: int, presupuesto: int = 2_000_000) -> AnalisisPeriodo:
+    """
+    Analiza el periodo de x_{n+1} = (a·x_n + c) mod m desde x0 (c = 0 es el
+    multiplicativo): comprueba Hull-Dobell y calcula el periodo exacto a partir
+    de la factorización de m. Si m no se puede factorizar en presupuesto
+    iteraciones de Pollard-Brent se recurre a la detección de ciclos de Brent,
+    con el mismo límite de pasos; así el tiempo queda acotado (unos 3 µs por
+    iteración) aun con m difíciles de factorizar.
+    """
+    if m <= 0:
+        raise ValueError("El módulo m debe ser > 0")
+    a, c, x0 = a % m, c % m, x0 % m
+    avisos: List[str] = []
+    restante = [presupuesto]
+    try:
+        fac = _factorizar(m, restante)
+        lam_fac = None if c else _carmichael(fac, restante)
+        fac2 = {p: e for p, e in fac.items() if a % p}
+        lam2 = _carmichael(fac2, restante)
+    except _FactorizacionAgotada:
+        fac = None
+    if fac is None:
+        res = periodo_brent(x0, a, c, m, presupuesto)
+        if res is None:
+            avisos.append("No se pudo determinar el periodo")
+        cola, periodo = res if res else (0, None)
+        return AnalisisPeriodo(periodo, cola, m, False, "brent", tuple(avisos))
+
+    hull_dobell = (
+        c != 0
+        and math.gcd(c, m) == 1
+        and all((a - 1) % p == 0 for p in fac)
+        and (m % 4 != 0 or (a - 1) % 4 == 0)
+    )
+    periodo_maximo = m if c else _producto(lam_fac)
+
+    # m = m1·m2 con m1 formado por los primos que dividen a: módulo m1 la
+    # secuencia cae en un punto fijo y módulo m2 la recurrencia es biyectiva.
+    m1 = _producto({p: e for p, e in fac.items() if a % p == 0})
+    m2 = m // m1
+    cola, y = 0, x0 % m1
+    while (a * y + c) % m1 != y:
+        y = (a * y + c) % m1
+        cola += 1
+    periodo = 1
+    if m2 > 1:
+        # f^(λ(m2)·m2) es la identidad módulo m2; se quitan factores mientras x0 siga fijo.
+        candidatos = dict(lam2)
+        for p, e in fac2.items():
+            candidatos[p] = candidatos.get(p, 0) + e
+        periodo = _producto(candidatos)
+        for q in candidatos:
+            while periodo % q == 0:
+                A, C = lcg_salto(a, c, m2, periodo // q)
+                if (A * x0 + C) % m2 != x0 % m2:
+                    break
+                periodo //= q
+
+    if c and not hull_dobell:
+        avisos.append("No cumple Hull-Dobell: el periodo es menor que m")
+    if not c and math.gcd(x0, m) != 1:
+        avisos.append("X0 no es coprimo con m: el multiplicativo no alcanza su periodo máximo")
+    if periodo < periodo_maximo:
+        avisos.append(f"Periodo {periodo} de {periodo_maximo} posibles")
+    return AnalisisPeriodo(periodo, cola, periodo_maximo, hull_dobell, "factorización", tuple(avisos))
+
+
+# ---------------- Fuentes de uniformes ----------------
+class FuenteUniforme:
+    """
+    Interfaz común de los generadores de uniformes: generar(n) devuelve los
+    siguientes n valores como float64 y bloques() los entrega por trozos, de
+    modo que las corridas grandes no necesitan toda la secuencia en memoria.
+    """
+
+    nombre = ""
+
+    def generar(self, n: int) -> np.ndarray:
+        raise NotImplementedError
+
+    def bloques(self, n: int, tam: int = 1 << 20) -> Iterator[np.ndarray]:
+        while n > 0:
+            t = min(tam, n)
+            yield self.generar(t)
+            n -= t
+
+    def numeros(self, n: int) -> Uniformes:
+        """Los siguientes n valores en la forma que usa generar_variable."""
+        return self.generar(n)
+
+
+class FuenteLCG(FuenteUniforme):
+    """Congruencial mixto (o multiplicativo con c=0); numeros() no materializa nada."""
+
+    def __init__(self, x0: int, a: int, c: int, m: int):
+        if m <= 0:
+            raise ValueError("El módulo m debe ser > 0")
+        if m > _LCG_M_MAX:
+            raise ValueError("El módulo m debe ser <= 2^64")
+        self.nombre = "mixto" if c % m else "multiplicativo"
+        self.x0, self.a, self.c, self.m = x0, a, c, m
+        self.posicion = 0
+
+    def numeros(self, n: int) -> UniformStream:
+        flujo = UniformStream(self.x0, self.a, self.c, self.m, n, inicio=self.posicion)
+        self.posicion += n
+        return flujo
+
+    def generar(self, n: int) -> np.ndarray:
+        return self.numeros(n)[:]
+
+
+class FuenteNumpy(FuenteUniforme):
+    """Generadores de numpy.random (PCG64, Philox, SFC64, MT19937) con semilla."""
+
+    def __init__(self, semilla: int, bit_generator: str = "PCG64"):
+        self.nombre = bit_generator.lower()
+        self.semilla = semilla
+        self.generador = np.random.Generator(getattr(np.random, bit_generator)(semilla))
+
+    def generar(self, n: int) -> np.ndarray:
+        return self.generador.random(max(0, n))
+
+
+FUENTES_UNIFORMES: Dict[str, Callable[..., FuenteUniforme]] = {
+    "mixto": lambda x0, a, c, m, **_: FuenteLCG(x0, a, c, m),
+    "multiplicativo": lambda x0, a, m, **_: FuenteLCG(x0, a, 0, m),
+    "pcg64": lambda semilla, **_: FuenteNumpy(semilla, "PCG64"),
+    "philox": lambda semilla, **_: FuenteNumpy(semilla, "Philox"),
+    "sfc64": lambda semilla, **_: FuenteNumpy(semilla, "SFC64"),
+    "mt19937": lambda semilla, **_: FuenteNumpy(semilla, "MT19937"),
+}
+
+
+# ---------------- Cuasi-aleatorios (QMC) ----------------
+# Números de dirección de Joe y Kuo para las dimensiones 2.. de Sobol:
+# (grado s del polinomio primitivo, coeficientes a, valores iniciales m_1..m_s).
+_SOBOL_JK = [
+    (1, 0, (1,)),
+    (2, 1, (1, 3)),
+    (3, 1, (1, 3, 1)),
+    (3, 2, (1, 1, 1)),
+    (4, 1, (1, 1, 3, 3)),
+    (4, 4, (1, 3, 5, 13)),
+    (5, 2, (1, 1, 5, 5, 17)),
+    (5, 4, (1, 1, 5, 5, 5)),
+    (5, 7, (1, 1, 7, 11, 19)),
+    (5, 11, (1, 1, 5, 1, 1)),
+    (5, 13, (1, 1, 1, 3, 11)),
+    (5, 14, (1, 3, 5, 5, 31)),
+    (6, 1, (1, 3, 3, 9, 7, 49)),
+    (6, 13, (1, 1, 1, 15, 21, 21)),
+    (6, 16, (1, 3, 1, 13, 27, 49)),
+]
+SOBOL_DIM_MAX = len(_SOBOL_JK) + 1
+_QMC_BITS = 32
+
+
+def _primos(k: int) -> List[int]:
+    """Los primeros k números primos."""
+    out: List[int] = []
+    n = 2
+    while len(out) < k:
+        if all(n % p for p in out if p * p <= n):
+            out.append(n)
+        n += 1
+    return out
+
+
+def halton(n: int, dim: int, salto: int = 0, semilla: Optional[int] = None) -> np.ndarray:
+    """
+    Puntos salto+1 .. salto+n de la sucesión de Halton en dim dimensiones, como
+    arreglo (n, dim). La dimensión j usa el inverso radical en el j-ésimo primo.
+    Con semilla se aleatoriza con permutaciones de dígitos que fijan el 0.
+    """
+    rng = np.random.default_rng(semilla) if semilla is not None else None
+    puntos = np.zeros((max(0, n), dim), dtype=np.float64)
+    for j, b in enumerate(_primos(dim)):
+        perm = np.arange(b)
+        if rng is not None:
+            perm[1:] = rng.permutation(np.arange(1, b))
+        i = np.arange(salto + 1, salto + n + 1, dtype=np.int64)
+        f = 1.0 / b
+        while i.any():
+            puntos[:, j] += perm[i % b] * f
+            i //= b
+            f /= b
+    return puntos
+
+
+def _sobol_direcciones(dim: int) -> np.ndarray:
+    """Números de dirección V[j, k] (enteros de 32 bits) para las dim primeras dimensiones."""
+    if not 1 <= dim <= SOBOL_DIM_MAX:
+        raise ValueError(f"Sobol admite de 1 a {SOBOL_DIM_MAX} dimensiones")
+    V = np.zeros((dim, _QMC_BITS), dtype=np.uint64)
+    V[0] = [1 << (_QMC_BITS - 1 - k) for k in range(_QMC_BITS)]
+    for j in range(1, dim):
+        s, a, m_ini = _SOBOL_JK[j - 1]
+        m = list(m_ini)
+        for k in range(s, _QMC_BITS):
+            nuevo = m[k - s] ^ (m[k - s] << s)
+            for r in range(1, s):
+                if (a >> (s - 1 - r)) & 1:
+                    nuevo ^= m[k - r] << r
+            m.append(nuevo)
+        V[j] = [m[k] << (_QMC_BITS - 1 - k) for k in range(_QMC_BITS)]
+    return V
+
+
+def sobol(n: int, dim: int, salto: int = 0, semilla: Optional[int] = None) -> np.ndarray:
+    """
+    Puntos salto .. salto+n−1 de la sucesión de Sobol (orden de Gray) como arreglo
+    (n, dim). Con semilla se aplica aleatorización lineal de matriz (LMS) más un
+    desplazamiento digital, lo que mantiene la baja discrepancia y quita el punto 0.
+    """
+    V = _sobol_direcciones(dim)
+    desplazamiento = np.zeros(dim, dtype=np.uint64)
+    if semilla is not None:
+        rng = np.random.default_rng(semilla)
+        for j in range(dim):
+            # Fila r de L: diagonal en 1 y bits aleatorios en los dígitos más significativos.
+            filas = [
+                (1 << (_QMC_BITS - 1 - r)) | (int(rng.integers(0, 1 << r)) << (_QMC_BITS - r))
+                for r in range(_QMC_BITS)
+            ]
+            V[j] = [
+                sum(1 << (_QMC_BITS - 1 - r) for r, fila in enumerate(filas) if bin(fila & int(v)).count("1") & 1)
+                for v in V[j]
+            ]
+        desplazamiento = rng.integers(0, 1 << _QMC_BITS, size=dim, dtype=np.uint64)
+    i = np.arange(salto, salto + max(0, n), dtype=np.uint64)
+    gray = i ^ (i >> np.uint64(1))
+    X = np.tile(desplazamiento, (len(i), 1))
+    for k in range(_QMC_BITS):
+        bit = ((gray >> np.uint64(k)) & np.uint64(1)).astype(bool)
+        if bit.any():
+            X[bit] ^= V[:, k]
+    return X.astype(np.float64) / float(1 << _QMC_BITS)
+
+
+class FuenteQMC(FuenteUniforme):
+    """
+    Sucesión de Halton o Sobol aleatorizada de dimensión dim.
+
+    numeros(n) reparte los n valores por dimensión: con p = ceil(n / dim) puntos,
+    los índices j·p+1 .. (j+1)·p (1-based) son la coordenada j de los puntos, de
+    modo que cada variable de generar_variable toma su propia dimensión (p. ej.
+    llegada con "1-p" y atención con "p+1-2p"). generar(n) entrega en cambio los
+    puntos siguientes fila a fila.
+    """
+
+    def __init__(self, metodo: str, dim: int, semilla: Optional[int] = None):
+        if dim <= 0:
+            raise ValueError("La dimensión debe ser > 0")
+        self.nombre = metodo
+        self.dim = dim
+        self.semilla = semilla
+        self.posicion = 0
+        self._puntos = halton if metodo == "halton" else sobol
+        self._resto = np.empty(0)
+
+    def puntos(self, p: int) -> np.ndarray:
+        """Los siguientes p puntos (p, dim) de la sucesión."""
+        X = self._puntos(p, self.dim, salto=self.posicion, semilla=self.semilla)
+        self.posicion += p
+        return X
+
+    def numeros(self, n: int) -> np.ndarray:
+        p = -(-max(0, n) // self.dim)
+        return self.puntos(p).T.ravel()[:max(0, n)]
+
+    def rangos(self, n: int) -> List[str]:
+        """Rango 1-based de cada dimensión dentro de numeros(n)."""
+        p = -(-max(0, n) // self.dim)
+        return [f"{j * p + 1}-{min(n, (j + 1) * p)}" for j in range(self.dim) if j * p < n]
+
+    def generar(self, n: int) -> np.ndarray:
+        # Se generan puntos completos y se guarda el sobrante para la siguiente llamada.
+        faltan = max(0, n - len(self._resto))
+        nuevos = self.puntos(-(-faltan // self.dim)).ravel()
+        todo = np.concatenate([self._resto, nuevos])
+        self._resto = todo[n:]
+        return todo[:n]
+
+
+FUENTES_UNIFORMES["halton"] = lambda dim=2, semilla=None, **_: FuenteQMC("halton", dim, semilla)
+FUENTES_UNIFORMES["sobol"] = lambda dim=2, semilla=None, **_: FuenteQMC("sobol", dim, semilla)
+
+
+def registrar_fuente(nombre: str, fabrica: Callable[..., FuenteUniforme]) -> None:
+    """Agrega un generador de uniformes a los que ofrecen las pestañas RNG."""
+    FUENTES_UNIFORMES[nombre.lower()] = fabrica
+
+
+def crear_fuente(metodo: str, **params) -> FuenteUniforme:
+    """Crea la fuente registrada como metodo (p. ej. crear_fuente("pcg64", semilla=17))."""
+    metodo = (metodo or "").strip().lower()
+    if metodo not in FUENTES_UNIFORMES:
+        raise ValueError(f"Método de generación desconocido: {metodo}")
+    return FUENTES_UNIFORMES[metodo](**params)
+
+# ---------------- Funciones especiales ----------------
+_EPS = 1e-15
+_FPMIN = 1e-300
+
+
+def gamma_inc_reg(a: float, x) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Funciones gamma incompletas regularizadas (P(a, x), Q(a, x)) para a > 0
+    escalar y x arreglo: serie si x < a + 1 y fracción continua de Lentz si no.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    P = np.zeros_like(x)
+    Q = np.ones_like(x)
+    pos = x > 0
+    with np.errstate(divide="ignore", over="ignore", under="ignore", invalid="ignore"):
+        log_pref = np.where(pos, -x + a * np.log(np.where(pos, x, 1.0)) - math.lgamma(a), -np.inf)
+        pref = np.exp(log_pref)
+        serie = pos & (x < a + 1)
+        if serie.any():
+            xs = x[serie]
+            ap = np.full_like(xs, a)
+            suma = np.full_like(xs, 1.0 / a)
+            delta = suma.copy()
+            activo = np.ones(xs.shape, dtype=bool)
+            for _ in range(100000):
+                ap = ap + 1
+                delta = np.where(activo, delta * xs / ap, 0.0)
+                suma += delta
+                activo &= np.abs(delta) >= np.abs(suma) * _EPS
+                if not activo.any():
+                    break
+            P[serie] = np.minimum(1.0, suma * pref[serie])
+            Q[serie] = 1.0 - P[serie]
+        frac = pos & ~serie
+        if frac.any():
+            xs = x[frac]
+            b = xs + 1 - a
+            c = np.full_like(xs, 1 / _FPMIN)
+            d = 1 / b
+            h = d.copy()
+            activo = np.ones(xs.shape, dtype=bool)
+            for i in range(1, 100000):
+                an = -i * (i - a)
+                b = b + 2
+                d = an * d + b
+                d = np.where(np.abs(d) < _FPMIN, _FPMIN, d)
+                c = b + an / c
+                c = np.where(np.abs(c) < _FPMIN, _FPMIN, c)
+                d = 1 / d
+                delta = np.where(activo, d * c, 1.0)
+                h *= delta
+                activo &= np.abs(delta - 1) >= _EPS
+                if not activo.any():
+                    break
+            Q[frac] = np.minimum(1.0, pref[frac] * h)
+            P[frac] = 1.0 - Q[frac]
+    return P, Q
+
+
+def _beta_cf(a: float, b: float, x: np.ndarray) -> np.ndarray:
+    """Fracción continua de la beta incompleta (Lentz), vectorizada en x."""
+    qab, qap, qam = a + b, a + 1.0, a - 1.0
+    c = np.ones_like(x)
+    d = 1.0 - qab * x / qap
+    d = np.where(np.abs(d) < _FPMIN, _FPMIN, d)
+    d = 1.0 / d
+    h = d.copy()
+    activo = np.ones(x.shape, dtype=bool)
+    for m in range(1, 100000):
+        m2 = 2 * m
+        for aa in (m * (b - m) * x / ((qam + m2) * (a + m2)),
+                   -(a + m) * (qab + m) * x / ((a + m2) * (qap + m2))):
+            d = 1.0 + aa * d
+            d = np.where(np.abs(d) < _FPMIN, _FPMIN, d)
+            c = 1.0 + aa / c
+            c = np.where(np.abs(c) < _FPMIN, _FPMIN, c)
+            d = 1.0 / d
+            delta = np.where(activo, d * c, 1.0)
+            h *= delta
+        activo &= np.abs(delta - 1.0) >= _EPS
+        if not activo.any():
+            break
+    return h
+
+
+def beta_inc_reg(a: float, b: float, x) -> np.ndarray:
+    """Beta incompleta regularizada I_x(a, b) para a, b > 0 escalares y x arreglo."""
+    x = np.clip(np.asarray(x, dtype=np.float64), 0.0, 1.0)
+    out = np.where(x >= 1.0, 1.0, 0.0)
+    interior = (x > 0.0) & (x < 1.0)
+    if interior.any():
+        xi = x[interior]
+        lbeta = math.lgamma(a) + math.lgamma(b) - math.lgamma(a + b)
+        frente = np.exp(a * np.log(xi) + b * np.log1p(-xi) - lbeta)
+        directo = xi < (a + 1.0) / (a + b + 2.0)
+        r = np.empty_like(xi)
+        if directo.any():
+            r[directo] = frente[directo] * _beta_cf(a, b, xi[directo]) / a
+        if (~directo).any():
+            r[~directo] = 1.0 - frente[~directo] * _beta_cf(b, a, 1.0 - xi[~directo]) / b
+        out[interior] = np.clip(r, 0.0, 1.0)
+    return out
+
+
+def normal_cdf(z) -> np.ndarray:
+    """Φ(z) vectorizada, vía Q(1/2, z²/2) para no perder precisión en las colas."""
+    z = np.asarray(z, dtype=np.float64)
+    Q = gamma_inc_reg(0.5, 0.5 * z * z)[1]
+    return np.where(z < 0, 0.5 * Q, 1.0 - 0.5 * Q)
+
+
+def p_chi2(estadistico: float, gl: int) -> float:
+    """P(χ²_gl >= estadistico)."""
+    return float(gamma_inc_reg(gl / 2.0, estadistico / 2.0)[1])
+
+
+def p_normal(z: float) -> float:
+    """p-valor bilateral de una normal estándar."""
+    return math.erfc(abs(z) / math.sqrt(2.0))
+
+
+def p_kolmogorov(d: float, n: int) -> float:
+    """p-valor asintótico de Kolmogorov-Smirnov (con la corrección de Stephens)."""
     if n <= 0:
-        return []
-    rows = []
-    tiempo_arribo = 0.0
-    fin_atencion_prev = 0.0
-    prom = 0.0
-    for i in range(n):
-        cliente = i + 1
-        A = float(llegada[i])
-        if i == 0:
-            B = A
-        else:
-            B = tiempo_arribo + A
-        C = max(B, fin_atencion_prev)
-        D = float(atencion[i])
-        E = C + D
-        F = E - B
-        G = C - B
-        prom = F if i == 0 else (prom * i + F) / (i + 1)
-        tiempo_arribo = B
-        fin_atencion_prev = E
-        rows.append((
-            cliente, round(A, 2), round(B, 2), round(C, 2), round(D, 2), round(E, 2), round(F, 2), round(G, 2), round(prom, 2)
-        ))
-    return rows
+        return 1.0
+    lam = (math.sqrt(n) + 0.12 + 0.11 / math.sqrt(n)) * d
+    if lam < 0.2:
+        return 1.0
+    return max(0.0, min(1.0, 2 * sum((-1) ** (j - 1) * math.exp(-2 * j * j * lam * lam) for j in range(1, 101))))
+
+
+# ---------------- Pruebas de uniformidad ----------------
+class ResultadoPrueba(NamedTuple):
+    nombre: str
+    estadistico: float
+    p_valor: float
+
+
+class BateriaUniformes:
+    """
+    Pruebas sobre un flujo de uniformes en una sola pasada y memoria constante:
+    chi-cuadrado de frecuencias, Kolmogorov-Smirnov, corridas arriba/abajo,
+    pares seriales (no solapados) y autocorrelación con retardo k.
+
+    Se alimenta por bloques con actualizar() (o consumir() con un iterable de
+    bloques) y resultados() devuelve estadísticos y p-valores. KS se evalúa
+    sobre un histograma de celdas_ks celdas, así que D se aproxima con error
+    menor que 1/celdas_ks.
+    """
+
+    def __init__(self, clases: int = 10, celdas_ks: int = 1 << 18, clases_pares: int = 8, retardo: int = 1):
+        self.n = 0
+        self.frecuencias = np.zeros(clases, dtype=np.int64)
+        self.celdas_ks = np.zeros(celdas_ks, dtype=np.int64)
+        self.pares = np.zeros(clases_pares * clases_pares, dtype=np.int64)
+        self.clases_pares = clases_pares
+        self.retardo = retardo
+        self._impar = np.empty(0)
+        self._ultimos = np.empty(0)
+        self.suma_productos = 0.0
+        self.n_productos = 0
+        self.corridas = 0
+        self._ultimo: Optional[float] = None
+        self._subiendo: Optional[bool] = None
+
+    @staticmethod
+    def _clase(u: np.ndarray, k: int) -> np.ndarray:
+        return np.minimum((u * k).astype(np.int64), k - 1)
+
+    def actualizar(self, bloque) -> None:
+        u = np.asarray(bloque, dtype=np.float64).ravel()
+        if u.size == 0:
+            return
+        self.n += u.size
+        self.frecuencias += np.bincount(self._clase(u, len(self.frecuencias)), minlength=len(self.frecuencias))
+        self.celdas_ks += np.bincount(self._clase(u, len(self.celdas_ks)), minlength=len(self.celdas_ks))
+
+        # Pares seriales no solapados; el valor sobrante espera al siguiente bloque.
+        v = np.concatenate([self._impar, u])
+        usable = v.size - v.size % 2
+        if usable:
+            k = self.clases_pares
+            celdas = self._clase(v[0:usable:2], k) * k + self._clase(v[1:usable:2], k)
+            self.pares += np.bincount(celdas, minlength=k * k)
+        self._impar = v[usable:]
+
+        # Autocorrelación: productos u_i·u_{i+k} usando los k últimos valores previos.
+        v = np.concatenate([self._ultimos, u])
+        k = self.retardo
+        if v.size > k:
+            self.suma_productos += float(np.dot(v[:-k], v[k:]))
+            self.n_productos += v.size - k
+        self._ultimos = v[-k:]
+
+        # Corridas arriba/abajo sobre el signo de las diferencias consecutivas.
+        v = u if self._ultimo is None else np.concatenate([[self._ultimo], u])
+        sube = np.diff(v) > 0
+        if sube.size:
+            cambios = int(np.count_nonzero(sube[1:] != sube[:-1]))
+            if self._subiendo is None or sube[0] != self._subiendo:
+                cambios += 1
+            self.corridas += cambios
+            self._subiendo = bool(sube[-1])
+        self._ultimo = float(u[-1])
+
+    def consumir(self, bloques) -> "BateriaUniformes":
+        for b in bloques:
+            self.actualizar(b)
+        return self
+
+    def resultados(self) -> List[ResultadoPrueba]:
+        out: List[ResultadoPrueba] = []
+        n = self.n
+        if n == 0:
+            return out
+        k = len(self.frecuencias)
+        esperado = n / k
+        chi = float(((self.frecuencias - esperado) ** 2).sum() / esperado)
+        out.append(ResultadoPrueba("Chi-cuadrado frecuencias", chi, p_chi2(chi, k - 1)))
+
+        bordes = np.arange(1, len(self.celdas_ks) + 1) / len(self.celdas_ks)
+        d = float(np.abs(np.cumsum(self.celdas_ks) / n - bordes).max())
+        out.append(ResultadoPrueba("Kolmogorov-Smirnov", d, p_kolmogorov(d, n)))
+
+        if n > 2:
+            media = (2 * n - 1) / 3.0
+            var = (16 * n - 29) / 90.0
+            z = (self.corridas - media) / math.sqrt(var)
+            out.append(ResultadoPrueba("Corridas arriba/abajo", z, p_normal(z)))
+
+        total_pares = int(self.pares.sum())
+        if total_pares:
+            celdas = len(self.pares)
+            esperado = total_pares / celdas
+            chi = float(((self.pares - esperado) ** 2).sum() / esperado)
+            out.append(ResultadoPrueba("Pares seriales", chi, p_chi2(chi, celdas - 1)))
+
+        h = self.n_productos
+        if h:
+            # E[u_i·u_{i+k}] = 1/4; con la covarianza entre productos vecinos Var = 13/(144h).
+            z = (self.suma_productos / h - 0.25) / math.sqrt(13.0 / (144.0 * h))
+            out.append(ResultadoPrueba(f"Autocorrelación (retardo {self.retardo})", z, p_normal(z)))
+        return out
+
+
+def bloques_de(numeros: Uniformes, tam: int = 1 << 20) -> Iterator[np.ndarray]:
+    """Recorre numeros (lista, arreglo o UniformStream) por bloques de tam valores."""
+    for ini in range(0, len(numeros), tam):
+        yield np.asarray(numeros[ini:ini + tam], dtype=np.float64)
+
+
+def probar_uniformes(bloques, **opciones) -> List[ResultadoPrueba]:
+    """Aplica la batería completa a un iterable de bloques (p. ej. fuente.bloques(n))."""
+    return BateriaUniformes(**opciones).consumir(bloques).resultados()
+
+
+def parse_rangos(txt: str) -> IndexSet:
+    """Rangos 1-based ("1-5, 8") a un IndexSet 0-based; ignora las partes inválidas."""
+    return IndexSet.desde_texto(txt)
+
+# ---------------- Distributions ----------------
+# Hasta este λ la acumulada se suma desde k = 0 (e^{-λ} todavía no se anula).
+_POISSON_LAM_DIRECTO = 700.0
+# Ancho de la ventana alrededor de la moda, en desvíos estándar.
+_POISSON_SIGMAS = 10.0
+_POISSON_TABLA_MAX = 1 << 22
+
+
+class _TablasLRU:
+    """
+    Memo LRU de tablas de distribuciones discretas acotado por bytes.
+
+    Una tabla puede tener hasta 4M entradas (32 MiB), así que limitar por
+    cantidad no acota la memoria. Todas las funciones decoradas con memo()
+    comparten el mismo presupuesto: al superarlo se descartan las tablas
+    usadas hace más tiempo, y una tabla más grande que el total no se guarda.
+    """
+
+    def __init__(self, max_bytes: int = 32 << 20):
+        self.max_bytes = max_bytes
+        self._datos: "OrderedDict[tuple, Tuple[tuple, int]]" = OrderedDict()
+        self.bytes = 0
+
+    def memo(self, funcion: Callable) -> Callable:
+        @wraps(funcion)
+        def envoltura(*args):
+            clave = (funcion.__name__,) + args
+            if clave in self._datos:
+                self._datos.move_to_end(clave)
+                return self._datos[clave][0]
+            valor = funcion(*args)
+            tam = sum(v.nbytes for v in valor if isinstance(v, np.ndarray))
+            if tam <= self.max_bytes:
+                self._datos[clave] = (valor, tam)
+                self.bytes += tam
+                while self.bytes > self.max_bytes:
+                    _, (_, viejo) = self._datos.popitem(last=False)
+                    self.bytes -= viejo
+            return valor
+        envoltura.cache_clear = self.limpiar
+        return envoltura
+
+    def limpiar(self) -> None:
+        self._datos.clear()
+        self.bytes = 0
+
+
+_TABLAS = _TablasLRU()
+
+
+@_TABLAS.memo
+def _tabla_poisson(lam: float) -> Tuple[int, np.ndarray]:
+    """
+    Acumulada de Poisson(lam) como (k0, F) con F[j] = F(k0 + j).
+
+    Para lam <= 700 se suma desde k0 = 0 con la recurrencia p_k = p_{k-1}·lam/k,
+    hasta que deja de cambiar en coma flotante (igual que el cálculo término a
+    término). Para lam mayor e^{-lam} se anula, así que se trabaja en escala
+    logarítmica relativa a la moda sobre la ventana moda ± 10·sqrt(lam)
+    (O(sqrt(lam)) términos; la masa fuera de ella es despreciable) y se
+    normaliza para que la suma sea 1.
+    """
+    if lam <= _POISSON_LAM_DIRECTO:
+        p = math.exp(-lam)
+        F = p
+        tabla = [F]
+        k = 0
+        while True:
+            k += 1
+            p *= lam / k
+            if k > lam and (p == 0.0 or F + p == F):
+                break
+            F += p
+            tabla.append(F)
+        arr = np.array(tabla)
+        k0 = 0
+    else:
+        moda = int(math.floor(lam))
+        ancho = int(math.ceil(_POISSON_SIGMAS * math.sqrt(lam))) + 10
+        k0 = max(0, moda - ancho)
+        k1 = moda + ancho
+        if k1 - k0 + 1 > _POISSON_TABLA_MAX:
+            raise ValueError("λ demasiado grande para la inversión exacta de Poisson")
+        # log(p_k / p_moda) = sum log(lam / j) hacia arriba y -sum log(lam / j) hacia abajo
+        arriba = np.cumsum(np.log(lam / np.arange(moda + 1, k1 + 1, dtype=np.float64)))
+        abajo = np.cumsum(np.log(lam / np.arange(moda, k0, -1, dtype=np.float64)))[::-1]
+        log_rel = np.concatenate([-abajo, [0.0], arriba])
+        pmf = np.exp(log_rel)
+        arr = np.cumsum(pmf)
+        arr /= arr[-1]
+    arr.setflags(write=False)
+    return k0, arr
+
+
+def poisson_acumulada(k: int, lam: float) -> Tuple[float, float]:
+    """(P(X=k), P(X<=k)) de Poisson(lam) leídos de la misma tabla que usa la inversa."""
+    k0, tabla = _tabla_poisson(float(max(lam, 0.0)))
+    j = k - k0
+    if j < 0:
+        return 0.0, 0.0
+    if j >= len(tabla):
+        return 0.0, float(tabla[-1])
+    F = float(tabla[j])
+    F_ant = float(tabla[j - 1]) if j > 0 else 0.0
+    return F - F_ant, F
+
+
+def inv_poisson_np(U, lam: float) -> np.ndarray:
+    """
+    Inversa de Poisson para un arreglo de U: menor k con F(k) >= u, buscado con
+    searchsorted sobre la tabla de lam (se calcula una vez y queda en caché).
+    """
+    if lam < 0:
+        lam = 0.0
+    k0, tabla = _tabla_poisson(float(lam))
+    U = np.asarray(U, dtype=np.float64)
+    # Si u supera la acumulada final (redondeo), se toma el último k de la tabla.
+    k = k0 + np.minimum(np.searchsorted(tabla, U, side='left'), len(tabla) - 1)
+    # F(0) > 0, así que u = 0 siempre corresponde a k = 0.
+    return np.where(U <= 0.0, 0, k)
+
+
+def inv_poisson_u(u: float, lam: float) -> int:
+    return int(inv_poisson_np(u, lam))
+
+def inv_geometrica_u(u: float, p: float) -> int:
+    if p <= 0:
+        p = 1e-9
+    if p >= 1:
+        p = 1 - 1e-9
+    return int(math.ceil(math.log(1 - u) / math.log(1 - p)))
+
+# Tamaño máximo de la tabla sumada desde k = 0 con la recurrencia de la PMF.
+_BINOMIAL_DIRECTO_MAX = 1 << 20
+_BINOMIAL_SIGMAS = 10.0
+_BINOMIAL_TABLA_MAX = 1 << 22
+
+
+@_TABLAS.memo
+def _tabla_binomial(n: int, p: float) -> Tuple[int, np.ndarray, int]:
+    """
+    Acumulada de Binomial(n, p) como (k0, F, k_fuera) con F[j] = F(k0 + j);
+    k_fuera es el valor que corresponde a u por encima de F[-1].
+
+    Si (1-p)^n no se anula y n no es enorme se suma desde k = 0 con
+    pmf_k = pmf_{k-1}·(n-k+1)/k·p/q, igual que el cálculo término a término;
+    la tabla se corta cuando la acumulada deja de cambiar y ese recorrido
+    terminaría en k = n. Si no, se usa la ventana moda ± 10·sqrt(npq) en
+    escala logarítmica relativa a la moda, normalizada para sumar 1.
+    """
+    q = 1 - p
+    pmf = q ** n
+    if pmf > 1e-300 and n <= _BINOMIAL_DIRECTO_MAX:
+        moda = (n + 1) * p
+        F = pmf
+        tabla = [F]
+        k = 0
+        while k < n:
+            k += 1
+            pmf = pmf * (n - k + 1) / k * (p / q)
+            if k > moda and (pmf == 0.0 or F + pmf == F):
+                break
+            F += pmf
+            tabla.append(F)
+        arr = np.array(tabla)
+        arr.setflags(write=False)
+        return 0, arr, n
+    moda = min(n, int(math.floor((n + 1) * p)))
+    ancho = int(math.ceil(_BINOMIAL_SIGMAS * math.sqrt(n * p * q))) + 10
+    k0 = max(0, moda - ancho)
+    k1 = min(n, moda + ancho)
+    if k1 - k0 + 1 > _BINOMIAL_TABLA_MAX:
+        raise ValueError("n demasiado grande para la inversión exacta de la Binomial")
+    razon = p / q
+    # pmf(j)/pmf(j-1) = (n-j+1)/j · p/q
+    j = np.arange(moda + 1, k1 + 1, dtype=np.float64)
+    arriba = np.cumsum(np.log((n - j + 1) / j * razon))
+    j = np.arange(moda, k0, -1, dtype=np.float64)
+    abajo = np.cumsum(np.log((n - j + 1) / j * razon))[::-1]
+    arr = np.cumsum(np.exp(np.concatenate([-abajo, [0.0], arriba])))
+    arr /= arr[-1]
+    arr.setflags(write=False)
+    return k0, arr, k1
+
+
+def binomial_acumulada(k: int, n: int, p: float) -> Tuple[float, float]:
+    """(P(X=k), P(X<=k)) de Binomial(n, p) leídos de la misma tabla que usa la inversa."""
+    n, p = max(int(n), 0), min(max(float(p), 0.0), 1.0)
+    if p <= 0.0 or p >= 1.0 or n == 0:
+        extremo = n if p >= 1.0 else 0
+        return (1.0 if k == extremo else 0.0), (1.0 if k >= extremo else 0.0)
+    k0, tabla, _ = _tabla_binomial(n, p)
+    j = k - k0
+    if j < 0:
+        return 0.0, 0.0
+    if j >= len(tabla):
+        return 0.0, float(tabla[-1])
+    F = float(tabla[j])
+    F_ant = float(tabla[j - 1]) if j > 0 else 0.0
+    return F - F_ant, F
+
+
+def inv_binomial_np(U, n: int, p: float) -> np.ndarray:
+    """
+    Inversa de Binomial(n, p) para un arreglo de U: menor k <= n con F(k) >= u,
+    con searchsorted sobre la tabla cacheada de (n, p).
+    """
+    n = max(int(n), 0)
+    p = min(max(float(p), 0.0), 1.0)
+    U = np.asarray(U, dtype=np.float64)
+    if n == 0 or p <= 0.0:
+        return np.zeros(U.shape, dtype=np.int64)
+    if p >= 1.0:
+        # Toda la masa en k = n (F(k) = 0 para k < n)
+        return np.where(U > 0.0, n, 0).astype(np.int64)
+    k0, tabla, k_fuera = _tabla_binomial(n, p)
+    j = np.searchsorted(tabla, U, side='left')
+    k = np.where(j < len(tabla), k0 + j, k_fuera)
+    return np.where(U <= 0.0, 0, k)
+
+
+def inv_binomial_u(u: float, n: int, p: float) -> int:
+    return int(inv_binomial_np(u, n, p))
+
+def box_muller(U1, U2, ambos: bool = False) -> np.ndarray:
+    """
+    Box-Muller sobre arreglos: R = sqrt(-2·ln(1-U1)), θ = 2π·U2 y Z = R·cos(θ).
+    Con ambos=True también devuelve R·sin(θ), independiente del anterior: cada
+    par aporta dos normales consecutivas (Z_2i = R·cos, Z_2i+1 = R·sin).
+    """
+    U1 = np.asarray(U1, dtype=np.float64)
+    U2 = np.asarray(U2, dtype=np.float64)
+    R = np.sqrt(-2.0 * np.log(1.0 - U1))
+    theta = 2.0 * np.pi * U2
+    if not ambos:
+        return R * np.cos(theta)
+    Z = np.empty(2 * R.size, dtype=np.float64)
+    Z[0::2] = R * np.cos(theta)
+    Z[1::2] = R * np.sin(theta)
+    return Z
+
+# ---------------- Registro de distribuciones ----------------
+class Distribucion:
+    """
+    Distribución generada por transformada inversa desde uniformes.
+
+    ppf(U, params) transforma un arreglo de U en valores de una sola vez. Si la
+    distribución usa k = u_por_variable(params) > 1 uniformes por grupo, U llega
+    como matriz (n, k) con un grupo por fila; cada grupo produce
+    variables_por_grupo(params) valores. parametros lista (clave, etiqueta,
+    valor por defecto) y sirve tanto para validar como para armar la interfaz.
+    """
+
+    nombre = ""
+    parametros: Tuple[Tuple[str, str, float], ...] = ()
+    # Claves de rangos que acepta: ('U',) o una por columna, p. ej. ('U1', 'U2')
+    claves_u: Tuple[str, ...] = ('U',)
+    # Parámetros que pueden quedar vacíos (se usa el valor por defecto)
+    opcionales: Tuple[str, ...] = ()
+    discreta = False
+    admite_ambos = False
+    formula = ""
+
+    def validar(self, params: Dict[str, float]) -> Dict[str, float]:
+        """Lee los parámetros (con sus valores por defecto); ValueError si no son válidos."""
+        return {clave: float(params.get(clave, defecto)) for clave, _, defecto in self.parametros}
+
+    def u_por_variable(self, params: Dict[str, float]) -> int:
+        return len(self.claves_u)
+
+    def variables_por_grupo(self, params: Dict[str, float]) -> int:
+        return 1
+
+    def ppf(self, U: np.ndarray, params: Dict[str, float]) -> np.ndarray:
+        raise NotImplementedError
+
+    def describir(self, params: Dict[str, float]) -> str:
+        return ", ".join(f"{etiqueta}={params[clave]}" for clave, etiqueta, _ in self.parametros)
+
+    def conjuntos(self, indices: Dict[str, str], params: Dict[str, float]) -> Tuple[List[IndexSet], str]:
+        """
+        Conjuntos de índices que usará la variable y su texto. Con varias claves
+        y todas presentes, cada una aporta una columna; si no, un solo rango.
+        """
+        if len(self.claves_u) > 1 and all((indices.get(c) or '').strip() for c in self.claves_u):
+            conjuntos = [parse_rangos(indices.get(c, '')) for c in self.claves_u]
+            texto = "; ".join(f"{c}={idx.texto()}" for c, idx in zip(self.claves_u, conjuntos))
+            return conjuntos, texto
+        idx = parse_rangos(indices.get('U') or indices.get(self.claves_u[0], ''))
+        return [idx], f"U={idx.texto()}"
+
+    def armar(self, columnas: List[np.ndarray], params: Dict[str, float]) -> np.ndarray:
+        """U para ppf a partir de los valores de cada conjunto (ver conjuntos)."""
+        if len(columnas) > 1:
+            n = min(len(c) for c in columnas)
+            return np.column_stack([c[:n] for c in columnas])
+        U = columnas[0]
+        k = self.u_por_variable(params)
+        if k > 1:
+            # Un solo rango: se toman grupos consecutivos de k valores
+            n = len(U) // k
+            U = U[:n * k].reshape(n, k)
+        return U
+
+    def tomar(self, numeros: Uniformes, indices: Dict[str, str], params: Dict[str, float]) -> Tuple[np.ndarray, str]:
+        """Reúne los U indicados en indices y devuelve (U, texto de índices)."""
+        conjuntos, texto = self.conjuntos(indices, params)
+        return self.armar([tomar_uniformes(numeros, idx) for idx in conjuntos], params), texto
+
+
+def _exigir(condicion: bool, mensaje: str) -> None:
+    if not condicion:
+        raise ValueError(mensaje)
+
+
+class _Exponencial(Distribucion):
+    nombre = "Exponencial"
+    parametros = (('lam', 'λ', 1.0),)
+    formula = "X = -λ·ln(1-U)"
+
+    def validar(self, params):
+        p = super().validar(params)
+        _exigir(p['lam'] > 0, "λ debe ser > 0")
+        return p
+
+    def ppf(self, U, params):
+        return params['lam'] * (-np.log(1.0 - U))
+
+
+class _Normal(Distribucion):
+    nombre = "Normal"
+    parametros = (('mu', 'μ', 0.0), ('sigma', 'σ', 1.0))
+    claves_u = ('U1', 'U2')
+    admite_ambos = True
+    formula = "X = μ + σ·√(-2·ln(1-U1))·cos(2π·U2)"
+
+    def validar(self, params):
+        p = super().validar(params)
+        _exigir(p['sigma'] > 0, "σ debe ser > 0")
+        p['ambos'] = bool(params.get('ambos', False))
+        return p
+
+    def variables_por_grupo(self, params):
+        return 2 if params.get('ambos') else 1
+
+    def ppf(self, U, params):
+        return params['mu'] + params['sigma'] * box_muller(U[:, 0], U[:, 1], params.get('ambos', False))
+
+
+class _Lognormal(_Normal):
+    nombre = "Lognormal"
+    parametros = (('mu', 'μ', 0.0), ('sigma', 'σ', 1.0))
+    formula = "X = exp(μ + σ·Z), Z normal estándar de Box-Muller (μ, σ de ln X)"
+
+    def ppf(self, U, params):
+        return np.exp(super().ppf(U, params))
+
+
+class _Poisson(Distribucion):
+    nombre = "Poisson"
+    parametros = (('lam', 'λ', 1.0),)
+    discreta = True
+    formula = "X = menor k con F(k) >= U"
+
+    def validar(self, params):
+        p = super().validar(params)
+        _exigir(p['lam'] >= 0, "λ debe ser ≥ 0")
+        return p
+
+    def ppf(self, U, params):
+        return inv_poisson_np(U, params['lam']).astype(np.float64)
+
+
+class _Geometrica(Distribucion):
+    nombre = "Geométrica"
+    parametros = (('p', 'p', 0.5),)
+    discreta = True
+    formula = "X = ⌈ln(1-U) / ln(1-p)⌉"
+
+    def validar(self, params):
+        p = super().validar(params)
+        _exigir(0 < p['p'] < 1, "p debe estar en (0,1)")
+        return p
+
+    def ppf(self, U, params):
+        return np.ceil(np.log(1.0 - U) / math.log(1.0 - params['p']))
+
+
+class _Binomial(Distribucion):
+    nombre = "Binomial"
+    parametros = (('n', 'n', 1), ('p', 'p', 0.5))
+    discreta = True
+    formula = "X = menor k <= n con F(k) >= U"
+
+    def validar(self, params):
+        p = {'n': int(float(params.get('n', 1))), 'p': float(params.get('p', 0.5))}
+        _exigir(p['n'] >= 0, "n debe ser ≥ 0")
+        _exigir(0 <= p['p'] <= 1, "p debe estar en [0,1]")
+        return p
+
+    def ppf(self, U, params):
+        return inv_binomial_np(U, params['n'], params['p']).astype(np.float64)
+
+
+class _Uniforme(Distribucion):
+    nombre = "Uniforme"
+    parametros = (('a', 'a', 0.0), ('b', 'b', 1.0))
+    formula = "X = a + (b-a)·U"
+
+    def validar(self, params):
+        p = super().validar(params)
+        _exigir(p['a'] < p['b'], "Debe cumplirse a < b")
+        return p
+
+    def ppf(self, U, params):
+        return params['a'] + (params['b'] - params['a']) * U
+
+
+class _Triangular(Distribucion):
+    nombre = "Triangular"
+    parametros = (('a', 'a', 0.0), ('c', 'c', 0.5), ('b', 'b', 1.0))
+    formula = "a = mínimo, c = moda, b = máximo; X = a + √(U(b-a)(c-a)) si U < (c-a)/(b-a), si no b - √((1-U)(b-a)(b-c))"
+
+    def validar(self, params):
+        p = super().validar(params)
+        _exigir(p['a'] < p['b'] and p['a'] <= p['c'] <= p['b'], "Debe cumplirse a ≤ c ≤ b y a < b")
+        return p
+
+    def ppf(self, U, params):
+        a, b, c = params['a'], params['b'], params['c']
+        Fc = (c - a) / (b - a)
+        izq = a + np.sqrt(U * (b - a) * (c - a))
+        der = b - np.sqrt((1.0 - U) * (b - a) * (b - c))
+        return np.where(U < Fc, izq, der)
+
+
+class _Erlang(Distribucion):
+    nombre = "Erlang"
+    parametros = (('k', 'k', 2), ('lam', 'λ', 1.0))
+    formula = "X = -λ·Σ ln(1-U_j), j = 1..k; k etapas de media λ (k U consecutivos por variable)"
+
+    def validar(self, params):
+        p = {'k': int(float(params.get('k', 2))), 'lam': float(params.get('lam', 1.0))}
+        _exigir(p['k'] >= 1, "k debe ser ≥ 1")
+        _exigir(p['lam'] > 0, "λ debe ser > 0")
+        return p
+
+    def u_por_variable(self, params):
+        return params['k']
+
+    def ppf(self, U, params):
+        U = np.asarray(U).reshape(len(U), -1)
+        return -params['lam'] * np.log(1.0 - U).sum(axis=1)
+
+
+class _Weibull(Distribucion):
+    nombre = "Weibull"
+    parametros = (('forma', 'k', 1.0), ('escala', 'λ', 1.0))
+    formula = "X = λ·(-ln(1-U))^(1/k); k = forma, λ = escala"
+
+    def validar(self, params):
+        p = super().validar(params)
+        _exigir(p['forma'] > 0 and p['escala'] > 0, "Forma y escala deben ser > 0")
+        return p
+
+    def ppf(self, U, params):
+        return params['escala'] * (-np.log(1.0 - U)) ** (1.0 / params['forma'])
+
+
+class InversaNumerica:
+    """
+    Inversa de una CDF continua sin forma cerrada.
+
+    Al construirla se tabulan cuantiles exactos x(F) (Newton acotado sobre una
+    tabla gruesa de la CDF) en nodos uniformes en F más colas geométricas, y se
+    refinan las celdas hasta que la interpolación de Hermite de x(F) (derivada
+    1/pdf) cumple tol. Evaluar U es entonces solo búsqueda en la tabla más un
+    polinomio; los pocos U fuera de la tabla (colas < 1e-15) y pulir=True
+    pasan por el pulido de Newton sobre la CDF.
+    """
+
+    def __init__(self, cdf: Callable, pdf: Callable, lo: float, hi: float, nodos: int = 1024, tol: float = 1e-10):
+        self.cdf, self.pdf, self.tol = cdf, pdf, tol
+        ancho = hi - lo
+        # Hacia lo se baja hasta ~1e-300 (cuantiles diminutos, p. ej. Gamma con forma < 1)
+        x = np.unique(np.concatenate([
+            np.linspace(lo, hi, 4 * nodos + 1),
+            lo + np.geomspace(ancho * 1e-300, ancho / nodos, 600),
+            hi - np.geomspace(ancho * 1e-16, ancho / nodos, 128),
+        ]))
+        F = np.asarray(cdf(x), dtype=np.float64)
+        crece = np.r_[True, np.diff(F) > 0]
+        self._xg, self._Fg = x[crece], F[crece]
+
+        colas = np.geomspace(1e-15, 1.0 / nodos, 48)
+        Fn = np.unique(np.concatenate([np.linspace(0.0, 1.0, nodos + 1)[1:-1], colas, 1.0 - colas]))
+        Fn = Fn[(Fn > self._Fg[0]) & (Fn < self._Fg[-1])]
+        xn = self._resolver(Fn)
+        for _ in range(12):
+            self._fijar(xn, Fn)
+            Fm = 0.5 * (self.F[:-1] + self.F[1:])
+            xm = self._resolver(Fm)
+            malo = np.abs(self._hermite(Fm) - xm) > tol * np.abs(xm)
+            if not malo.any():
+                break
+            Fn = np.concatenate([self.F, Fm[malo]])
+            xn = np.concatenate([self.x, xm[malo]])
+            orden = np.argsort(Fn)
+            Fn, xn = Fn[orden], xn[orden]
+
+    def _fijar(self, x: np.ndarray, F: np.ndarray) -> None:
+        crece = np.r_[True, (np.diff(F) > 0) & (np.diff(x) > 0)]
+        self.x, self.F = x[crece], F[crece]
+        with np.errstate(divide="ignore", over="ignore"):
+            dx = 1.0 / np.asarray(self.pdf(self.x), dtype=np.float64)
+        self.dx = np.where(np.isfinite(dx), dx, np.nan)
+
+    def _hermite(self, U: np.ndarray) -> np.ndarray:
+        """Hermite cúbico de x(F) en la tabla; lineal donde la pdf no es finita."""
+        x, F, dx = self.x, self.F, self.dx
+        j = np.clip(np.searchsorted(F, U, side='right'), 1, len(F) - 1)
+        a, b, h = x[j - 1], x[j], F[j] - F[j - 1]
+        t = np.clip((U - F[j - 1]) / h, 0.0, 1.0)
+        t2 = t * t
+        t3 = t2 * t
+        herm = ((2 * t3 - 3 * t2 + 1) * a + (t3 - 2 * t2 + t) * h * dx[j - 1]
+                + (3 * t2 - 2 * t3) * b + (t3 - t2) * h * dx[j])
+        return np.clip(np.where(np.isnan(herm), a + t * (b - a), herm), a, b)
+
+    def _resolver(self, U: np.ndarray, x0: Optional[np.ndarray] = None) -> np.ndarray:
+        """Newton acotado sobre la CDF (con bisección si el paso sale del intervalo)."""
+        U = np.asarray(U, dtype=np.float64).ravel()
+        xg, Fg = self._xg, self._Fg
+        j = np.clip(np.searchsorted(Fg, U, side='right'), 1, len(Fg) - 1)
+        a, b = xg[j - 1].copy(), xg[j].copy()
+        if x0 is None:
+            t = np.clip((U - Fg[j - 1]) / (Fg[j] - Fg[j - 1]), 0.0, 1.0)
+            X = a + t * (b - a)
+        else:
+            X = np.clip(np.asarray(x0, dtype=np.float64).ravel(), a, b)
+        activos = np.arange(U.size)
+        for _ in range(80):
+            if activos.size == 0:
+                break
+            xa = X[activos]
+            err = np.asarray(self.cdf(xa)) - U[activos]
+            sube = err < 0
+            a[activos] = np.where(sube, xa, a[activos])
+            b[activos] = np.where(sube, b[activos], xa)
+            with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+                nuevo = xa - err / np.asarray(self.pdf(xa))
+            fuera = ~np.isfinite(nuevo) | (nuevo <= a[activos]) | (nuevo >= b[activos])
+            aa, bb = a[activos], b[activos]
+            # Bisección geométrica si el intervalo abarca varios órdenes de magnitud
+            medio = np.where((aa > 0) & (bb > 2 * aa), np.sqrt(np.abs(aa * bb)), 0.5 * (aa + bb))
+            nuevo = np.where(fuera, medio, nuevo)
+            listo = (err == 0) | (np.abs(nuevo - xa) <= 1e-3 * self.tol * np.abs(xa)) | (a[activos] == b[activos])
+            X[activos] = np.where(err == 0, xa, nuevo)
+            activos = activos[~listo]
+        return X
+
+    def __call__(self, U, pulir: bool = False) -> np.ndarray:
+        U = np.asarray(U, dtype=np.float64)
+        X = self._hermite(U.ravel())
+        fuera = np.flatnonzero((U.ravel() < self.F[0]) | (U.ravel() > self.F[-1]))
+        if pulir:
+            X = self._resolver(U.ravel(), X)
+        elif fuera.size:
+            X[fuera] = self._resolver(U.ravel()[fuera])
+        return X.reshape(U.shape)
+
+
+def _cola_superior(cdf: Callable, inicio: float, paso: float, eps: float = 1e-17) -> float:
+    """Primer punto inicio + paso·2^j donde 1 - cdf < eps (extremo derecho de la tabla)."""
+    hi = inicio + paso
+    while 1.0 - float(cdf(np.array([hi]))[0]) >= eps:
+        paso *= 2
+        hi = inicio + paso
+    return hi
+
+
+@lru_cache(maxsize=16)
+def _inversa_gamma(forma: float, escala: float) -> InversaNumerica:
+    lg = math.lgamma(forma) + forma * math.log(escala)
+    cdf = lambda x: gamma_inc_reg(forma, np.asarray(x) / escala)[0]
+
+    def pdf(x):
+        x = np.asarray(x, dtype=np.float64)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(x > 0, np.exp((forma - 1) * np.log(np.where(x > 0, x, 1.0)) - x / escala - lg),
+                            np.inf if forma < 1 else (1.0 / escala if forma == 1 else 0.0))
+
+    media, desv = forma * escala, math.sqrt(forma) * escala
+    return InversaNumerica(cdf, pdf, 0.0, _cola_superior(cdf, media, 10 * desv))
+
+
+@lru_cache(maxsize=16)
+def _inversa_beta(alfa: float, beta: float) -> InversaNumerica:
+    lb = math.lgamma(alfa) + math.lgamma(beta) - math.lgamma(alfa + beta)
+    cdf = lambda x: beta_inc_reg(alfa, beta, x)
+
+    def pdf(x):
+        x = np.asarray(x, dtype=np.float64)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.exp((alfa - 1) * np.log(x) + (beta - 1) * np.log1p(-x) - lb)
+
+    return InversaNumerica(cdf, pdf, 0.0, 1.0)
+
+
+@lru_cache(maxsize=16)
+def _inversa_normal_truncada(mu: float, sigma: float, a: float, b: float) -> InversaNumerica:
+    lo = max(a, mu - 40 * sigma)
+    hi = min(b, mu + 40 * sigma)
+    # Φ(z) = 1 - Q/2 pierde los dígitos en la cola derecha; si el intervalo
+    # está a la derecha de μ se trabaja con la cola superior S(z) = Φ(-z):
+    # masa = S(a) - S(b) y F(x) = (S(a) - S(x)) / masa.
+    signo = -1.0 if lo + hi > 2 * mu else 1.0
+    Fa, Fb = (float(v) for v in normal_cdf([signo * (lo - mu) / sigma, signo * (hi - mu) / sigma]))
+    masa = signo * (Fb - Fa)
+    _exigir(masa > 0, "El intervalo [a, b] no tiene probabilidad apreciable")
+    cdf = lambda x: np.clip(signo * (normal_cdf(signo * (np.asarray(x) - mu) / sigma) - Fa) / masa, 0.0, 1.0)
+    pdf = lambda x: np.exp(-0.5 * ((np.asarray(x) - mu) / sigma) ** 2) / (sigma * math.sqrt(2 * math.pi) * masa)
+    return InversaNumerica(cdf, pdf, lo, hi)
+
+
+class _Gamma(Distribucion):
+    nombre = "Gamma"
+    parametros = (('forma', 'k', 2.0), ('escala', 'θ', 1.0))
+    formula = "X = F⁻¹(U) numérica; k = forma, θ = escala (media k·θ)"
+
+    def validar(self, params):
+        p = super().validar(params)
+        _exigir(p['forma'] > 0 and p['escala'] > 0, "Forma y escala deben ser > 0")
+        return p
+
+    def ppf(self, U, params):
+        return _inversa_gamma(params['forma'], params['escala'])(U)
+
+
+class _Beta(Distribucion):
+    nombre = "Beta"
+    parametros = (('alfa', 'α', 2.0), ('beta', 'β', 2.0))
+    formula = "X = F⁻¹(U) numérica en [0, 1]"
+
+    def validar(self, params):
+        p = super().validar(params)
+        _exigir(p['alfa'] > 0 and p['beta'] > 0, "α y β deben ser > 0")
+        return p
+
+    def ppf(self, U, params):
+        return _inversa_beta(params['alfa'], params['beta'])(U)
+
+
+class _NormalTruncada(Distribucion):
+    nombre = "Normal truncada"
+    parametros = (('mu', 'μ', 0.0), ('sigma', 'σ', 1.0), ('a', 'a', -math.inf), ('b', 'b', math.inf))
+    opcionales = ('a', 'b')
+    formula = "X = F⁻¹(U) numérica de N(μ, σ) restringida a [a, b] (un solo U por variable)"
+
+    def validar(self, params):
+        p = super().validar(params)
+        _exigir(p['sigma'] > 0, "σ debe ser > 0")
+        _exigir(p['a'] < p['b'], "Debe cumplirse a < b")
+        return p
+
+    def ppf(self, U, params):
+        return _inversa_normal_truncada(params['mu'], params['sigma'], params['a'], params['b'])(U)
+
+
+def _lista_numeros(valor) -> Tuple[float, ...]:
+    """Acepta "1, 2.5, 3" (o ; / espacios) o una secuencia y devuelve una tupla de floats."""
+    if isinstance(valor, str):
+        partes = valor.replace(';', ',').replace(' ', ',').split(',')
+        return tuple(float(x) for x in partes if x.strip())
+    return tuple(float(x) for x in np.asarray(valor, dtype=np.float64).ravel())
+
+
+@lru_cache(maxsize=32)
+def _tabla_empirica(valores: Tuple[float, ...], probs: Tuple[float, ...]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    (x, F, guía) para la inversa por tabla guía (Chen-Asau): guía[j] es el menor
+    i con F[i] >= j/m, así que para u en [j/m, (j+1)/m) la búsqueda arranca en
+    guía[j] y avanza en promedio O(1) posiciones. m = cantidad de valores.
+    """
+    x = np.array(valores, dtype=np.float64)
+    F = np.cumsum(np.array(probs, dtype=np.float64))
+    F /= F[-1]
+    F[-1] = 1.0
+    m = len(F)
+    guia = np.searchsorted(F, np.arange(m) / m, side='left')
+    for arr in (x, F, guia):
+        arr.setflags(write=False)
+    return x, F, guia
+
+
+def inv_empirica_np(U, valores, probs) -> np.ndarray:
+    """Inversa de la distribución discreta (valores, probs): x_i con el menor i tal que F_i >= u."""
+    x, F, guia = _tabla_empirica(tuple(valores), tuple(probs))
+    U = np.asarray(U, dtype=np.float64)
+    m = len(F)
+    i = guia[np.minimum((U * m).astype(np.int64), m - 1)]
+    pendientes = np.flatnonzero(F[i] < U)
+    while pendientes.size:
+        i[pendientes] += 1
+        pendientes = pendientes[F[i[pendientes]] < U[pendientes]]
+    return x[i]
+
+
+class _Empirica(Distribucion):
+    nombre = "Empírica"
+    parametros = (('valores', 'valores', ''), ('probs', 'probabilidades', ''))
+    opcionales = ('probs',)
+    discreta = True
+    formula = ("X = x_i con el menor i tal que F_i >= U (tabla guía). Sin probabilidades, "
+               "los valores se toman como datos observados.")
+
+    def validar(self, params):
+        valores = _lista_numeros(params.get('valores', ''))
+        probs = _lista_numeros(params.get('probs', '') or ())
+        _exigir(len(valores) > 0, "Indique los valores")
+        if not probs:
+            # Datos observados: frecuencia relativa de cada valor distinto
+            unicos, cuentas = np.unique(np.array(valores), return_counts=True)
+            valores, probs = tuple(unicos.tolist()), tuple(float(c) for c in cuentas)
+        _exigir(len(probs) == len(valores), "Debe haber una probabilidad por valor")
+        _exigir(all(p >= 0 for p in probs) and sum(probs) > 0,
+                "Las probabilidades deben ser ≥ 0 y no todas nulas")
+        total = math.fsum(probs)
+        return {'valores': valores, 'probs': tuple(p / total for p in probs)}
+
+    def describir(self, params):
+        pares = [f"{x:g}:{p:.4g}" for x, p in zip(params['valores'], params['probs'])]
+        if len(pares) > 8:
+            pares = pares[:8] + [f"... ({len(params['valores'])} valores)"]
+        return "x:p = " + ", ".join(pares)
+
+    def ppf(self, U, params):
+        return inv_empirica_np(U, params['valores'], params['probs'])
+
+
+DISTRIBUCIONES: Dict[str, Distribucion] = {}
+
+
+def registrar_distribucion(dist: Distribucion) -> None:
+    """Agrega (o reemplaza) una distribución; queda disponible en ambas interfaces."""
+    DISTRIBUCIONES[dist.nombre] = dist
+
+
+for _d in (_Exponencial(), _Normal(), _Poisson(), _Geometrica(), _Binomial(),
+           _Uniforme(), _Triangular(), _Erlang(), _Weibull(), _Lognormal(), _Empirica(),
+           _Gamma(), _Beta(), _NormalTruncada()):
+    registrar_distribucion(_d)
+
+
+def buscar_distribucion(nombre: str) -> Optional[Distribucion]:
+    """Distribución registrada con ese nombre, sin distinguir mayúsculas."""
+    nombre = (nombre or '').strip().lower()
+    for clave, dist in DISTRIBUCIONES.items():
+        if clave.lower() == nombre:
+            return dist
+    return None
+
+
+def indices_desde_texto(texto: str) -> Dict[str, str]:
+    """Inverso del texto de índices de meta: "U1=1-5; U2=6-10" -> {'U1': '1-5', 'U2': '6-10'}."""
+    indices: Dict[str, str] = {}
+    for parte in (texto or '').split(';'):
+        if '=' in parte:
+            clave, rangos = parte.split('=', 1)
+            indices[clave.strip()] = rangos.strip()
+    return indices
+
+
+def _meta_variable(dist: Distribucion, p: Dict[str, float], texto: str) -> Dict[str, str]:
+    meta: Dict[str, str] = {"dist": dist.nombre, "params": dist.describir(p), "indices": texto}
+    if p.get('ambos'):
+        meta['modo'] = 'ambos'
+    return meta
+
+
+def generar_variable(
+    tipo: str,
+    numeros: Uniformes,
+    nombre: str,
+    params: Dict[str, float],
+    indices: Dict[str, str],
+) -> Tuple[np.ndarray, Dict[str, str]]:
+    """
+    Genera una variable a partir de números uniformes y devuelve (valores, meta).
+    Lanza ValueError si los parámetros no son válidos para la distribución.
+    """
+    dist = buscar_distribucion(tipo)
+    if dist is None:
+        return np.empty(0), {"dist": (tipo or '').strip(), "params": "", "indices": ""}
+    p = dist.validar(params)
+    U, texto = dist.tomar(numeros, indices, p)
+    valores = np.asarray(dist.ppf(U, p), dtype=np.float64)
+    return valores, _meta_variable(dist, p, texto)
+
+
+# ---------------- Generación por lotes ----------------
+class EspecVariable(NamedTuple):
+    nombre: str
+    tipo: str
+    params: Dict[str, float]
+    indices: Dict[str, str]
+
+
+def _solapes(usos: List[Tuple[str, IndexSet]]) -> List[Tuple[str, str, str]]:
+    """
+    Pares de variables distintas que comparten índices: (nombre1, nombre2,
+    primer tramo compartido 1-based). Barrido sobre los intervalos ordenados.
+    """
+    tramos = sorted((a, b, nombre) for nombre, idx in usos for a, b in idx.intervalos)
+    solapes: List[Tuple[str, str, str]] = []
+    vistos = set()
+    activos: List[Tuple[int, str]] = []  # (fin, nombre) de los intervalos abiertos
+    for a, b, nombre in tramos:
+        activos = [(fin, otro) for fin, otro in activos if fin > a]
+        for fin, otro in activos:
+            par = tuple(sorted((otro, nombre)))
+            if otro != nombre and par not in vistos:
+                vistos.add(par)
+                hi = min(fin, b)
+                solapes.append((par[0], par[1], f"{a + 1}" if hi - a == 1 else f"{a + 1}-{hi}"))
+        activos.append((b, nombre))
+    return solapes
+
+
+def _ubicar(idx: IndexSet, union: IndexSet) -> List[slice]:
+    """Posiciones de idx dentro del arreglo reunido con union (idx ⊆ union)."""
+    inis = [a for a, _ in union.intervalos]
+    res = []
+    for a, b in idx.intervalos:
+        j = bisect.bisect_right(inis, a) - 1
+        base = union._acum[j] + a - inis[j]
+        res.append(slice(base, base + b - a))
+    return res
+
+
+def generar_variables(
+    specs: List[EspecVariable], numeros: Uniformes, permitir_solape: bool = False
+) -> Dict[str, Tuple[np.ndarray, Dict[str, str]]]:
+    """
+    Genera varias variables con una sola pasada sobre numeros y devuelve
+    {nombre: (valores, meta)} en el orden de specs.
+
+    Se validan todas las especificaciones antes de tocar los números; si dos
+    variables distintas comparten índices de U (quedarían correlacionadas) se
+    lanza ValueError, salvo con permitir_solape=True. Luego se reúne la unión
+    de todos los rangos de una vez y cada variable toma sus U de ese arreglo.
+    """
+    preparadas = []
+    usos: List[Tuple[str, IndexSet]] = []
+    nombres = set()
+    for spec in specs:
+        nombre = (spec.nombre or '').strip()
+        _exigir(bool(nombre), "Cada variable necesita un nombre")
+        _exigir(nombre not in nombres, f"Variable repetida: {nombre}")
+        nombres.add(nombre)
+        dist = buscar_distribucion(spec.tipo)
+        _exigir(dist is not None, f"{nombre}: distribución desconocida ({spec.tipo})")
+        try:
+            p = dist.validar(spec.params)
+        except ValueError as e:
+            raise ValueError(f"{nombre}: {e}") from None
+        conjuntos, texto = dist.conjuntos(spec.indices, p)
+        conjuntos = [idx.recortar(len(numeros)) for idx in conjuntos]
+        _exigir(any(len(idx) for idx in conjuntos), f"{nombre}: no hay U en los rangos indicados")
+        preparadas.append((nombre, dist, p, conjuntos, texto))
+        usos.extend((nombre, idx) for idx in conjuntos)
+
+    if not permitir_solape:
+        solapes = _solapes(usos)
+        if solapes:
+            a, b, tramo = solapes[0]
+            raise ValueError(f"Las variables '{a}' y '{b}' comparten los índices U {tramo}")
+
+    union = IndexSet(t for _, idx in usos for t in idx.intervalos)
+    reunidos = tomar_uniformes(numeros, union)
+    resultado: Dict[str, Tuple[np.ndarray, Dict[str, str]]] = {}
+    for nombre, dist, p, conjuntos, texto in preparadas:
+        columnas = []
+        for idx in conjuntos:
+            partes = [reunidos[s] for s in _ubicar(idx, union)]
+            columnas.append(partes[0] if len(partes) == 1 else np.concatenate(partes))
+        U = dist.armar(columnas, p)
+        valores = np.asarray(dist.ppf(U, p), dtype=np.float64)
+        resultado[nombre] = (valores, _meta_variable(dist, p, texto))
+    return resultado
+
+
+def leer_especificaciones(ruta: str) -> List[EspecVariable]:
+    """
+    Lee un archivo JSON con una lista de variables:
+        [{"nombre": "llegadas", "dist": "Exponencial", "params": {"lam": 2},
+          "indices": {"U": "1-100"}}, ...]
+    indices también puede ser texto ("U1=1-50; U2=51-100").
+    """
+    with open(ruta, encoding="utf-8") as f:
+        datos = json.load(f)
+    if isinstance(datos, dict):
+        datos = datos.get("variables", [])
+    _exigir(isinstance(datos, list), "El archivo debe contener una lista de variables")
+    specs = []
+    for j, d in enumerate(datos, 1):
+        _exigir(isinstance(d, dict), f"Entrada {j}: se esperaba un objeto")
+        indices = d.get("indices", {})
+        if isinstance(indices, str):
+            indices = indices_desde_texto(indices) if '=' in indices else {'U': indices}
+        specs.append(EspecVariable(
+            str(d.get("nombre", "")), str(d.get("dist", d.get("tipo", ""))), dict(d.get("params", {})), dict(indices)
+        ))
+    return specs
+
+# ---------------- Caché de variables ----------------
+class CacheVariables:
+    """
+    Caché LRU de generar_variable acotada por memoria.
+
+    La clave es (clave de la fuente, distribución, parámetros validados,
+    intervalos de índices), así que volver a una combinación ya generada
+    devuelve el mismo arreglo sin recalcular. Cuando los arreglos guardados
+    superan max_bytes se descartan los usados hace más tiempo. Los valores se
+    devuelven de solo lectura porque se comparten entre llamadas.
+    """
+
+    def __init__(self, max_bytes: int = 64 << 20):
+        self.max_bytes = max_bytes
+        self._datos: "OrderedDict[tuple, Tuple[np.ndarray, Dict[str, str]]]" = OrderedDict()
+        self.bytes = 0
+        self.aciertos = 0
+        self.fallos = 0
+
+    def __len__(self) -> int:
+        return len(self._datos)
+
+    @staticmethod
+    def clave(clave_fuente, tipo: str, params: Dict[str, float], indices: Dict[str, str]) -> Optional[tuple]:
+        """Clave normalizada (p. ej. "1-5,6-10" y "1-10" coinciden); None si tipo no existe."""
+        dist = buscar_distribucion(tipo)
+        if dist is None:
+            return None
+        p = dist.validar(params)
+        conjuntos, _ = dist.conjuntos(indices, p)
+        return (clave_fuente, dist.nombre, tuple(sorted(p.items())),
+                tuple(idx.intervalos for idx in conjuntos))
+
+    def generar(
+        self,
+        clave_fuente,
+        tipo: str,
+        numeros: Uniformes,
+        nombre: str,
+        params: Dict[str, float],
+        indices: Dict[str, str],
+    ) -> Tuple[np.ndarray, Dict[str, str]]:
+        """
+        Igual que generar_variable pero reutilizando resultados previos.
+        clave_fuente identifica a numeros (método y parámetros del generador);
+        con None no se usa la caché.
+        """
+        clave = None if clave_fuente is None else self.clave(clave_fuente, tipo, params, indices)
+        if clave is not None and clave in self._datos:
+            self._datos.move_to_end(clave)
+            self.aciertos += 1
+            valores, meta = self._datos[clave]
+            return valores, dict(meta)
+        self.fallos += 1
+        valores, meta = generar_variable(tipo, numeros, nombre, params, indices)
+        if clave is not None and valores.nbytes <= self.max_bytes:
+            valores.setflags(write=False)
+            self._datos[clave] = (valores, dict(meta))
+            self.bytes += valores.nbytes
+            while self.bytes > self.max_bytes:
+                _, (viejo, _) = self._datos.popitem(last=False)
+                self.bytes -= viejo.nbytes
+        return valores, meta
+
+    def limpiar(self) -> None:
+        self._datos.clear()
+        self.bytes = 0
+
+    def resumen(self) -> str:
+        return (f"caché: {self.aciertos} aciertos, {self.fallos} fallos, "
+                f"{len(self)} variables, {self.bytes / (1 << 20):.1f} MiB")
+
+
+# ---------------- Dependencias ----------------
+class GrafoDependencias:
+    """
+    Cálculos encadenados (números → variables → tablas) que se rehacen solo
+    cuando hace falta.
+
+    Un nodo es un valor de entrada (fijar) o un cálculo sobre otros nodos
+    (definir). Cambiar un nodo no recalcula nada: solo marca como sucios los
+    que dependen de él. valor(nombre) recalcula, en orden, los nodos sucios de
+    los que depende lo pedido, así que lo que no se mira no se recalcula.
+    """
+
+    def __init__(self):
+        self._calculos: Dict[str, Callable] = {}
+        self._deps: Dict[str, Tuple[str, ...]] = {}
+        self._dependientes: Dict[str, set] = {}
+        self._valores: Dict[str, object] = {}
+        self._sucios: set = set()
+        self.recalculos = 0
+
+    def __contains__(self, nombre: str) -> bool:
+        return nombre in self._valores or nombre in self._calculos
+
+    def _desconectar(self, nombre: str) -> None:
+        for d in self._deps.pop(nombre, ()):
+            self._dependientes.get(d, set()).discard(nombre)
+        self._calculos.pop(nombre, None)
+
+    def _alcanza(self, desde, objetivo: str) -> bool:
+        """True si objetivo está entre desde o sus dependencias (directas o no)."""
+        pendientes, vistos = list(desde), set()
+        while pendientes:
+            n = pendientes.pop()
+            if n == objetivo:
+                return True
+            if n not in vistos:
+                vistos.add(n)
+                pendientes.extend(self._deps.get(n, ()))
+        return False
+
+    def invalidar(self, nombre: str) -> None:
+        """Marca como sucios los nodos que dependen de nombre (y a él, si es un cálculo)."""
+        pendientes = [nombre]
+        while pendientes:
+            n = pendientes.pop()
+            if n in self._calculos and n not in self._sucios:
+                self._sucios.add(n)
+            pendientes.extend(d for d in self._dependientes.get(n, ()) if d not in self._sucios)
+
+    def fijar(self, nombre: str, valor) -> None:
+        """Nodo de entrada con valor dado; lo que depende de él queda sucio."""
+        self._desconectar(nombre)
+        self._sucios.discard(nombre)
+        self._valores[nombre] = valor
+        self.invalidar(nombre)
+
+    def definir(self, nombre: str, calcular: Callable, depende: Tuple[str, ...] = ()) -> None:
+        """
+        Nodo calculado como calcular(*valores de depende). Queda sucio (igual
+        que lo que dependa de él) hasta el próximo valor(). ValueError si
+        formaría un ciclo.
+        """
+        depende = tuple(depende)
+        _exigir(not self._alcanza(depende, nombre), f"Dependencia circular en '{nombre}'")
+        self._desconectar(nombre)
+        self._calculos[nombre] = calcular
+        self._deps[nombre] = depende
+        for d in depende:
+            self._dependientes.setdefault(d, set()).add(nombre)
+        self.invalidar(nombre)
+
+    def quitar(self, nombre: str) -> None:
+        self.invalidar(nombre)
+        self._desconectar(nombre)
+        self._valores.pop(nombre, None)
+        self._sucios.discard(nombre)
+
+    def sucio(self, nombre: str) -> bool:
+        return nombre in self._sucios
+
+    def dependencias(self, nombre: str) -> Tuple[str, ...]:
+        return self._deps.get(nombre, ())
+
+    def valor(self, nombre: str):
+        """Valor actual del nodo, recalculando antes lo que esté sucio. KeyError si no existe."""
+        if nombre not in self:
+            raise KeyError(nombre)
+        if nombre in self._sucios:
+            args = [self.valor(d) for d in self._deps[nombre]]
+            self._valores[nombre] = self._calculos[nombre](*args)
+            self._sucios.discard(nombre)
+            self.recalculos += 1
+        return self._valores[nombre]
+
+
+# ---------------- Colas ----------------
+class TablaColas(NamedTuple):
+    """Columnas de la tabla de colas (sin redondear), un elemento por cliente."""
+    llegada: np.ndarray     # A: tiempo entre llegadas
+    arribo: np.ndarray      # B: instante de arribo
+    inicio: np.ndarray      # C: inicio de atención
+    atencion: np.ndarray    # D: tiempo de atención
+    fin: np.ndarray         # E: fin de atención
+    sistema: np.ndarray     # F: tiempo en el sistema (inspección)
+    espera: np.ndarray      # G: tiempo en espera
+    promedio: np.ndarray    # promedio acumulado de F
+
+
+class EstadoColas(NamedTuple):
+    """Lo que pasa de un tramo de clientes al siguiente en la cola de un servidor."""
+    clientes: int = 0           # clientes ya atendidos
+    arribo: float = 0.0         # instante de arribo del último cliente
+    fin: float = 0.0            # fin de atención del último cliente
+    promedio: float = 0.0       # promedio acumulado de F hasta el último cliente
+
+
+def _acumular(x: np.ndarray, previo: float) -> np.ndarray:
+    """cumsum(x) partiendo de previo: misma suma, en el mismo orden, que si el tramo no se hubiera cortado."""
+    if not previo:
+        return np.cumsum(x)
+    return np.cumsum(np.concatenate(([previo], x)))[1:]
+
+
+def _promedio_corrido(F: np.ndarray, prom: float = 0.0, previos: int = 0) -> np.ndarray:
+    """
+    Promedio acumulado de F con la recursión de la tabla original,
+    prom = (prom·i + F) / (i + 1), cliente por cliente. cumsum(F) / i da
+    casi lo mismo pero redondea distinto en los empates a medio centavo
+    (p. ej. con datos enteros), por eso este paso no se vectoriza.
+    """
+    salida = F.tolist()
+    i = previos
+    for k, f in enumerate(salida):
+        prom = f if i == 0 else (prom * i + f) / (i + 1)
+        salida[k] = prom
+        i += 1
+    return np.array(salida, dtype=np.float64)
+
+
+def _lindley(A: np.ndarray, D: np.ndarray, arribo: float = 0.0, fin: float = 0.0) -> Tuple[np.ndarray, ...]:
+    """
+    Arribo, inicio y fin (B, C, E) de la cola FIFO de un servidor, vectorizado.
+
+    Con S = suma acumulada de las atenciones, E_i = max(B_i, E_{i-1}) + D_i
+    equivale a E_i - S_i = max(E_0, max_{j<=i} (B_j - S_{j-1})), que es un
+    máximo acumulado; así todo sale de cumsum y maximum.accumulate sin
+    recorrer clientes en Python. arribo y fin son los del último cliente
+    de un tramo anterior. C y E pueden diferir en el último bit de la
+    cadena E = C + D cliente por cliente, así que sirve para estadísticos
+    (simulate_colas_resumen) pero no para la tabla (ver _cola_secuencial).
+    """
+    n = len(A)
+    B = _acumular(A, arribo)
+    S = np.cumsum(D)
+    S_prev = np.empty(n)
+    S_prev[:1] = 0.0
+    S_prev[1:] = S[:-1]
+    E = S + np.maximum(np.maximum.accumulate(B - S_prev), fin)
+    # Inicio y fin se recalculan por cliente desde el fin anterior, de modo
+    # que la espera es exactamente 0 cuando el servidor está libre.
+    E_prev = np.empty(n)
+    E_prev[:1] = fin
+    E_prev[1:] = E[:-1]
+    C = np.maximum(B, E_prev)
+    return B, C, C + D
+
+
+def _cola_secuencial(
+    B: np.ndarray, D: np.ndarray, fin: float = 0.0, prom: float = 0.0, previos: int = 0
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Inicio, fin y promedio acumulado de F (C, E, prom) con la misma cadena de
+    sumas que la tabla original: C = max(B, E_anterior), E = C + D y
+    prom = (prom·i + F) / (i + 1), cliente por cliente. Así cada columna
+    coincide bit a bit con ella y el redondeo a 2 decimales también en los
+    empates a medio centavo. fin, prom y previos vienen de un tramo anterior.
+    """
+    C = B.tolist()
+    E = D.tolist()
+    P = [0.0] * len(C)
+    i = previos
+    for k, b in enumerate(C):
+        c = b if b > fin else fin
+        fin = c + E[k]
+        f = fin - b
+        prom = f if i == 0 else (prom * i + f) / (i + 1)
+        C[k] = c
+        E[k] = fin
+        P[k] = prom
+        i += 1
+    return np.array(C, dtype=np.float64), np.array(E, dtype=np.float64), np.array(P, dtype=np.float64)
+
+
+def simulate_colas_np(llegada, atencion, estado: Optional[EstadoColas] = None) -> TablaColas:
+    """
+    Cola de un servidor FIFO. Los arribos salen de un cumsum; inicio, fin y
+    promedio de un único recorrido por clientes sin redondeos ni tuplas
+    (_cola_secuencial), que reproduce exactamente la tabla original. estado
+    es lo dejado por un tramo anterior (None al empezar), para procesar
+    corridas largas por partes.
+    """
+    if estado is None:
+        estado = EstadoColas()
+    n = min(len(llegada), len(atencion))
+    A = np.asarray(llegada[:n], dtype=np.float64)
+    D = np.asarray(atencion[:n], dtype=np.float64)
+    B = _acumular(A, estado.arribo)
+    C, E, prom = _cola_secuencial(B, D, estado.fin, estado.promedio, estado.clientes)
+    F = E - B
+    G = C - B
+    return TablaColas(A, B, C, D, E, F, G, prom)
+
+
+def simulate_colas(llegada: List[float], atencion: List[float]) -> List[Tuple]:
+    """
+    Tabla de colas de un servidor: filas (cliente, A, B, C, D, E, F, G,
+    promedio de F) redondeadas a 2 decimales. Ver simulate_colas_np.
+    """
+    n = min(len(llegada), len(atencion))
+    if n <= 0:
+        return []
+    return _filas_colas(simulate_colas_np(llegada, atencion))
+
+
+def simulate_colas_tramo(
+    llegada: List[float], atencion: List[float], estado: Optional[EstadoColas] = None
+) -> Tuple[List[Tuple], EstadoColas]:
+    """
+    simulate_colas a partir de estado (None = cola vacía en t=0).
+
+    Devuelve las filas del tramo, numeradas desde estado.clientes + 1, y el
+    estado para seguir con los clientes siguientes.
+    """
+    if estado is None:
+        estado = EstadoColas()
+    n = min(len(llegada), len(atencion))
+    if n <= 0:
+        return [], estado
+    t = simulate_colas_np(llegada, atencion, estado)
+    nuevo = EstadoColas(estado.clientes + n, float(t.arribo[-1]), float(t.fin[-1]), float(t.promedio[-1]))
+    return _filas_colas(t, inicio=estado.clientes + 1), nuevo
+
+
+def _redondear(c: np.ndarray) -> List[float]:
+    """
+    round(x, 2) de Python para cada elemento. np.round escala por 100 y
+    redondea al par, así que puede diferir solo cerca de medio centavo;
+    esos pocos se recalculan con round.
+    """
+    c = np.asarray(c, dtype=np.float64)
+    salida = np.round(c, 2).tolist()
+    y = c * 100.0
+    with np.errstate(invalid="ignore"):
+        dudosos = np.flatnonzero(np.abs(y - np.floor(y) - 0.5) <= 1e-9 + 1e-12 * np.abs(y))
+    for k in dudosos.tolist():
+        salida[k] = round(float(c[k]), 2)
+    return salida
+
+
+def _filas_colas(t: TablaColas, *extras, inicio: int = 1) -> List[Tuple]:
+    """Filas (cliente, A..G, promedio, *extras) redondeadas a 2 decimales."""
+    columnas = [_redondear(c) for c in t]
+    return list(zip(range(inicio, inicio + len(t.arribo)), *columnas, *(e.tolist() for e in extras)))
+
+
+def _velocidades(servidores) -> List[float]:
+    """c (servidores idénticos) o la lista de velocidades de cada servidor."""
+    if isinstance(servidores, (int, np.integer)):
+        _exigir(servidores >= 1, "Debe haber al menos un servidor")
+        return [1.0] * int(servidores)
+    velocidades = [float(v) for v in servidores]
+    _exigir(len(velocidades) >= 1, "Debe haber al menos un servidor")
+    _exigir(all(v > 0 for v in velocidades), "Las velocidades deben ser > 0")
+    return velocidades
+
+
+def leer_servidores(texto: str):
+    """ "3" -> 3 servidores idénticos; "1, 1.5, 0.8" -> velocidades de cada uno."""
+    texto = (texto or '').strip()
+    if not texto:
+        return 1
+    if ',' in texto:
+        return [float(v) for v in texto.split(',') if v.strip()]
+    return int(float(texto))
+
+
+def simulate_colas_servidores_np(llegada, atencion, servidores=1) -> Tuple[TablaColas, np.ndarray]:
+    """
+    Cola FIFO con c servidores en paralelo (M/G/c con los tiempos dados).
+
+    servidores es c (idénticos) o la lista de velocidades: el servidor j
+    atiende en atencion / velocidad[j]. Cada cliente, en orden de llegada,
+    pasa al servidor que se libera primero (empate: el de menor número); los
+    instantes de liberación viven en un heap, así que cada cliente cuesta
+    O(log c). Devuelve (tabla, servidor 1-based de cada cliente); en la tabla
+    la atención es la efectiva. Con un servidor de velocidad 1 equivale a
+    simulate_colas_np.
+    """
+    velocidades = _velocidades(servidores)
+    n = min(len(llegada), len(atencion))
+    if len(velocidades) == 1 and velocidades[0] == 1.0:
+        return simulate_colas_np(llegada, atencion), np.ones(n, dtype=np.int64)
+    A = np.asarray(llegada[:n], dtype=np.float64)
+    B = np.cumsum(A)
+    D = np.asarray(atencion[:n], dtype=np.float64)
+    inversas = [1.0 / v for v in velocidades]
+    libres = [(0.0, j) for j in range(len(velocidades))]
+    inicio = [0.0] * n
+    fin = [0.0] * n
+    asignado = [0] * n
+    reemplazar = heapq.heapreplace
+    for i, (b, d) in enumerate(zip(B.tolist(), D.tolist())):
+        libre, j = libres[0]
+        c = b if b > libre else libre
+        e = c + d * inversas[j]
+        reemplazar(libres, (e, j))
+        inicio[i] = c
+        fin[i] = e
+        asignado[i] = j
+    C = np.array(inicio)
+    E = np.array(fin)
+    F = E - B
+    G = C - B
+    prom = _promedio_corrido(F)
+    return TablaColas(A, B, C, E - C, E, F, G, prom), np.array(asignado, dtype=np.int64) + 1
+
+
+def simulate_colas_servidores(llegada: List[float], atencion: List[float], servidores=1) -> List[Tuple]:
+    """Filas de simulate_colas (redondeadas) con el número de servidor al final."""
+    n = min(len(llegada), len(atencion))
+    if n <= 0:
+        return []
+    return _filas_colas(*simulate_colas_servidores_np(llegada, atencion, servidores))
+
+# ---------------- Estado por tramos ----------------
+_ESTADOS = {"colas": EstadoColas, "entregas": EstadoEntregas}
+
+
+def guardar_estado(ruta: str, estado: Union[EstadoColas, EstadoEntregas]) -> None:
+    """
+    Guarda el estado de una corrida por tramos en JSON para retomarla luego.
+
+    Se escribe un archivo temporal en la misma carpeta y se reemplaza al
+    final, así un corte a mitad de la escritura deja el punto de control
+    anterior intacto.
+    """
+    tipo = next((k for k, v in _ESTADOS.items() if isinstance(estado, v)), None)
+    _exigir(tipo is not None, "estado debe ser EstadoColas o EstadoEntregas")
+    tmp = f"{ruta}.tmp"
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"tipo": tipo, **estado._asdict()}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, ruta)
+    except BaseException:
+        # Si falla la escritura (p. ej. un valor no serializable) no queda
+        # el temporal a medio escribir junto al punto de control.
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def cargar_estado(ruta: str) -> Union[EstadoColas, EstadoEntregas]:
+    """Lee un estado escrito por guardar_estado."""
+    with open(ruta, encoding="utf-8") as f:
+        datos = json.load(f)
+    _exigir(isinstance(datos, dict) and datos.get("tipo") in _ESTADOS, f"{ruta}: no es un estado de simulación")
+    clase = _ESTADOS[datos.pop("tipo")]
+    _exigir(set(datos) == set(clase._fields), f"{ruta}: campos esperados {', '.join(clase._fields)}")
+    return clase(**datos)
+
+
+# ---------------- Resumen en flujo ----------------
+class CuantilesLog:
+    """
+    Cuantiles aproximados de una serie que llega por bloques, con error
+    relativo acotado (cubetas logarítmicas, como DDSketch).
+
+    Cada x > 0 cuenta en la cubeta i = ceil(log_γ x), con γ = (1 + α)/(1 - α),
+    y un cuantil se informa como el centro 2γ^i/(γ + 1) de su cubeta, que está
+    a menos de α·x del dato de ese rango. Agregar un bloque es un np.log y un
+    bincount; la memoria depende del rango de los datos (unas
+    ln(máx/mín)/(2α) cubetas), no de cuántos son. Los negativos van en otro
+    histograma y los |x| < 1e-12 cuentan como 0 (p. ej. esperas nulas).
+    """
+
+    __slots__ = ("alfa", "_lg", "_pos", "_neg", "ceros", "n")
+
+    _MINIMO = 1e-12
+
+    def __init__(self, alfa: float = 1e-4):
+        _exigir(0.0 < alfa < 1.0, "El error relativo debe estar entre 0 y 1")
+        self.alfa = alfa
+        self._lg = math.log((1 + alfa) / (1 - alfa))
+        self._pos = (0, np.zeros(0, dtype=np.int64))    # (índice de la primera cubeta, conteos)
+        self._neg = (0, np.zeros(0, dtype=np.int64))
+        self.ceros = 0
+        self.n = 0
+
+    def _contar(self, hist: Tuple[int, np.ndarray], a: np.ndarray) -> Tuple[int, np.ndarray]:
+        if a.size == 0:
+            return hist
+        idx = np.ceil(np.log(a) / self._lg).astype(np.int64)
+        base, cuenta = hist
+        lo, hi = int(idx.min()), int(idx.max())
+        if cuenta.size == 0:
+            base, cuenta = lo, np.zeros(hi - lo + 1, dtype=np.int64)
+        elif lo < base or hi >= base + cuenta.size:
+            nuevo_base = min(base, lo)
+            nueva = np.zeros(max(base + cuenta.size - 1, hi) - nuevo_base + 1, dtype=np.int64)
+            nueva[base - nuevo_base:base - nuevo_base + cuenta.size] = cuenta
+            base, cuenta = nuevo_base, nueva
+        cuenta += np.bincount(idx - base, minlength=cuenta.size)
+        return base, cuenta
+
+    def agregar(self, valores) -> None:
+        x = np.asarray(valores, dtype=np.float64).ravel()
+        self.n += x.size
+        grande = np.abs(x) >= self._MINIMO
+        self.ceros += int(x.size - np.count_nonzero(grande))
+        self._pos = self._contar(self._pos, x[grande & (x > 0)])
+        self._neg = self._contar(self._neg, -x[grande & (x < 0)])
+
+    def _centro(self, i: int) -> float:
+        return 2.0 * math.exp(i * self._lg) / ((1 + self.alfa) / (1 - self.alfa) + 1.0)
+
+    def cuantil(self, p: float) -> float:
+        """Valor de rango floor(p·(n - 1)) (0 = el menor), a menos de α relativo; nan si no hay datos."""
+        _exigir(0.0 <= p <= 1.0, "El cuantil debe estar entre 0 y 1")
+        if self.n == 0:
+            return math.nan
+        rango = math.floor(p * (self.n - 1))
+        base, cuenta = self._neg
+        if cuenta.size:
+            acum = np.cumsum(cuenta[::-1])      # de la cubeta más negativa a la más cercana a 0
+            j = int(np.searchsorted(acum, rango, side="right"))
+            if j < acum.size:
+                return -self._centro(base + cuenta.size - 1 - j)
+            rango -= int(acum[-1])
+        if rango < self.ceros:
+            return 0.0
+        rango -= self.ceros
+        base, cuenta = self._pos
+        j = int(np.searchsorted(np.cumsum(cuenta), rango, side="right"))
+        return self._centro(base + min(j, cuenta.size - 1))
+
+
+class Acumulador:
+    """
+    Estadísticos de una serie que llega por bloques: media y varianza de
+    Welford (cada bloque se combina con la fórmula de Chan), mínimo, máximo y
+    cuantiles con error relativo alfa (CuantilesLog). Todo se actualiza por
+    bloque con NumPy; memoria constante.
+    """
+
+    __slots__ = ("n", "media", "_m2", "minimo", "maximo", "cuantiles", "bosquejo")
+
+    def __init__(self, cuantiles=(0.5, 0.9, 0.99), alfa: float = 1e-4):
+        for p in cuantiles:
+            _exigir(0.0 < p < 1.0, "El cuantil debe estar entre 0 y 1")
+        self.n = 0
+        self.media = 0.0
+        self._m2 = 0.0
+        self.minimo = math.inf
+        self.maximo = -math.inf
+        self.cuantiles = tuple(cuantiles)
+        self.bosquejo = CuantilesLog(alfa) if self.cuantiles else None
+
+    def agregar(self, bloque) -> None:
+        x = np.asarray(bloque, dtype=np.float64).ravel()
+        nb = x.size
+        if nb == 0:
+            return
+        media_b = float(x.mean())
+        m2_b = float(np.square(x - media_b).sum())
+        n = self.n + nb
+        delta = media_b - self.media
+        self.media += delta * nb / n
+        self._m2 += m2_b + delta * delta * self.n * nb / n
+        self.n = n
+        self.minimo = min(self.minimo, float(x.min()))
+        self.maximo = max(self.maximo, float(x.max()))
+        if self.bosquejo is not None:
+            self.bosquejo.agregar(x)
+
+    @property
+    def varianza(self) -> float:
+        return self._m2 / (self.n - 1) if self.n > 1 else 0.0
+
+    @property
+    def desvio(self) -> float:
+        return math.sqrt(self.varianza)
+
+    def cuantil(self, p: float) -> float:
+        """Cuantil p aproximado (acotado a [mínimo, máximo]); nan sin datos o sin cuantiles."""
+        if self.n == 0 or self.bosquejo is None:
+            return math.nan
+        return min(max(self.bosquejo.cuantil(p), self.minimo), self.maximo)
+
+    def texto(self) -> str:
+        if self.n == 0:
+            return "sin datos"
+        partes = [f"media={self.media:.4f}", f"desvío={self.desvio:.4f}",
+                  f"mín={self.minimo:.4f}", f"máx={self.maximo:.4f}"]
+        partes += [f"p{round(p * 100, 1):g}={self.cuantil(p):.4f}" for p in self.cuantiles]
+        return ", ".join(partes)
+
+
+class ResumenFlujoColas(NamedTuple):
+    clientes: int
+    espera: Acumulador      # G
+    sistema: Acumulador     # F (tiempo en inspección)
+
+
+def _bloques(fuente, tam: int) -> Iterator[np.ndarray]:
+    """
+    Bloques float64 desde un arreglo, lista o UniformStream (por tramos), un
+    iterable de bloques o un iterable de valores sueltos.
+    """
+    if hasattr(fuente, "__len__") and hasattr(fuente, "__getitem__") and not (len(fuente) and np.ndim(fuente[0]) > 0):
+        for ini in range(0, len(fuente), tam):
+            yield np.asarray(fuente[ini:ini + tam], dtype=np.float64)
+        return
+    it = iter(fuente)
+    for primero in it:
+        if np.ndim(primero) > 0:
+            yield np.asarray(primero, dtype=np.float64).ravel()
+            for b in it:
+                yield np.asarray(b, dtype=np.float64).ravel()
+            return
+        resto = np.fromiter(itertools.islice(it, tam - 1), dtype=np.float64)
+        yield np.concatenate(([float(primero)], resto))
+
+
+def _pares(a: Iterator[np.ndarray], b: Iterator[np.ndarray]) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    """Empareja dos secuencias de bloques de distinto largo; termina con la más corta."""
+    xa = xb = np.empty(0)
+    while True:
+        while xa.size == 0:
+            xa = next(a, None)
+            if xa is None:
+                return
+        while xb.size == 0:
+            xb = next(b, None)
+            if xb is None:
+                return
+        k = min(xa.size, xb.size)
+        yield xa[:k], xb[:k]
+        xa, xb = xa[k:], xb[k:]
+
+
+def simulate_colas_resumen(
+    llegada, atencion, tam: int = 1 << 16, cuantiles=(0.5, 0.9, 0.99)
+) -> ResumenFlujoColas:
+    """
+    simulate_colas sin tabla: procesa llegada y atención por bloques (arreglos,
+    generadores de valores o de bloques) con _lindley, llevando de un
+    bloque al siguiente solo el último arribo y fin de atención, y guarda
+    estadísticos de la espera y del tiempo en el sistema. La memoria no
+    depende de la cantidad de clientes.
+    """
+    espera = Acumulador(cuantiles)
+    sistema = Acumulador(cuantiles)
+    arribo = fin = 0.0
+    for A, D in _pares(_bloques(llegada, tam), _bloques(atencion, tam)):
+        B, C, E = _lindley(A, D, arribo, fin)
+        arribo, fin = float(B[-1]), float(E[-1])
+        espera.agregar(C - B)
+        sistema.agregar(E - B)
+    return ResumenFlujoColas(sistema.n, espera, sistema)
+
+
+# ---------------- Simulación de eventos discretos ----------------
+_heappush = heapq.heappush
+
+
+class Simulador:
+    """
+    Núcleo de eventos discretos: un calendario (heap) de (tiempo, orden,
+    acción, argumento). ejecutar() saca el evento más próximo, adelanta el
+    reloj y llama acción(argumento); a igual tiempo se respeta el orden en que
+    se programaron. Las estaciones, llegadas y rutas se arman encima.
+    """
+
+    __slots__ = ("reloj", "eventos", "calendario", "orden")
+
+    def __init__(self):
+        self.reloj = 0.0
+        self.eventos = 0
+        self.calendario: List[tuple] = []
+        self.orden = itertools.count()
+
+    def programar(self, tiempo: float, accion: Callable, arg=None) -> None:
+        if tiempo < self.reloj:
+            raise ValueError(f"Evento en el pasado ({tiempo} < {self.reloj})")
+        heapq.heappush(self.calendario, (tiempo, next(self.orden), accion, arg))
+
+    def ejecutar(self, hasta: float = math.inf) -> int:
+        """Procesa eventos hasta vaciar el calendario o pasar de hasta; devuelve cuántos."""
+        calendario = self.calendario
+        sacar = heapq.heappop
+        n = 0
+        try:
+            if hasta == math.inf:
+                while calendario:
+                    self.reloj, _, accion, arg = sacar(calendario)
+                    accion(arg)
+                    n += 1
+            else:
+                while calendario and calendario[0][0] <= hasta:
+                    self.reloj, _, accion, arg = sacar(calendario)
+                    accion(arg)
+                    n += 1
+        finally:
+            self.eventos += n
+        return n
+
+
+class Entidad:
+    """Cliente que recorre la red; llegada es el instante en que entró a la estación actual."""
+
+    __slots__ = ("id", "creada", "llegada", "visitas")
+
+    def __init__(self, id: int, creada: float):
+        self.id = id
+        self.creada = creada
+        self.llegada = creada
+        self.visitas = 0
+
+
+class Recurso:
+    """
+    Estación con capacidad servidores idénticos y cola FIFO.
+
+    servicio es un iterador de tiempos de atención (p. ej. una variable
+    generada), que no deben ser negativos. Al terminar, ruta(entidad) indica
+    la estación siguiente (None: sale del sistema), lo que permite líneas en
+    serie, bifurcaciones y reprocesos. registro(entidad, inicio, atencion), si
+    se da, recibe cada atención para armar tablas.
+    """
+
+    __slots__ = ("sim", "nombre", "capacidad", "ocupados", "cola", "servicio", "ruta", "registro",
+                 "salida", "atendidos", "espera_total", "max_cola", "_fin", "_cal", "_orden")
+
+    def __init__(self, sim: Simulador, nombre: str, servicio, capacidad: int = 1,
+                 ruta: Optional[Callable] = None, registro: Optional[Callable] = None):
+        _exigir(capacidad >= 1, "La capacidad debe ser >= 1")
+        self.sim = sim
+        self.nombre = nombre
+        self.capacidad = capacidad
+        self.ocupados = 0
+        self.cola: Deque[Entidad] = deque()
+        self.servicio = iter(servicio)
+        self.ruta = ruta
+        self.registro = registro
+        self.salida: Optional[Callable] = None
+        self.atendidos = 0
+        self.espera_total = 0.0
+        self.max_cola = 0
+        # Lo que se usa en cada evento se liga una sola vez (el método que se
+        # programa, el calendario y el contador de desempate del simulador).
+        # Los iteradores se avanzan con next(): en CPython es más barato que
+        # llamar a un __next__ ligado.
+        self._fin = self._terminar
+        self._cal = sim.calendario
+        self._orden = sim.orden
+
+    # llegar y _terminar van sin llamadas intermedias (ni programar): en
+    # corridas de millones de eventos cada llamada de Python pesa.
+    def llegar(self, ent: Entidad) -> None:
+        ahora = self.sim.reloj
+        ent.llegada = ahora
+        if self.ocupados < self.capacidad:
+            self.ocupados += 1
+            d = next(self.servicio)
+            if self.registro is not None:
+                self.registro(ent, ahora, d)
+            _heappush(self._cal, (ahora + d, next(self._orden), self._fin, ent))
+        else:
+            cola = self.cola
+            cola.append(ent)
+            if len(cola) > self.max_cola:
+                self.max_cola = len(cola)
+
+    def _terminar(self, ent: Entidad) -> None:
+        self.atendidos += 1
+        ent.visitas += 1
+        if self.cola:
+            ahora = self.sim.reloj
+            sig = self.cola.popleft()
+            self.espera_total += ahora - sig.llegada
+            d = next(self.servicio)
+            if self.registro is not None:
+                self.registro(sig, ahora, d)
+            _heappush(self._cal, (ahora + d, next(self._orden), self._fin, sig))
+        else:
+            self.ocupados -= 1
+        if self.ruta is not None:
+            destino = self.ruta(ent)
+            if destino is not None:
+                destino.llegar(ent)
+                return
+        if self.salida is not None:
+            self.salida(ent)
+
+
+class Llegadas:
+    """Genera entidades con los tiempos entre llegadas dados y las envía a destino."""
+
+    __slots__ = ("sim", "entre_llegadas", "destino", "creadas", "_evento", "_cal", "_orden", "_entrar")
+
+    def __init__(self, sim: Simulador, entre_llegadas, destino: Recurso):
+        self.sim = sim
+        self.entre_llegadas = iter(entre_llegadas)
+        self.destino = destino
+        self.creadas = 0
+        self._evento = self._llegar
+        self._cal = sim.calendario
+        self._orden = sim.orden
+        self._entrar = destino.llegar
+        a = next(self.entre_llegadas, None)
+        if a is not None:
+            sim.programar(sim.reloj + a, self._evento)
+
+    def _llegar(self, _=None) -> None:
+        ahora = self.sim.reloj
+        ent = Entidad(self.creadas, ahora)
+        self.creadas += 1
+        try:
+            a = next(self.entre_llegadas)
+        except StopIteration:
+            pass
+        else:
+            if a < 0:
+                raise ValueError("Los tiempos entre llegadas deben ser >= 0")
+            _heappush(self._cal, (ahora + a, next(self._orden), self._evento, None))
+        self._entrar(ent)
+
+
+def ruta_fija(destino: Optional[Recurso]) -> Callable:
+    return lambda ent: destino
+
+
+def ruta_probabilidades(destinos: List[Optional[Recurso]], probs: List[float], uniformes) -> Callable:
+    """
+    Elige destinos[j] con probabilidad probs[j] usando los U de uniformes
+    (None en destinos = salida del sistema; un destino anterior = reproceso).
+    """
+    _exigir(len(destinos) == len(probs) and len(probs) > 0, "destinos y probs deben tener el mismo largo")
+    _exigir(all(p >= 0 for p in probs) and sum(probs) > 0, "Probabilidades inválidas")
+    total = float(sum(probs))
+    acum = (np.cumsum(probs) / total).tolist()
+    acum[-1] = 1.0
+    u = iter(uniformes)
+    ultimo = len(destinos) - 1
+    return lambda ent: destinos[min(bisect.bisect_right(acum, next(u)), ultimo)]
+
+
+def simulate_colas_des(llegada: List[float], atencion: List[float]) -> List[Tuple]:
+    """
+    simulate_colas armada con el núcleo de eventos (una estación, un
+    servidor); da la misma tabla mientras los tiempos entre llegadas no sean
+    negativos. Sirve de referencia para redes más grandes.
+    """
+    n = min(len(llegada), len(atencion))
+    if n <= 0:
+        return []
+    A = np.asarray(llegada[:n], dtype=np.float64)
+    _exigir(bool((A >= 0).all()), "Los tiempos entre llegadas deben ser >= 0")
+    inicio = [0.0] * n
+    duracion = [0.0] * n
+
+    def registrar(ent, t, d):
+        inicio[ent.id] = t
+        duracion[ent.id] = d
+
+    sim = Simulador()
+    estacion = Recurso(sim, "servidor", np.asarray(atencion[:n], dtype=np.float64).tolist(), registro=registrar)
+    Llegadas(sim, A.tolist(), estacion)
+    sim.ejecutar()
+    B = np.cumsum(A)
+    C = np.array(inicio)
+    D = np.array(duracion)
+    E = C + D
+    F = E - B
+    prom = _promedio_corrido(F)
+    return _filas_colas(TablaColas(A, B, C, D, E, F, C - B, prom))
+
+
+# ---------------- Colas con límites y prioridades ----------------
+class HeapIndexado:
+    """
+    Heap mínimo de (clave, item) que recuerda la posición de cada item, de
+    modo que quitar(item) (un cliente que abandona o es interrumpido) cuesta
+    O(log n) en lugar de recorrer la cola.
+    """
+
+    __slots__ = ("_h", "_pos")
+
+    def __init__(self):
+        self._h: List[tuple] = []
+        self._pos: Dict[object, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._h)
+
+    def __contains__(self, item) -> bool:
+        return item in self._pos
+
+    def primero(self) -> tuple:
+        return self._h[0]
+
+    def agregar(self, clave, item) -> None:
+        self._h.append((clave, item))
+        self._pos[item] = len(self._h) - 1
+        self._subir(len(self._h) - 1)
+
+    def sacar(self):
+        clave, item = self._h[0]
+        self._quitar_en(0)
+        return item
+
+    def quitar(self, item) -> bool:
+        i = self._pos.get(item)
+        if i is None:
+            return False
+        self._quitar_en(i)
+        return True
+
+    def _quitar_en(self, i: int) -> None:
+        h = self._h
+        del self._pos[h[i][1]]
+        ultimo = h.pop()
+        if i < len(h):
+            h[i] = ultimo
+            self._pos[ultimo[1]] = i
+            self._subir(i)
+            self._bajar(self._pos[ultimo[1]])
+
+    def _subir(self, i: int) -> None:
+        h, pos = self._h, self._pos
+        x = h[i]
+        while i > 0:
+            padre = (i - 1) >> 1
+            if not x[0] < h[padre][0]:
+                break
+            h[i] = h[padre]
+            pos[h[i][1]] = i
+            i = padre
+        h[i] = x
+        pos[x[1]] = i
+
+    def _bajar(self, i: int) -> None:
+        h, pos = self._h, self._pos
+        n = len(h)
+        x = h[i]
+        while True:
+            hijo = 2 * i + 1
+            if hijo >= n:
+                break
+            if hijo + 1 < n and h[hijo + 1][0] < h[hijo][0]:
+                hijo += 1
+            if not h[hijo][0] < x[0]:
+                break
+            h[i] = h[hijo]
+            pos[h[i][1]] = i
+            i = hijo
+        h[i] = x
+        pos[x[1]] = i
+
+
+class ResumenColas(NamedTuple):
+    atendidos: int
+    bloqueados: int        # llegaron con la cola llena
+    desistidos: int        # no entraron por el largo de la cola (balking)
+    abandonos: int         # se fueron cansados de esperar (reneging)
+    interrupciones: int    # atenciones interrumpidas por un cliente más prioritario
+
+    def texto(self) -> str:
+        return (f"Atendidos: {self.atendidos}, bloqueados: {self.bloqueados}, desistieron: {self.desistidos}, "
+                f"abandonaron: {self.abandonos}, interrupciones: {self.interrupciones}")
+
+
+class EstacionPrioridad:
+    """
+    Estación del núcleo de eventos con c servidores, cola de capacidad
+    limitada, desistimiento, abandono y clases de prioridad.
+
+    Los datos de cada cliente (prioridad, paciencia, umbral de desistimiento,
+    atención) se leen por su id. La cola es un HeapIndexado por (prioridad,
+    id) y, si la disciplina es expropiativa, los clientes en atención otro por
+    (-prioridad, -orden de inicio) para hallar a quién interrumpir; el cliente
+    interrumpido vuelve a la cola con el tiempo de atención que le falta. Las
+    finalizaciones ya programadas se anulan con un número de versión.
+    """
+
+    __slots__ = ("sim", "servidores", "capacidad_cola", "expropiativa", "prioridad", "paciencia",
+                 "umbral", "restante", "version", "arribo", "inicio", "fin", "servidor", "estado",
+                 "cola", "en_servicio", "libres", "_tomado", "_inicios", "_fin", "_abandono", "_despacho",
+                 "bloqueados", "desistidos", "abandonos", "interrupciones")
+
+    def __init__(self, sim: Simulador, atencion: np.ndarray, servidores: int = 1,
+                 capacidad_cola: Optional[int] = None, prioridad=None, paciencia=None,
+                 umbral=None, expropiativa: bool = False):
+        n = len(atencion)
+        _exigir(servidores >= 1, "Debe haber al menos un servidor")
+        _exigir(capacidad_cola is None or capacidad_cola >= 0, "La capacidad de la cola debe ser >= 0")
+        self.sim = sim
+        self.servidores = int(servidores)
+        self.capacidad_cola = math.inf if capacidad_cola is None else capacidad_cola
+        self.expropiativa = expropiativa
+        self.prioridad = [0.0] * n if prioridad is None else [float(x) for x in prioridad[:n]]
+        self.paciencia = [math.inf] * n if paciencia is None else [float(x) for x in paciencia[:n]]
+        self.umbral = [math.inf] * n if umbral is None else [float(x) for x in umbral[:n]]
+        _exigir(len(self.prioridad) == n and len(self.paciencia) == n and len(self.umbral) == n,
+                "Prioridad, paciencia y umbral necesitan un valor por cliente")
+        self.restante = [float(x) for x in atencion]
+        self.version = [0] * n
+        self.arribo = [math.nan] * n
+        self.inicio = [math.nan] * n
+        self.fin = [math.nan] * n
+        self.servidor = [0] * n
+        self.estado = [""] * n
+        self.cola = HeapIndexado()
+        self.en_servicio = HeapIndexado()
+        # (instante en que se liberó, servidor): como en simulate_colas_servidores_np,
+        # se ocupa el que se liberó primero y, a igualdad, el de menor número
+        self.libres = [(0.0, j) for j in range(1, self.servidores + 1)]
+        self._tomado = [0.0] * n        # inicio del tramo de atención en curso
+        self._inicios = 0
+        self._fin = self._terminar
+        self._abandono = self._abandonar
+        self._despacho = False          # hay un _despachar programado en el instante actual
+        self.bloqueados = self.desistidos = self.abandonos = self.interrupciones = 0
+
+    def llegar(self, ent: Entidad) -> None:
+        i = ent.id
+        ahora = self.sim.reloj
+        self.arribo[i] = ahora
+        if self.libres and not self.cola:
+            self._iniciar(i, ahora)
+            return
+        if self.expropiativa and not self.libres and self.en_servicio:
+            _, victima = self.en_servicio.primero()
+            if self.prioridad[i] < self.prioridad[victima]:
+                self._interrumpir(victima, ahora)
+                self._iniciar(i, ahora)
+                return
+        # Los servidores libres con cola ya tienen un despacho pendiente en este instante
+        espera = len(self.cola) - len(self.libres)
+        if espera >= self.capacidad_cola:
+            self.estado[i] = "bloqueado"
+            self.bloqueados += 1
+            return
+        if espera >= self.umbral[i]:
+            self.estado[i] = "desistió"
+            self.desistidos += 1
+            return
+        self.cola.agregar((self.prioridad[i], i), i)
+        if self.paciencia[i] < math.inf:
+            self.sim.programar(ahora + self.paciencia[i], self._abandono, i)
+
+    def _iniciar(self, i: int, ahora: float) -> None:
+        if math.isnan(self.inicio[i]):
+            self.inicio[i] = ahora
+        self.servidor[i] = heapq.heappop(self.libres)[1]
+        self._tomado[i] = ahora
+        self.version[i] += 1
+        if self.expropiativa:
+            self._inicios += 1
+            self.en_servicio.agregar((-self.prioridad[i], -self._inicios), i)
+        self.sim.programar(ahora + self.restante[i], self._fin, (i, self.version[i]))
+
+    def _liberar(self, i: int) -> None:
+        heapq.heappush(self.libres, (self.sim.reloj, self.servidor[i]))
+        if self.expropiativa:
+            self.en_servicio.quitar(i)
+
+    def _interrumpir(self, i: int, ahora: float) -> None:
+        self._liberar(i)
+        self.restante[i] -= ahora - self._tomado[i]
+        self.version[i] += 1  # anula la finalización programada
+        self.interrupciones += 1
+        self.cola.agregar((self.prioridad[i], i), i)
+
+    def _terminar(self, arg: Tuple[int, int]) -> None:
+        i, version = arg
+        if version != self.version[i]:
+            return
+        ahora = self.sim.reloj
+        self.fin[i] = ahora
+        self.estado[i] = "atendido"
+        self._liberar(i)
+        if self.cola and not self._despacho:
+            # Se reparte después de los demás eventos de este instante, para que
+            # los servidores que se liberan a la vez compitan por (instante, número)
+            self._despacho = True
+            self.sim.programar(ahora, self._despachar)
+
+    def _despachar(self, _=None) -> None:
+        self._despacho = False
+        ahora = self.sim.reloj
+        while self.libres and self.cola:
+            self._iniciar(self.cola.sacar(), ahora)
+
+    def _abandonar(self, i: int) -> None:
+        # Solo abandona quien sigue esperando sin haber empezado a ser atendido
+        if math.isnan(self.inicio[i]) and self.cola.quitar(i):
+            self.estado[i] = "abandonó"
+            self.abandonos += 1
+
+    def resumen(self) -> ResumenColas:
+        atendidos = sum(1 for e in self.estado if e == "atendido")
+        return ResumenColas(atendidos, self.bloqueados, self.desistidos, self.abandonos, self.interrupciones)
+
+
+def simulate_colas_avanzada(
+    llegada: List[float],
+    atencion: List[float],
+    servidores: int = 1,
+    capacidad_cola: Optional[int] = None,
+    prioridad=None,
+    paciencia=None,
+    umbral=None,
+    expropiativa: bool = False,
+) -> Tuple[List[Tuple], ResumenColas]:
+    """
+    Tabla de colas con cola finita, desistimiento, abandono y prioridades.
+
+    prioridad (menor = más urgente), paciencia (espera máxima antes de
+    abandonar) y umbral (largo de cola a partir del cual el cliente no
+    entra) son opcionales y traen un valor por cliente, p. ej. variables
+    generadas. Devuelve (filas, resumen); cada fila es la de simulate_colas
+    más servidor, prioridad y estado. Los clientes no atendidos dejan vacías
+    las columnas de atención y el promedio es el de los atendidos.
+    """
+    n = min(len(llegada), len(atencion))
+    if n <= 0:
+        return [], ResumenColas(0, 0, 0, 0, 0)
+    A = np.asarray(llegada[:n], dtype=np.float64)
+    _exigir(bool((A >= 0).all()), "Los tiempos entre llegadas deben ser >= 0")
+    D = np.asarray(atencion[:n], dtype=np.float64)
+    sim = Simulador()
+    estacion = EstacionPrioridad(sim, D, servidores, capacidad_cola, prioridad, paciencia, umbral, expropiativa)
+    Llegadas(sim, A.tolist(), estacion)
+    sim.ejecutar()
+
+    B = np.cumsum(A)
+    C = np.array(estacion.inicio)
+    E = np.array(estacion.fin)
+    F = E - B
+    # Espera = C - B, como en las demás tablas; quien fue interrumpido volvió
+    # a esperar en la cola, así que su espera es todo lo que no estuvo en atención
+    interrumpido = np.array(estacion.version) > 1
+    G = np.where(interrumpido, F - D, C - B)
+    atendido = ~np.isnan(E)
+    # Promedio de los atendidos; los demás repiten el del último atendido
+    cuenta = np.cumsum(atendido)
+    prom = np.where(cuenta > 0, np.r_[0.0, _promedio_corrido(F[atendido])][cuenta], 0.0)
+    columnas = [_redondear(c) for c in (A, B, C, D, E, F, G, prom)]
+    filas = []
+    for i, (a, b, c, d, e, f, g, pr) in enumerate(zip(*columnas)):
+        if atendido[i]:
+            filas.append((i + 1, a, b, c, d, e, f, g, pr, estacion.servidor[i],
+                          estacion.prioridad[i], estacion.estado[i]))
+        else:
+            filas.append((i + 1, a, b, "", d, "", "", "", pr, "", estacion.prioridad[i], estacion.estado[i]))
+    return filas, estacion.resumen()
+
+
+# ---------------- Réplicas ----------------
+def _variable_en_bloque(
+    tipo: str, flujo: Uniformes, params: Dict[str, float], ini: int, cantidad: int
+) -> Tuple[np.ndarray, int]:
+    """Genera cantidad valores usando U consecutivas desde ini (1-based); devuelve (valores, U usadas)."""
+    dist = buscar_distribucion(tipo)
+    if dist is None:
+        raise ValueError(f"Distribución desconocida: {tipo}")
+    p = dist.validar(params)
+    grupos = -(-cantidad // dist.variables_por_grupo(p))
+    if len(dist.claves_u) > 1:
+        # Un bloque por columna: U1 = ini.., U2 = el bloque siguiente, ...
+        indices = {c: f"{ini + j * grupos}-{ini + (j + 1) * grupos - 1}" for j, c in enumerate(dist.claves_u)}
+        usadas = len(dist.claves_u) * grupos
+    else:
+        usadas = dist.u_por_variable(p) * grupos
+        indices = {'U': f"{ini}-{ini + usadas - 1}"}
+    if ini - 1 + usadas > len(flujo):
+        raise ValueError("El flujo no tiene suficientes números para la réplica")
+    valores, _ = generar_variable(tipo, flujo, tipo, params, indices)
+    return valores[:cantidad], usadas
+
+
+def replica_colas(
+    flujo: Uniformes,
+    llegada: Tuple[str, Dict[str, float]],
+    atencion: Tuple[str, Dict[str, float]],
+    clientes: int,
+    servidores=1,
+) -> List[Tuple]:
+    """
+    Una réplica de simulate_colas: las primeras U del flujo dan los tiempos de
+    llegada y las siguientes los de atención. llegada/atencion son (tipo, params).
+    Con servidores distinto de 1 se usa simulate_colas_servidores.
+    """
+    lleg, usadas = _variable_en_bloque(llegada[0], flujo, llegada[1], 1, clientes)
+    aten, _ = _variable_en_bloque(atencion[0], flujo, atencion[1], 1 + usadas, clientes)
+    if servidores == 1:
+        return simulate_colas(lleg, aten)
+    return simulate_colas_servidores(lleg, aten, servidores)
+
+
+def replica_entregas(
+    flujo: Uniformes,
+    demanda: Tuple[str, Dict[str, float]],
+    dias: int,
+    inv_inicial: int,
+    entrega_q: int,
+    frec_entrega: int,
+    cap_max: int,
+    c_orden: float,
+    c_inv_u: float,
+    c_falt_u: float,
+) -> List[Row]:
+    """Una réplica de simulate_entregas con la demanda diaria generada desde flujo."""
+    dem, _ = _variable_en_bloque(demanda[0], flujo, demanda[1], 1, dias)
+    return simulate_entregas(dem, inv_inicial, entrega_q, frec_entrega, cap_max, c_orden, c_inv_u, c_falt_u)
+
+
+def ejecutar_replicas(
+    funcion: Callable, flujos: List[UniformStream], procesos: Optional[int] = None, **kwargs
+) -> List:
+    """
+    Aplica funcion(flujo, **kwargs) a cada subflujo y devuelve los resultados en orden.
+
+    Con procesos distinto de 1 las réplicas se reparten entre núcleos; como cada
+    una consume solo su subflujo, el resultado es idéntico al de la corrida en
+    serie. funcion debe ser de nivel de módulo (p. ej. replica_colas) para
+    poder enviarse a otros procesos.
+    """
+    tarea = partial(funcion, **kwargs)
+    if procesos == 1 or len(flujos) <= 1:
+        return [tarea(f) for f in flujos]
+    with ProcessPoolExecutor(max_workers=procesos) as ex:
+        return list(ex.map(tarea, flujos))
@@ -1,3 +1,5 @@
+from functools import partial
+
 from kivy.core.window import Window
 from kivy.metrics import dp
 from kivy.uix.boxlayout import BoxLayout
@@ -17,25 +19,98 @@ from kivymd.uix.tabs import MDTabs
 
 from core_simulador import (
     simulate_entregas,
-    rng_congruencial_mixto,
-    rng_congruencial_multiplicativo,
-    generar_variable,
+    DISTRIBUCIONES,
+    CacheVariables,
+    FuenteQMC,
+    GrafoDependencias,
+    Uniformes,
+    analizar_lcg,
+    bloques_de,
+    buscar_distribucion,
+    crear_fuente,
+    generar_variables,
+    leer_especificaciones,
     parse_rangos,
-    simulate_colas,
+    leer_servidores,
+    probar_uniformes,
+    simulate_colas_avanzada,
+    simulate_colas_resumen,
+    simulate_colas_servidores,
 )
 
 
+# Máximo de filas que se muestran en la pestaña Números
+MAX_FILAS_NUMEROS = 1000
+
+
 # Estado compartido entre pestañas
 class AppState:
     def __init__(self):
-        self.numeros: list[float] = []
+        self.numeros: Uniformes = []
         self.variables: dict[str, list[float]] = {}
         self.variables_meta: dict[str, dict] = {}
+        # Identifica a numeros (método y parámetros) para la caché de variables
+        self.clave_numeros: tuple | None = None
+        self.cache = CacheVariables()
+        # numeros -> "var:<nombre>" -> "colas" / "entregas": al cambiar un nodo
+        # lo que depende de él queda sucio y se recalcula al mirarlo
+        self.grafo = GrafoDependencias()
+
+    def fijar_numeros(self, numeros: Uniformes, clave: tuple) -> None:
+        self.numeros = numeros
+        self.clave_numeros = clave
+        self.grafo.fijar("numeros", numeros)
+
+    def _definir_nodo_variable(self, nombre: str, calcular, depende: tuple, resultado=None):
+        # resultado: (valores, meta) ya calculado con los valores actuales de
+        # depende; se usa como primer valor del nodo en lugar de recalcular
+        def guardar(*args):
+            nonlocal resultado
+            valores, meta = resultado if resultado is not None else calcular(*args)
+            resultado = None
+            self.variables[nombre] = valores
+            self.variables_meta[nombre] = meta
+            return valores
+        self.grafo.definir("var:" + nombre, guardar, depende)
+        return self.grafo.valor("var:" + nombre)
+
+    def definir_variable(self, nombre: str, tipo: str, params: dict, indices: dict, resultado=None):
+        """
+        Deja la variable ligada a los números actuales. resultado es lo que ya
+        devolvió cache.generar para ellos (así la generación cuenta una sola
+        vez en la caché); sin él se genera ahora.
+        """
+        def calcular(numeros):
+            return self.cache.generar(self.clave_numeros, tipo, numeros, nombre, params, indices)
+        return self._definir_nodo_variable(nombre, calcular, ("numeros",), resultado)
+
+    def definir_lote(self, origen: str, specs: list) -> dict:
+        """Variables de un archivo: se regeneran juntas, en una pasada, si cambian los números."""
+        nodo = "lote:" + origen
+        self.grafo.definir(nodo, partial(generar_variables, specs), ("numeros",))
+        try:
+            resultado = self.grafo.valor(nodo)
+        except ValueError:
+            self.grafo.quitar(nodo)
+            raise
+        for nombre in resultado:
+            self._definir_nodo_variable(nombre, lambda lote, n=nombre: lote[n], (nodo,))
+        return resultado
+
+    def variable(self, nombre: str):
+        """Valores actuales de la variable (regenerada si cambiaron los números); None si no existe."""
+        clave = "var:" + nombre
+        return self.grafo.valor(clave) if clave in self.grafo else None
+
+    def actualizar_variables(self) -> None:
+        for nombre in list(self.variables):
+            self.variable(nombre)
 
 
 class TabEntregas(MDBoxLayout, MDTabsBase):
-    def __init__(self, **kwargs):
+    def __init__(self, state: AppState, **kwargs):
         super().__init__(**kwargs)
+        self.state = state
         self.orientation = "vertical"
         self.padding = (10, 10, 10, 10)
         self.spacing = 10
@@ -46,7 +121,7 @@ class TabEntregas(MDBoxLayout, MDTabsBase):
 
         # Campos
         self.tf_demanda = MDTextField(
-            hint_text="Demanda (lista, ej: 10,12,9,11)",
+            hint_text="Demanda (lista, ej: 10,12,9,11, o nombre de variable)",
             helper_text="Valores separados por coma",
             helper_text_mode="on_focus",
             size_hint_x=None, width=dp(280)
@@ -102,6 +177,9 @@ class TabEntregas(MDBoxLayout, MDTabsBase):
         raw = self.tf_demanda.text.strip()
         if not raw:
             return []
+        # También se acepta el nombre de una variable generada (p. ej. una Empírica)
+        if raw in self.state.variables:
+            return list(self.state.variable(raw))
         out = []
         for part in raw.split(','):
             part = part.strip()
@@ -130,10 +208,20 @@ class TabEntregas(MDBoxLayout, MDTabsBase):
             self.show_error("Parámetros inválidos. Revise los campos numéricos.")
             return
 
-        rows = simulate_entregas(
-            demanda, inv_inicial, entrega_q, frec, cap, c_orden, c_inv, c_falt
-        )
-        self.render_table(rows)
+        calcular = partial(simulate_entregas, inv_inicial=inv_inicial, entrega_q=entrega_q, frec_entrega=frec,
+                           cap_max=cap, c_orden=c_orden, c_inv_u=c_inv, c_falt_u=c_falt)
+        raw = self.tf_demanda.text.strip()
+        if raw in self.state.variables:
+            # Ligada a la variable: se rehace si la demanda se regenera
+            self.state.grafo.definir("entregas", calcular, ("var:" + raw,))
+        else:
+            self.state.grafo.definir("entregas", partial(calcular, demanda))
+        self.render_table(self.state.grafo.valor("entregas"))
+
+    def on_pre_enter(self):
+        grafo = self.state.grafo
+        if "entregas" in grafo and grafo.sucio("entregas"):
+            self.render_table(grafo.valor("entregas"))
 
     def render_table(self, rows):
         # Limpiar tabla anterior
@@ -195,12 +283,13 @@ class TabRNG(MDBoxLayout, MDTabsBase):
         grid.bind(minimum_height=grid.setter('height'))
 
         # Controles
-        self.method = MDTextField(hint_text="Método (mixto/multiplicativo)", text="mixto", size_hint_x=None, width=dp(220))
-        self.tx0 = MDTextField(hint_text="X0", text="17", size_hint_x=None, width=dp(120))
+        self.method = MDTextField(hint_text="Método (mixto/multiplicativo/pcg64/philox/halton/sobol)", text="mixto", size_hint_x=None, width=dp(320))
+        self.tx0 = MDTextField(hint_text="X0 / semilla", text="17", size_hint_x=None, width=dp(120))
         self.ta = MDTextField(hint_text="a", text="101", size_hint_x=None, width=dp(120))
         self.tc = MDTextField(hint_text="c (solo mixto)", text="53", size_hint_x=None, width=dp(150))
         self.tm = MDTextField(hint_text="m", text="997", size_hint_x=None, width=dp(120))
         self.tn = MDTextField(hint_text="N cantidad", text="200", size_hint_x=None, width=dp(140))
+        self.td = MDTextField(hint_text="d (solo halton/sobol)", text="2", size_hint_x=None, width=dp(150))
 
         grid.add_widget(MDLabel(text="Método")); grid.add_widget(self.method)
         grid.add_widget(MDLabel(text="X0")); grid.add_widget(self.tx0)
@@ -208,29 +297,60 @@ class TabRNG(MDBoxLayout, MDTabsBase):
         grid.add_widget(MDLabel(text="c")); grid.add_widget(self.tc)
         grid.add_widget(MDLabel(text="m")); grid.add_widget(self.tm)
         grid.add_widget(MDLabel(text="N")); grid.add_widget(self.tn)
+        grid.add_widget(MDLabel(text="d")); grid.add_widget(self.td)
 
         self.add_widget(grid)
         self.btn_gen = MDRectangleFlatButton(text="Generar números", on_release=self.on_generar)
-        self.add_widget(AnchorLayout(anchor_x="left", anchor_y="top", size_hint_y=None, height=dp(48)))
-        self.children[0].add_widget(self.btn_gen)
+        self.btn_probar = MDRectangleFlatButton(text="Probar uniformidad", on_release=self.on_probar)
+        botones = MDBoxLayout(orientation="horizontal", spacing=10, size_hint_y=None, height=dp(48))
+        botones.add_widget(self.btn_gen); botones.add_widget(self.btn_probar)
+        self.add_widget(botones)
 
         self.lbl_info = MDLabel(text="", halign="left")
         self.add_widget(self.lbl_info)
 
     def on_generar(self, *_):
         try:
-            x0 = int(float(self.tx0.text)); a = int(float(self.ta.text)); m = int(float(self.tm.text)); n = int(float(self.tn.text))
+            x0 = int(float(self.tx0.text)); n = int(float(self.tn.text))
             metodo = (self.method.text or "").strip().lower()
-            if metodo.startswith("mixt"):
-                c = int(float(self.tc.text))
-                nums = rng_congruencial_mixto(x0, a, c, m, n)
+            analisis = None
+            if metodo.startswith("mixt") or metodo.startswith("mult"):
+                a = int(float(self.ta.text)); m = int(float(self.tm.text))
+                c = int(float(self.tc.text)) if metodo.startswith("mixt") else 0
+                # crear_fuente valida m (<= 2^64) antes de analizar; el análisis
+                # tiene un límite de iteraciones para no trabar la interfaz
+                fuente = crear_fuente("mixto", x0=x0, a=a, c=c, m=m)
+                analisis = analizar_lcg(x0, a, c, m, presupuesto=50_000)
+                clave = ("lcg", x0, a, c, m, n)
             else:
-                nums = rng_congruencial_multiplicativo(x0, a, m, n)
-            self.state.numeros = nums
+                # Generadores de NumPy y cuasi-aleatorios: X0 es la semilla
+                dim = int(float(self.td.text or 1))
+                fuente = crear_fuente(metodo, semilla=x0, dim=dim)
+                clave = (metodo, x0, dim, n)
+            nums = fuente.numeros(n)
+            # Variables y tablas que dependen de los números quedan pendientes
+            self.state.fijar_numeros(nums, clave)
             self.lbl_info.text = f"Generados {len(nums)} números."
+            if isinstance(fuente, FuenteQMC):
+                self.lbl_info.text += " Dimensiones: " + ", ".join(
+                    f"d{j + 1}={r}" for j, r in enumerate(fuente.rangos(n)))
+            if analisis is not None and analisis.periodo is None:
+                self.lbl_info.text += " Periodo: no determinado."
+            elif analisis is not None:
+                self.lbl_info.text += f" Periodo: {analisis.periodo}."
+                if n > analisis.cola + analisis.periodo:
+                    self.lbl_info.text += " ¡Atención! N supera el periodo: la secuencia se repite."
         except Exception:
             self.lbl_info.text = "Error en parámetros."
 
+    def on_probar(self, *_):
+        if len(self.state.numeros) == 0:
+            self.lbl_info.text = "Genere números primero."
+            return
+        resultados = probar_uniformes(bloques_de(self.state.numeros))
+        self.lbl_info.text = "\n".join(
+            f"{r.nombre}: {r.estadistico:.4f} (p={r.p_valor:.4f})" for r in resultados)
+
 
 # -------------- Pestaña Números --------------
 class TabNumeros(MDBoxLayout, MDTabsBase):
@@ -250,7 +370,8 @@ class TabNumeros(MDBoxLayout, MDTabsBase):
 
     def render_table(self):
         self.table_container.clear_widgets()
-        nums = self.state.numeros
+        # Los números se calculan bajo demanda; solo se muestran los primeros.
+        nums = self.state.numeros[:MAX_FILAS_NUMEROS]
         column_data = [("#", dp(60)), ("Número", dp(160))]
         row_data = [[str(i+1), f"{v:.6f}"] for i, v in enumerate(nums)]
         scroll = ScrollView(do_scroll_x=True, do_scroll_y=True, bar_width=dp(6))
@@ -275,75 +396,102 @@ class TabVariables(MDBoxLayout, MDTabsBase):
         grid = GridLayout(cols=6, spacing=10, size_hint_y=None)
         grid.bind(minimum_height=grid.setter('height'))
 
-        self.tipo = MDTextField(hint_text="Distribución (Exponencial/Normal/Poisson/Geométrica/Binomial)", size_hint_x=None, width=dp(420))
+        self.tipo = MDTextField(hint_text="Distribución (" + "/".join(DISTRIBUCIONES) + ")", size_hint_x=None, width=dp(420))
+        self.tipo.bind(text=self.on_tipo)
         self.nombre = MDTextField(hint_text="Nombre variable", size_hint_x=None, width=dp(220))
-        self.p1 = MDTextField(hint_text="p1 (λ/μ/n)", size_hint_x=None, width=dp(150))
-        self.p2 = MDTextField(hint_text="p2 (σ/p)", size_hint_x=None, width=dp(150))
+        # Los parámetros se cargan en orden: p1..p4 (ver la ayuda según la distribución)
+        self.p1 = MDTextField(hint_text="p1", size_hint_x=None, width=dp(150))
+        self.p2 = MDTextField(hint_text="p2", size_hint_x=None, width=dp(150))
+        self.p3 = MDTextField(hint_text="p3", size_hint_x=None, width=dp(150))
+        self.p4 = MDTextField(hint_text="p4", size_hint_x=None, width=dp(150))
         self.rU = MDTextField(hint_text="Rangos U (ej 1-10,12)", size_hint_x=None, width=dp(260))
         self.rU1 = MDTextField(hint_text="Rangos U1 (Normal)", size_hint_x=None, width=dp(260))
         self.rU2 = MDTextField(hint_text="Rangos U2 (Normal)", size_hint_x=None, width=dp(260))
+        self.ambos = MDTextField(hint_text="Normal: usar cos y sin (s/n)", text="n", size_hint_x=None, width=dp(220))
 
         grid.add_widget(MDLabel(text="Dist.")); grid.add_widget(self.tipo)
         grid.add_widget(MDLabel(text="Nombre")); grid.add_widget(self.nombre)
         grid.add_widget(MDLabel(text="p1")); grid.add_widget(self.p1)
         grid.add_widget(MDLabel(text="p2")); grid.add_widget(self.p2)
+        grid.add_widget(MDLabel(text="p3")); grid.add_widget(self.p3)
+        grid.add_widget(MDLabel(text="p4")); grid.add_widget(self.p4)
         grid.add_widget(MDLabel(text="U")); grid.add_widget(self.rU)
         grid.add_widget(MDLabel(text="U1")); grid.add_widget(self.rU1)
         grid.add_widget(MDLabel(text="U2")); grid.add_widget(self.rU2)
+        grid.add_widget(MDLabel(text="Ambos")); grid.add_widget(self.ambos)
         self.add_widget(grid)
 
         self.btn = MDRectangleFlatButton(text="Generar Variable", on_release=self.on_generar)
         self.add_widget(AnchorLayout(anchor_x="left", anchor_y="top", size_hint_y=None, height=dp(48)))
         self.children[0].add_widget(self.btn)
 
+        # Varias variables a la vez desde un archivo JSON (ver README)
+        fila = MDBoxLayout(orientation="horizontal", spacing=10, size_hint_y=None, height=dp(56))
+        self.archivo = MDTextField(hint_text="Archivo de variables (.json)", size_hint_x=None, width=dp(420))
+        fila.add_widget(self.archivo)
+        fila.add_widget(MDRectangleFlatButton(text="Generar desde archivo", on_release=self.on_generar_archivo))
+        self.add_widget(fila)
+
         self.lbl = MDLabel(text="", halign="left")
         self.add_widget(self.lbl)
 
+    def on_tipo(self, *_):
+        dist = buscar_distribucion(self.tipo.text)
+        if dist is None:
+            return
+        campos = (self.p1, self.p2, self.p3, self.p4)
+        for campo, (_, etiqueta, _) in zip(campos, dist.parametros):
+            campo.hint_text = etiqueta
+        for campo in campos[len(dist.parametros):]:
+            campo.hint_text = "-"
+        self.lbl.text = dist.formula
+
     def on_generar(self, *_):
-        if not self.state.numeros:
+        if len(self.state.numeros) == 0:
             self.lbl.text = "Primero genere números en RNG."
             return
-        tipo = (self.tipo.text or '').strip().capitalize()
+        dist = buscar_distribucion(self.tipo.text)
         nombre = (self.nombre.text or '').strip()
         if not nombre:
             self.lbl.text = "Ingrese nombre."
             return
+        if dist is None:
+            self.lbl.text = "Distribución inválida."
+            return
 
         params = {}
-        indices = {}
+        for campo, (clave, _, _) in zip((self.p1, self.p2, self.p3, self.p4), dist.parametros):
+            if (campo.text or '').strip():
+                params[clave] = campo.text.strip()
+        if dist.admite_ambos:
+            # Con ambos, un solo rango (U o U1 sin U2) se toma como pares consecutivos
+            params['ambos'] = (self.ambos.text or '').strip().lower().startswith('s')
+        indices = {'U': self.rU.text, 'U1': self.rU1.text, 'U2': self.rU2.text}
         try:
-            if tipo == 'Exponencial':
-                params['lam'] = float(self.p1.text)
-                indices['U'] = self.rU.text
-            elif tipo == 'Normal':
-                params['mu'] = float(self.p1.text)
-                params['sigma'] = float(self.p2.text)
-                indices['U1'] = self.rU1.text
-                indices['U2'] = self.rU2.text
-            elif tipo == 'Poisson':
-                params['lam'] = float(self.p1.text)
-                indices['U'] = self.rU.text
-            elif tipo == 'Geométrica':
-                params['p'] = float(self.p1.text)
-                indices['U'] = self.rU.text
-            elif tipo == 'Binomial':
-                params['n'] = int(float(self.p1.text))
-                params['p'] = float(self.p2.text)
-                indices['U'] = self.rU.text
-            else:
-                self.lbl.text = "Distribución inválida."
-                return
-        except Exception:
-            self.lbl.text = "Parámetros inválidos."
+            resultado = self.state.cache.generar(
+                self.state.clave_numeros, dist.nombre, self.state.numeros, nombre, params, indices)
+        except ValueError as e:
+            self.lbl.text = f"Parámetros inválidos: {e}"
             return
-
-        valores, meta = generar_variable(tipo, self.state.numeros, nombre, params, indices)
-        if not valores:
+        valores = resultado[0]
+        if len(valores) == 0:
             self.lbl.text = "No se generaron valores (revisar rangos U)."
             return
-        self.state.variables[nombre] = valores
-        self.state.variables_meta[nombre] = meta
-        self.lbl.text = f"Variable '{nombre}' generada ({len(valores)})."
+        # Ya validada: queda ligada a los números actuales sin volver a generarla
+        self.state.definir_variable(nombre, dist.nombre, params, indices, resultado)
+        self.lbl.text = f"Variable '{nombre}' generada ({len(valores)}). {self.state.cache.resumen()}"
+
+    def on_generar_archivo(self, *_):
+        if len(self.state.numeros) == 0:
+            self.lbl.text = "Primero genere números en RNG."
+            return
+        ruta = (self.archivo.text or '').strip()
+        try:
+            resultado = self.state.definir_lote(ruta, leer_especificaciones(ruta))
+        except (OSError, ValueError) as e:
+            self.lbl.text = f"No se pudo generar: {e}"
+            return
+        self.lbl.text = f"{len(resultado)} variables generadas: " + ", ".join(resultado)
 
 
 # -------------- Pestaña Variables Generadas --------------
@@ -362,6 +510,7 @@ class TabVarGen(MDBoxLayout, MDTabsBase):
         self.render_table()
 
     def render_table(self):
+        self.state.actualizar_variables()
         self.table_container.clear_widgets()
         cols = [("Nombre", dp(160)), ("Dist.", dp(120)), ("Parámetros", dp(240)), ("Índices", dp(260)), ("Cantidad", dp(100))]
         row_data = []
@@ -397,16 +546,34 @@ class TabColas(MDBoxLayout, MDTabsBase):
         grid.bind(minimum_height=grid.setter('height'))
         self.tf_lleg = MDTextField(hint_text="Nombre var llegada", size_hint_x=None, width=dp(240))
         self.tf_aten = MDTextField(hint_text="Nombre var atención", size_hint_x=None, width=dp(240))
+        self.tf_serv = MDTextField(hint_text="Servidores (c o velocidades: 1, 1.5)", text="1", size_hint_x=None, width=dp(240))
         self.lbl_vars = MDLabel(text="Disponibles: (se actualiza al abrir)", halign="left")
         grid.add_widget(MDLabel(text="Llegada")); grid.add_widget(self.tf_lleg)
         grid.add_widget(MDLabel(text="Atención")); grid.add_widget(self.tf_aten)
-        grid.add_widget(MDLabel(text="")); grid.add_widget(MDLabel(text=""))
+        grid.add_widget(MDLabel(text="Servidores")); grid.add_widget(self.tf_serv)
+        # Opcionales: cola finita, desistimiento, abandono y prioridades (por variable)
+        self.tf_cap_cola = MDTextField(hint_text="Capacidad de la cola (vacío = sin límite)", size_hint_x=None, width=dp(240))
+        self.tf_prio = MDTextField(hint_text="Var prioridad (menor = primero)", size_hint_x=None, width=dp(240))
+        self.tf_pac = MDTextField(hint_text="Var paciencia (abandono)", size_hint_x=None, width=dp(240))
+        self.tf_umbral = MDTextField(hint_text="Var umbral de cola (desistimiento)", size_hint_x=None, width=dp(240))
+        self.tf_expro = MDTextField(hint_text="Prioridad expropiativa (s/n)", text="n", size_hint_x=None, width=dp(240))
+        grid.add_widget(MDLabel(text="Cap. cola")); grid.add_widget(self.tf_cap_cola)
+        grid.add_widget(MDLabel(text="Prioridad")); grid.add_widget(self.tf_prio)
+        grid.add_widget(MDLabel(text="Paciencia")); grid.add_widget(self.tf_pac)
+        grid.add_widget(MDLabel(text="Umbral")); grid.add_widget(self.tf_umbral)
+        grid.add_widget(MDLabel(text="Expropiativa")); grid.add_widget(self.tf_expro)
+        grid.add_widget(Widget()); grid.add_widget(Widget())
         self.add_widget(grid)
 
         self.btn = MDRectangleFlatButton(text="Generar tabla de colas", on_release=self.on_generar)
-        self.add_widget(AnchorLayout(anchor_x="left", anchor_y="top", size_hint_y=None, height=dp(48)))
-        self.children[0].add_widget(self.btn)
+        # Solo estadísticos (un servidor, sin tabla): sirve para variables muy largas
+        self.btn_resumen = MDRectangleFlatButton(text="Solo resumen", on_release=self.on_resumen)
+        botones = MDBoxLayout(orientation="horizontal", spacing=10, size_hint_y=None, height=dp(48))
+        botones.add_widget(self.btn); botones.add_widget(self.btn_resumen)
+        self.add_widget(botones)
         self.add_widget(self.lbl_vars)
+        self.lbl_resumen = MDLabel(text="", halign="left")
+        self.add_widget(self.lbl_resumen)
 
         self.table_container = MDBoxLayout(orientation="vertical")
         self.add_widget(self.table_container)
@@ -414,20 +581,73 @@ class TabColas(MDBoxLayout, MDTabsBase):
     def on_pre_enter(self):
         nombres = list(self.state.variables.keys())
         self.lbl_vars.text = "Disponibles: " + ", ".join(nombres) if nombres else "No hay variables."
+        grafo = self.state.grafo
+        if "colas" in grafo and grafo.sucio("colas"):
+            self.mostrar(*grafo.valor("colas"))
 
-    def on_generar(self, *_):
-        llegada = self.state.variables.get((self.tf_lleg.text or '').strip(), [])
-        atencion = self.state.variables.get((self.tf_aten.text or '').strip(), [])
-        rows = simulate_colas(llegada, atencion)
+    def mostrar(self, rows, resumen: str):
+        self.lbl_resumen.text = resumen
         self.render_table(rows)
 
+    def on_generar(self, *_):
+        llegada = (self.tf_lleg.text or '').strip()
+        atencion = (self.tf_aten.text or '').strip()
+        if llegada not in self.state.variables or atencion not in self.state.variables:
+            self.mostrar([], "")
+            return
+        extras = {clave: (campo.text or '').strip() for clave, campo in
+                  (("prioridad", self.tf_prio), ("paciencia", self.tf_pac), ("umbral", self.tf_umbral))}
+        extras = {clave: nombre for clave, nombre in extras.items() if nombre}
+        faltan = [nombre for nombre in extras.values() if nombre not in self.state.variables]
+        if faltan:
+            self.lbl_vars.text = "Variables inexistentes: " + ", ".join(faltan)
+            return
+        expropiativa = (self.tf_expro.text or '').strip().lower().startswith('s')
+        try:
+            servidores = leer_servidores(self.tf_serv.text)
+            cap_txt = (self.tf_cap_cola.text or '').strip()
+            capacidad = int(float(cap_txt)) if cap_txt else None
+            if extras or capacidad is not None or expropiativa:
+                if not isinstance(servidores, int):
+                    raise ValueError("con límites o prioridades los servidores deben ser idénticos (ingrese c)")
+                claves = tuple(extras)
+
+                def calcular(lleg, aten, *valores):
+                    rows, resumen = simulate_colas_avanzada(
+                        lleg, aten, servidores, capacidad, expropiativa=expropiativa, **dict(zip(claves, valores)))
+                    return rows, resumen.texto()
+            else:
+                def calcular(lleg, aten):
+                    return simulate_colas_servidores(lleg, aten, servidores), ""
+            depende = tuple("var:" + n for n in (llegada, atencion, *extras.values()))
+            self.state.grafo.definir("colas", calcular, depende)
+            rows, resumen = self.state.grafo.valor("colas")
+        except ValueError as e:
+            self.state.grafo.quitar("colas")
+            self.lbl_vars.text = f"Parámetros inválidos: {e}"
+            return
+        self.mostrar(rows, resumen)
+
+    def on_resumen(self, *_):
+        llegada = self.state.variable((self.tf_lleg.text or '').strip())
+        atencion = self.state.variable((self.tf_aten.text or '').strip())
+        if llegada is None or atencion is None:
+            self.lbl_resumen.text = "Ingrese variables de llegada y atención existentes."
+            return
+        r = simulate_colas_resumen(llegada, atencion)
+        self.lbl_resumen.text = (f"Clientes: {r.clientes}\nEspera: {r.espera.texto()}\n"
+                                 f"En el sistema: {r.sistema.texto()}")
+
     def render_table(self, rows):
         self.table_container.clear_widgets()
         cols = [
             ("Cliente", dp(90)), ("Tiempo llegada", dp(130)), ("Tiempo arribo", dp(130)),
             ("Inicio atención", dp(130)), ("Tiempo atención", dp(130)), ("Fin atención", dp(130)),
-            ("Tiempo inspección", dp(150)), ("Tiempo espera", dp(130)), ("Prom. inspección", dp(150))
+            ("Tiempo inspección", dp(150)), ("Tiempo espera", dp(130)), ("Prom. inspección", dp(150)),
+            ("Servidor", dp(90))
         ]
+        if rows and len(rows[0]) > len(cols):
+            cols += [("Prioridad", dp(90)), ("Estado", dp(110))]
         row_data = [[*map(str, r)] for r in rows]
         scroll = ScrollView(do_scroll_x=True, do_scroll_y=True, bar_width=dp(6))
         table = MDDataTable(size_hint=(None, None), size=(max(dp(1200), Window.width - dp(20)), Window.height - dp(260)),
@@ -448,15 +668,22 @@ class SimuladorApp(MDApp):
         self.state = AppState()
 
         tabs = MDTabs()
+        tabs.bind(on_tab_switch=self.on_tab_switch)
         tabs.add_widget(TabRNG(self.state, title="RNG"))
         tabs.add_widget(TabNumeros(self.state, title="Números"))
         tabs.add_widget(TabVariables(self.state, title="Variables"))
         tabs.add_widget(TabVarGen(self.state, title="Var. Generadas"))
         tabs.add_widget(TabColas(self.state, title="Colas"))
-        tabs.add_widget(TabEntregas(title="Entregas"))
+        tabs.add_widget(TabEntregas(self.state, title="Entregas"))
         root.add_widget(tabs)
         return root
 
+    def on_tab_switch(self, tabs, tab, tab_label, tab_text):
+        # Al mostrar una pestaña se recalcula lo que quedó desactualizado
+        refrescar = getattr(tab, "on_pre_enter", None)
+        if refrescar is not None:
+            refrescar()
+
 
 if __name__ == "__main__":
     SimuladorApp().run()